@@ -0,0 +1,89 @@
+"""
+Compares current base58 codec with the original character-by-character
+implementation on 78 byte extended keys and 25 byte addresses.
+
+Run from repository root:
+
+    python -m benchmarks.bench_base58
+"""
+
+import os
+import timeit
+
+from btc_hd_wallet.helper import (
+    BASE58_ALPHABET, encode_base58, decode_base58, hash256
+)
+
+
+def legacy_encode_base58(data: bytes) -> str:
+    count = 0
+    for c in data:
+        if c == 0:
+            count += 1
+        else:
+            break
+    num = int.from_bytes(data, 'big')
+    prefix = '1' * count
+    result = ''
+    while num > 0:
+        num, mod = divmod(num, 58)
+        result = BASE58_ALPHABET[mod] + result
+    return prefix + result
+
+
+def legacy_decode_base58(s: str) -> bytes:
+    num = 0
+    for c in s:
+        if c not in BASE58_ALPHABET:
+            raise ValueError(
+                "character {} is not valid base58 character".format(c)
+            )
+        num *= 58
+        num += BASE58_ALPHABET.index(c)
+    h = hex(num)[2:]
+    h = '0' + h if len(h) % 2 else h
+    res = bytes.fromhex(h)
+    pad = 0
+    for c in s[:-1]:
+        if c == BASE58_ALPHABET[0]:
+            pad += 1
+        else:
+            break
+    return b'\x00' * pad + res
+
+
+def payloads(length: int, count: int = 1000) -> list:
+    result = []
+    for _ in range(count):
+        data = os.urandom(length - 4)
+        result.append(data + hash256(data)[:4])
+    return result
+
+
+def bench(name: str, fnc, items: list, number: int = 20) -> float:
+    seconds = min(timeit.repeat(
+        lambda: [fnc(i) for i in items], number=number, repeat=3
+    ))
+    per_item = seconds / (number * len(items)) * 1e6
+    print("{:<32} {:8.2f} us/item".format(name, per_item))
+    return per_item
+
+
+def main():
+    for label, length in (("extended key (78B)", 78 + 4),
+                          ("address (25B)", 25)):
+        data = payloads(length)
+        encoded = [encode_base58(d) for d in data]
+        assert encoded == [legacy_encode_base58(d) for d in data]
+        assert [decode_base58(s) for s in encoded] == data
+        print(label)
+        old = bench("  legacy encode", legacy_encode_base58, data)
+        new = bench("  encode", encode_base58, data)
+        print("  speedup {:.2f}x".format(old / new))
+        old = bench("  legacy decode", legacy_decode_base58, encoded)
+        new = bench("  decode", decode_base58, encoded)
+        print("  speedup {:.2f}x".format(old / new))
+
+
+if __name__ == "__main__":
+    main()
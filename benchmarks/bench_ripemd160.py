@@ -0,0 +1,47 @@
+"""
+Cost of pure python RIPEMD-160 fallback compared to hashlib (OpenSSL)
+on hash160 of 33 byte compressed public keys.
+
+Run from repository root:
+
+    python -m benchmarks.bench_ripemd160
+"""
+
+import os
+import hashlib
+import timeit
+
+from btc_hd_wallet.helper import HASHLIB_RIPEMD160, hashlib_ripemd160
+from btc_hd_wallet.ripemd160 import ripemd160, ripemd160_batch
+
+
+COUNT = 2000
+
+
+def bench(name: str, fnc, number: int = 5) -> float:
+    seconds = min(timeit.repeat(fnc, number=number, repeat=3))
+    per_item = seconds / (number * COUNT) * 1e6
+    print("{:<32} {:8.2f} us/item".format(name, per_item))
+    return per_item
+
+
+def main():
+    # what hash160 feeds to ripemd160 - sha256 of SEC public key
+    digests = [
+        hashlib.sha256(b"\x02" + os.urandom(32)).digest()
+        for _ in range(COUNT)
+    ]
+    python = bench("python ripemd160", lambda: [ripemd160(d) for d in digests])
+    bench("python ripemd160_batch", lambda: ripemd160_batch(digests))
+    if not HASHLIB_RIPEMD160:
+        print("hashlib does not provide ripemd160")
+        return
+    assert ripemd160_batch(digests) == [hashlib_ripemd160(d) for d in digests]
+    native = bench(
+        "hashlib ripemd160", lambda: [hashlib_ripemd160(d) for d in digests]
+    )
+    print("fallback is {:.0f}x slower".format(python / native))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Validation and classification of bitcoin addresses in bulk.
+
+Every address is turned into compact AddressInfo record (type code,
+network, witness version, program bytes). Invalid addresses are not
+reported by exceptions but by AddressType.UNKNOWN type code, so that long
+address lists can be streamed without per-item error handling.
+"""
+
+import enum
+import hashlib
+from typing import Generator, Iterable, List, NamedTuple, Optional, Union
+
+import btc_hd_wallet.bech32 as bech32
+from btc_hd_wallet.helper import decode_base58, imap_chunks
+
+
+class AddressType(enum.IntEnum):
+    UNKNOWN = 0
+    P2PKH = 1
+    P2SH = 2
+    P2WPKH = 3
+    P2WSH = 4
+    P2TR = 5
+    # valid segwit address with witness version/program not defined yet
+    WITNESS_UNKNOWN = 6
+
+
+class AddressInfo(NamedTuple):
+    type: AddressType
+    testnet: Optional[bool]
+    witver: Optional[int]
+    program: bytes
+
+
+INVALID = AddressInfo(AddressType.UNKNOWN, None, None, b"")
+
+# base58 version byte -> (type, testnet)
+BASE58_VERSIONS = {
+    0x00: (AddressType.P2PKH, False),
+    0x6f: (AddressType.P2PKH, True),
+    0x05: (AddressType.P2SH, False),
+    0xc4: (AddressType.P2SH, True),
+}
+# segwit hrp -> testnet
+BECH32_HRPS = {
+    "bc": False,
+    "tb": True,
+}
+
+
+def _classify_base58(addr: str) -> AddressInfo:
+    """
+    Classifies base58check encoded address.
+
+    :param addr: base58 address
+    :return: address info
+    """
+    # 1 byte version + 20 bytes hash + 4 bytes checksum -> 26 to 35 chars
+    if not 26 <= len(addr) <= 35:
+        return INVALID
+    try:
+        raw = decode_base58(s=addr)
+    except ValueError:
+        return INVALID
+    if len(raw) != 25:
+        return INVALID
+    data = raw[:21]
+    sha = hashlib.sha256
+    if sha(sha(data).digest()).digest()[:4] != raw[21:]:
+        return INVALID
+    version = BASE58_VERSIONS.get(data[0])
+    if version is None:
+        return INVALID
+    return AddressInfo(version[0], version[1], None, data[1:])
+
+
+def _classify_bech32(addr: str, hrp: str) -> AddressInfo:
+    """
+    Classifies segwit address.
+
+    :param addr: bech32/bech32m address
+    :param hrp: human readable part (lowercase)
+    :return: address info
+    """
+    witver, witprog = bech32.decode(hrp, addr)
+    if witver is None:
+        return INVALID
+    program = bytes(witprog)
+    if witver == 0:
+        addr_type = (
+            AddressType.P2WPKH if len(program) == 20 else AddressType.P2WSH
+        )
+    elif witver == 1 and len(program) == 32:
+        addr_type = AddressType.P2TR
+    else:
+        addr_type = AddressType.WITNESS_UNKNOWN
+    return AddressInfo(addr_type, BECH32_HRPS[hrp], witver, program)
+
+
+def classify_address(addr: str) -> AddressInfo:
+    """
+    Validates and classifies bitcoin address. Never raises on invalid
+    address (including non-str item) - AddressInfo with
+    AddressType.UNKNOWN type is returned instead.
+
+    :param addr: address (surrounding whitespace is ignored)
+    :return: address info
+    """
+    if not isinstance(addr, str):
+        # e.g. None from blank CSV cell
+        return INVALID
+    addr = addr.strip()
+    hrp = addr[:2].lower()
+    if hrp in BECH32_HRPS and addr[2:3] == "1":
+        return _classify_bech32(addr, hrp)
+    return _classify_base58(addr)
+
+
+def _classify_list(items: List[str]) -> List[AddressInfo]:
+    """
+    Classifies every address in list. Runs in worker process.
+
+    :param items: addresses
+    :return: address infos
+    """
+    return [classify_address(addr) for addr in items]
+
+
+def classify_addresses(items: Iterable[str], workers: int = None,
+                       chunk_size: int = 10000
+                       ) -> Generator[AddressInfo, None, None]:
+    """
+    Streams address infos for iterable of addresses in input order.
+
+    :param items: addresses (any iterable - list, file object, generator)
+    :param workers: number of worker processes (default=None - no pool)
+    :param chunk_size: number of addresses sent to worker at once
+                        (default=10000)
+    :return: address info generator
+    """
+    return imap_chunks(
+        _classify_list, items, workers=workers, chunk_size=chunk_size
+    )
+
+
+def classify_address_file(path: Union[str, bytes], workers: int = None,
+                          chunk_size: int = 10000
+                          ) -> Generator[AddressInfo, None, None]:
+    """
+    Streams address infos for file with one address per line.
+    Empty lines are classified as invalid to keep results aligned
+    with line numbers.
+
+    :param path: path to file
+    :param workers: number of worker processes (default=None - no pool)
+    :param chunk_size: number of addresses sent to worker at once
+                        (default=10000)
+    :return: address info generator
+    """
+    with open(path, "r") as f:
+        yield from classify_addresses(
+            f, workers=workers, chunk_size=chunk_size
+        )
@@ -1,4 +1,4 @@
-from typing import Callable, Generator
+from typing import Callable, Generator, Tuple
 
 from btc_hd_wallet.bip32 import (
     PrvKeyNode, PubKeyNode, Prv_or_PubKeyNode
@@ -10,7 +10,9 @@ from btc_hd_wallet.bip39 import (
 from btc_hd_wallet.helper import (
     hash160, sha256, h160_to_p2sh_address, h256_to_p2wsh_address
 )
-from btc_hd_wallet.wallet_utils import Bip32Path, Version, Key
+from btc_hd_wallet.wallet_utils import (
+    Bip32Path, DerivationPath, LRUCache, Version, Key
+)
 from btc_hd_wallet.script import Script, p2wpkh_script, p2wsh_script
 from btc_hd_wallet.bip85 import BIP85DeterministicEntropy
 
@@ -22,18 +24,23 @@ class BaseWallet(object):
         "testnet",
         "password",
         "master",
-        "bip85"
+        "bip85",
+        "node_cache"
     )
 
-    def __init__(self, master: Prv_or_PubKeyNode, testnet: bool = False):
+    def __init__(self, master: Prv_or_PubKeyNode, testnet: bool = False,
+                 node_cache_size: int = 1024):
         """
         Initializes wallet object.
 
         :param master: master node
         :param testnet: whether this node is testnet node (default=False)
+        :param node_cache_size: maximum number of intermediate nodes cached
+                                for by_path lookups (default=1024)
         """
         self.master = master
         self.testnet = testnet
+        self.node_cache = LRUCache(maxsize=node_cache_size)
         self.mnemonic = None
         self.password = None
         self.bip85 = BIP85DeterministicEntropy(
@@ -194,7 +201,8 @@ class BaseWallet(object):
         :param key_type: type of key private/public
         :return: version object
         """
-        bip = Bip32Path.parse(str(node))
+        # only purpose level is needed to determine version
+        bip = Bip32Path(purpose=node.path[0] if node.path else None)
         version = Version(
             key_type=key_type.value,
             testnet=self.testnet,
@@ -321,16 +329,60 @@ class BaseWallet(object):
         index = 0
         addr_fnc = addr_fnc or self.p2wpkh_address
         while True:
-            child = node.ckd(index=index)
+            # children are not retained - generator can run indefinitely
+            child = node.ckd(index=index, retain=False)
             adder = yield str(child), addr_fnc(child)
             index += adder or 1
 
+    def iter_addresses(self, node: Prv_or_PubKeyNode, interval: tuple = (0, 20),
+                       addr_fnc: Callable[[Prv_or_PubKeyNode], str] = None
+                       ) -> Generator[Tuple[str, str], None, None]:
+        """
+        Streams (path, address) tuples for interval of node's children.
+        Derived children are not retained, so memory stays constant
+        regardless of interval size.
+
+        :param node: key node
+        :param interval: specific interval of integers
+                        from which to generate addresses (default=(0, 20))
+        :param addr_fnc: function to use for address generation
+                            (default=self.p2wpkh_address)
+        :return: generator of (path, address)
+        """
+        addr_fnc = addr_fnc or self.p2wpkh_address
+        for child in node.iter_children(interval=interval):
+            yield str(child), addr_fnc(child)
+
+    def _cached_node(self, indexes: tuple) -> Prv_or_PubKeyNode:
+        """
+        Gets node by derivation indexes from node cache, deriving
+        (and caching) it from the longest cached prefix if needed.
+
+        :param indexes: derivation indexes from master
+        :return: node
+        """
+        if not indexes:
+            return self.master
+        node = self.node_cache.get(indexes)
+        if node is None:
+            parent = self._cached_node(indexes[:-1])
+            node = parent.ckd(index=indexes[-1], retain=False)
+            self.node_cache.put(indexes, node)
+        return node
+
     def by_path(self, path: str) -> Prv_or_PubKeyNode:
         """
         Generate child node from master node by path.
 
-        :param path: bip32 path
+        Intermediate nodes are kept in bounded LRU cache keyed by path
+        prefix, so repeated lookups sharing the same prefix only derive
+        the last level.
+
+        :param path: bip32 path (arbitrary depth)
         :return: child node
         """
-        path = Bip32Path.parse(s=path)
-        return self.master.derive_path(index_list=path.to_list())
+        indexes = DerivationPath.parse(s=path).indexes
+        if not indexes:
+            return self.master
+        parent = self._cached_node(indexes[:-1])
+        return parent.ckd(index=indexes[-1], retain=False)
@@ -23,6 +23,11 @@
 
 from enum import Enum
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class Encoding(Enum):
     """Enumeration type to list the various supported encodings."""
@@ -34,15 +39,24 @@ CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
 BECH32M_CONST = 0x2bc830a3
 
 
+BECH32_GENERATOR = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+# xor of generator constants selected by every possible 5 bit top value
+POLYMOD_TABLE = [
+    (BECH32_GENERATOR[0] if top & 1 else 0) ^
+    (BECH32_GENERATOR[1] if top & 2 else 0) ^
+    (BECH32_GENERATOR[2] if top & 4 else 0) ^
+    (BECH32_GENERATOR[3] if top & 8 else 0) ^
+    (BECH32_GENERATOR[4] if top & 16 else 0)
+    for top in range(32)
+]
+
+
 def bech32_polymod(values):
     """Internal function that computes the Bech32 checksum."""
-    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    table = POLYMOD_TABLE
     chk = 1
     for value in values:
-        top = chk >> 25
-        chk = (chk & 0x1ffffff) << 5 ^ value
-        for i in range(5):
-            chk ^= generator[i] if ((top >> i) & 1) else 0
+        chk = (chk & 0x1ffffff) << 5 ^ value ^ table[chk >> 25]
     return chk
 
 
@@ -134,10 +148,92 @@ def decode(hrp, addr):
     return (data[0], decoded)
 
 
-def encode(hrp, witver, witprog):
-    """Encode a segwit address."""
+def encode(hrp, witver, witprog, validate=False):
+    """
+    Encode a segwit address.
+
+    Inputs are checked structurally (the same rules decode enforces) instead
+    of decoding the produced address again. Pass validate=True to also run
+    the full decode round trip.
+    """
+    if not 0 <= witver <= 16 or not 2 <= len(witprog) <= 40:
+        return None
+    if witver == 0 and len(witprog) != 20 and len(witprog) != 32:
+        return None
+    if not hrp or hrp.lower() != hrp or any(
+            ord(x) < 33 or ord(x) > 126 for x in hrp):
+        return None
     spec = Encoding.BECH32 if witver == 0 else Encoding.BECH32M
     ret = bech32_encode(hrp, [witver] + convertbits(witprog, 8, 5), spec)
-    if decode(hrp, ret) == (None, None):
+    if len(ret) > 90:
+        return None
+    if validate and decode(hrp, ret) == (None, None):
         return None
     return ret
+
+
+def _encode_batch_numpy(hrp, witver, programs):
+    """Encode rows of (N, L) uint8 array column-wise with NumPy."""
+    count, length = programs.shape
+    spec = Encoding.BECH32 if witver == 0 else Encoding.BECH32M
+    # 8-to-5 bit regrouping: unpack bits, zero pad to multiple of 5
+    # and pack each group of 5 bits back to integer
+    bits = numpy.unpackbits(programs, axis=1)
+    pad = -bits.shape[1] % 5
+    if pad:
+        bits = numpy.pad(bits, ((0, 0), (0, pad)))
+    weights = numpy.array([16, 8, 4, 2, 1], dtype=numpy.uint8)
+    groups = bits.reshape(count, -1, 5) @ weights
+    data = numpy.empty((count, groups.shape[1] + 1), dtype=numpy.uint32)
+    data[:, 0] = witver
+    data[:, 1:] = groups
+    # hrp prefix is the same for every row - polymod state after it too
+    table = numpy.array(POLYMOD_TABLE, dtype=numpy.uint32)
+    start = bech32_polymod(bech32_hrp_expand(hrp))
+    chk = numpy.full(count, start, dtype=numpy.uint32)
+    for i in range(data.shape[1]):
+        chk = ((chk & 0x1ffffff) << 5) ^ data[:, i] ^ table[chk >> 25]
+    for _ in range(6):
+        chk = ((chk & 0x1ffffff) << 5) ^ table[chk >> 25]
+    chk ^= BECH32M_CONST if spec == Encoding.BECH32M else 1
+    checksum = numpy.stack(
+        [(chk >> 5 * (5 - i)) & 31 for i in range(6)], axis=1
+    )
+    combined = numpy.concatenate([data, checksum], axis=1)
+    charset = numpy.frombuffer(CHARSET.encode(), dtype=numpy.uint8)
+    chars = numpy.ascontiguousarray(charset[combined])
+    rows = chars.view("S%d" % chars.shape[1]).ravel().tolist()
+    prefix = hrp + "1"
+    return [prefix + row.decode() for row in rows]
+
+
+def encode_batch(hrp, witver, programs):
+    """
+    Encode many segwit addresses with the same hrp, witness version and
+    witness program length (e.g. pool of P2WPKH addresses).
+
+    With NumPy installed, programs given as (N, 20) or (N, 32) uint8 array
+    (or sequence of equally long bytes) are regrouped and checksummed
+    column-wise. Without NumPy (or for programs of different lengths)
+    every program is encoded by scalar encode. Invalid parameters yield
+    None for every program, same as encode does.
+    """
+    if numpy is not None and not isinstance(programs, numpy.ndarray):
+        programs = [bytes(prog) for prog in programs]
+        if len(set(map(len, programs))) != 1:
+            return [encode(hrp, witver, prog) for prog in programs]
+        programs = numpy.frombuffer(
+            b"".join(programs), dtype=numpy.uint8
+        ).reshape(len(programs), len(programs[0]))
+    if numpy is None:
+        return [encode(hrp, witver, bytes(prog)) for prog in programs]
+    programs = numpy.asarray(programs, dtype=numpy.uint8)
+    if programs.ndim != 2:
+        raise ValueError("programs have to be two dimensional (N, length)")
+    count, length = programs.shape
+    if count == 0:
+        return []
+    # validate shared parameters once on first program
+    if encode(hrp, witver, programs[0].tobytes()) is None:
+        return [None] * count
+    return _encode_batch_numpy(hrp, witver, programs)
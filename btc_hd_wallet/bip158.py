@@ -0,0 +1,285 @@
+"""
+BIP158 compact block filters - Golomb-coded set (GCS) encoding, decoding
+and batch matching of wallet scripts.
+
+Filter elements are hashed with SipHash-2-4 keyed by first 16 bytes of
+block hash (internal byte order) and mapped to range [0, N * M).
+Wallet scripts are hashed and sorted once per filter and matched by
+single merge-walk over decoded filter - O(N + M) instead of decoding
+filter for every script. Golomb-Rice bitstream is decoded from its
+binary string representation, so unary quotients are found with
+str.find instead of bit by bit.
+"""
+
+import struct
+from typing import Dict, Iterable, List, Set, Union
+
+from btc_hd_wallet.helper import encode_varint, read_varint_at
+
+M64 = 0xFFFFFFFFFFFFFFFF
+
+# basic filter type parameters
+BASIC_FILTER_P = 19
+BASIC_FILTER_M = 784931
+
+_KEY = struct.Struct("<QQ")
+
+
+def siphash24(k0: int, k1: int, data: bytes) -> int:
+    """
+    SipHash-2-4.
+
+    :param k0: first half of key (little endian integer)
+    :param k1: second half of key (little endian integer)
+    :param data: message
+    :return: 64 bit hash
+    """
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+    length = len(data)
+    tail = length & ~7
+    blocks = list(struct.unpack_from("<{}Q".format(tail >> 3), data))
+    blocks.append(
+        ((length & 0xff) << 56) | int.from_bytes(data[tail:], "little")
+    )
+    for m in blocks:
+        v3 ^= m
+        for _ in range(2):
+            v0 = (v0 + v1) & M64
+            v1 = ((v1 << 13) | (v1 >> 51)) & M64 ^ v0
+            v0 = ((v0 << 32) | (v0 >> 32)) & M64
+            v2 = (v2 + v3) & M64
+            v3 = ((v3 << 16) | (v3 >> 48)) & M64 ^ v2
+            v0 = (v0 + v3) & M64
+            v3 = ((v3 << 21) | (v3 >> 43)) & M64 ^ v0
+            v2 = (v2 + v1) & M64
+            v1 = ((v1 << 17) | (v1 >> 47)) & M64 ^ v2
+            v2 = ((v2 << 32) | (v2 >> 32)) & M64
+        v0 ^= m
+    v2 ^= 0xff
+    for _ in range(4):
+        v0 = (v0 + v1) & M64
+        v1 = ((v1 << 13) | (v1 >> 51)) & M64 ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & M64
+        v2 = (v2 + v3) & M64
+        v3 = ((v3 << 16) | (v3 >> 48)) & M64 ^ v2
+        v0 = (v0 + v3) & M64
+        v3 = ((v3 << 21) | (v3 >> 43)) & M64 ^ v0
+        v2 = (v2 + v1) & M64
+        v1 = ((v1 << 17) | (v1 >> 47)) & M64 ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & M64
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def filter_key(block_hash: bytes) -> tuple:
+    """
+    SipHash key of block filter.
+
+    :param block_hash: block hash in internal byte order
+    :return: (k0, k1)
+    """
+    return _KEY.unpack(block_hash[:16])
+
+
+def hash_elements(elements: Iterable[bytes], block_hash: bytes, n: int,
+                  m: int = BASIC_FILTER_M) -> List[int]:
+    """
+    Hashes elements to range [0, n * m).
+
+    :param elements: filter elements (scriptPubKeys)
+    :param block_hash: block hash in internal byte order
+    :param n: number of elements in filter
+    :param m: inverse false positive rate (default=BASIC_FILTER_M)
+    :return: hashed elements in input order
+    """
+    k0, k1 = filter_key(block_hash)
+    f = n * m
+    return [(siphash24(k0, k1, element) * f) >> 64 for element in elements]
+
+
+def encode_gcs(values: Iterable[int], p: int = BASIC_FILTER_P) -> bytes:
+    """
+    Golomb-Rice encodes set of hashed elements (without N prefix).
+
+    :param values: hashed elements
+    :param p: Golomb-Rice parameter (default=BASIC_FILTER_P)
+    :return: bitstream padded to whole bytes
+    """
+    parts = []
+    last = 0
+    mask = (1 << p) - 1
+    fmt = "0{}b".format(p)
+    for value in sorted(values):
+        delta = value - last
+        last = value
+        parts.append("1" * (delta >> p) + "0" + format(delta & mask, fmt))
+    bits = "".join(parts)
+    bits += "0" * (-len(bits) % 8)
+    if not bits:
+        return b""
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def build_basic_filter(block_hash: bytes, elements: Iterable[bytes],
+                       p: int = BASIC_FILTER_P,
+                       m: int = BASIC_FILTER_M) -> bytes:
+    """
+    Builds serialized block filter (N prefixed GCS) from elements.
+    Duplicate and empty elements are skipped as BIP158 requires.
+
+    :param block_hash: block hash in internal byte order
+    :param elements: filter elements (scriptPubKeys)
+    :param p: Golomb-Rice parameter (default=BASIC_FILTER_P)
+    :param m: inverse false positive rate (default=BASIC_FILTER_M)
+    :return: serialized filter
+    """
+    elements = {bytes(element) for element in elements if element}
+    values = hash_elements(elements, block_hash, len(elements), m)
+    return encode_varint(len(elements)) + encode_gcs(values, p)
+
+
+class GCSFilter(object):
+
+    __slots__ = (
+        "n",
+        "data",
+        "block_hash",
+        "p",
+        "m"
+    )
+
+    def __init__(self, serialized: bytes, block_hash: bytes,
+                 p: int = BASIC_FILTER_P, m: int = BASIC_FILTER_M):
+        """
+        Initializes filter from its serialization (cfilter message
+        filter bytes).
+
+        :param serialized: N prefixed GCS
+        :param block_hash: block hash in internal byte order
+        :param p: Golomb-Rice parameter (default=BASIC_FILTER_P)
+        :param m: inverse false positive rate (default=BASIC_FILTER_M)
+        """
+        self.n, offset = read_varint_at(serialized)
+        self.data = bytes(serialized[offset:])
+        self.block_hash = bytes(block_hash)
+        self.p = p
+        self.m = m
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return "GCSFilter(n={}, block_hash={})".format(
+            self.n, self.block_hash[::-1].hex()
+        )
+
+    def _bits(self) -> str:
+        """
+        Bitstream as binary string.
+
+        :return: binary string
+        """
+        if not self.data:
+            return ""
+        return format(int.from_bytes(self.data, "big"),
+                      "0{}b".format(len(self.data) * 8))
+
+    def decode(self) -> List[int]:
+        """
+        Decodes all hashed elements.
+
+        :return: sorted hashed elements
+        """
+        bits = self._bits()
+        p = self.p
+        find = bits.find
+        values = []
+        pos = 0
+        value = 0
+        for _ in range(self.n):
+            end = find("0", pos)
+            if end < 0 or end + 1 + p > len(bits):
+                raise ValueError("truncated filter")
+            value += ((end - pos) << p) + int(bits[end + 1:end + 1 + p], 2)
+            values.append(value)
+            pos = end + 1 + p
+        return values
+
+    def _match_hashes(self, queries: List[int]) -> Set[int]:
+        """
+        Merge-walks filter against sorted hashed queries.
+
+        :param queries: sorted hashed elements
+        :return: hashed elements present in filter
+        """
+        found = set()
+        if not queries or not self.n:
+            return found
+        bits = self._bits()
+        p = self.p
+        find = bits.find
+        q, nq = 0, len(queries)
+        target = queries[0]
+        pos = 0
+        value = 0
+        for _ in range(self.n):
+            end = find("0", pos)
+            if end < 0 or end + 1 + p > len(bits):
+                raise ValueError("truncated filter")
+            value += ((end - pos) << p) + int(bits[end + 1:end + 1 + p], 2)
+            pos = end + 1 + p
+            while target < value:
+                q += 1
+                if q == nq:
+                    return found
+                target = queries[q]
+            if target == value:
+                found.add(value)
+        return found
+
+    def match_any(self, elements: Iterable[bytes]) -> bool:
+        """
+        Tests whether any of elements may be in filter.
+
+        :param elements: elements (scriptPubKeys)
+        :return: False if none of elements is in block
+        """
+        return bool(self.match(elements))
+
+    def match(self, elements: Iterable[bytes]) -> List[bytes]:
+        """
+        Finds elements which may be in filter.
+
+        :param elements: elements (scriptPubKeys)
+        :return: matching elements (false positive rate is 1/m each)
+        """
+        elements = list(elements)
+        hashes = hash_elements(elements, self.block_hash, self.n, self.m)
+        found = self._match_hashes(sorted(set(hashes)))
+        return [e for e, h in zip(elements, hashes) if h in found]
+
+    def match_script_map(self, script_map: Dict[bytes, str]) -> List[str]:
+        """
+        Finds wallet derivation paths whose scripts may be in block.
+
+        :param script_map: raw scriptPubKey -> path
+                            (blocks.build_script_map)
+        :return: paths of matching scripts
+        """
+        return [script_map[script] for script in self.match(script_map)]
+
+
+def match_filters(filters: Iterable[GCSFilter],
+                  elements: Union[List[bytes], Dict[bytes, str]]
+                  ) -> List[GCSFilter]:
+    """
+    Finds filters (blocks) that may contain any of elements.
+
+    :param filters: block filters
+    :param elements: elements (scriptPubKeys) or script map
+    :return: matching filters
+    """
+    elements = list(elements)
+    return [f for f in filters if f.match_any(elements)]
@@ -1,7 +1,7 @@
-import ecdsa
 from io import BytesIO
-from typing import List, Union
+from typing import Generator, List, NamedTuple, Tuple, Union
 
+from btc_hd_wallet import ecc
 from btc_hd_wallet.keys import PrivateKey, PublicKey
 from btc_hd_wallet.helper import (
     encode_base58_checksum, big_endian_to_int, int_to_big_endian,
@@ -13,17 +13,21 @@ HARDENED = 2 ** 31
 
 Prv_or_PubKeyNode = Union["PrvKeyNode", "PubKeyNode"]
 
-SECP256k1 = ecdsa.curves.SECP256k1
-CURVE_GEN = ecdsa.ecdsa.generator_secp256k1
-CURVE_ORDER = CURVE_GEN.order()
-FIELD_ORDER = SECP256k1.curve.p()
-INFINITY = ecdsa.ellipticcurve.INFINITY
+CURVE_ORDER = ecc.N
+FIELD_ORDER = ecc.P
 
 
 class InvalidKeyError(Exception):
     """Raised when derived key is invalid"""
 
 
+class ChildRecord(NamedTuple):
+    """Compact result of batch public child derivation."""
+    index: int
+    key: bytes
+    chain_code: bytes
+
+
 class PubKeyNode(object):
 
     mark: str = "M"
@@ -39,7 +43,12 @@ class PubKeyNode(object):
         "parsed_parent_fingerprint",
         "parsed_version",
         "testnet",
-        "children"
+        "children",
+        "_private_key",
+        "_public_key",
+        "_fingerprint",
+        "path",
+        "_path_str"
     )
 
     def __init__(self, key: bytes, chain_code: bytes, index: int = 0,
@@ -66,6 +75,13 @@ class PubKeyNode(object):
         self.parsed_version = None
         self.testnet = testnet
         self.children = []
+        # key objects are computed at most once per node
+        self._private_key = None
+        self._public_key = None
+        self._fingerprint = None
+        # derivation indexes from root node (root itself has empty path)
+        self.path = parent.path + (index,) if parent else ()
+        self._path_str = None
 
     def __eq__(self, other) -> bool:
         """
@@ -91,7 +107,9 @@ class PubKeyNode(object):
 
         :return: public key of public key node
         """
-        return PublicKey.parse(key_bytes=self.key)
+        if self._public_key is None:
+            self._public_key = PublicKey.parse(key_bytes=self.key)
+        return self._public_key
 
     @property
     def parent_fingerprint(self) -> bytes:
@@ -99,17 +117,16 @@ class PubKeyNode(object):
         Gets parent fingerprint.
 
         If node is parsed from extended key, only parsed parent fingerprint
-        is available. If node is derived, parent fingerprint is calculated
-        from parent node.
+        is available. If node is derived, parent fingerprint is recorded
+        at derivation time (or calculated from parent node on first access
+        if it was not available then).
 
         :return: parent fingerprint
         """
-        if self.parent:
-            fingerprint = self.parent.fingerprint()
-        else:
-            fingerprint = self.parsed_parent_fingerprint
+        if self.parsed_parent_fingerprint is None and self.parent:
+            self.parsed_parent_fingerprint = self.parent.fingerprint()
         # in case there is still None here - it is master
-        return fingerprint or b"\x00\x00\x00\x00"
+        return self.parsed_parent_fingerprint or b"\x00\x00\x00\x00"
 
     @property
     def pub_version(self) -> int:
@@ -124,14 +141,14 @@ class PubKeyNode(object):
         return PubKeyNode.mainnet_version
 
     def __repr__(self) -> str:
-        if self.is_master() or self.is_root():
-            return self.mark
-        if self.is_hardened():
-            index = str(self.index - 2**31) + "'"
-        else:
-            index = str(self.index)
-        parent = str(self.parent) if self.parent else self.mark
-        return parent + "/" + index
+        if self._path_str is None:
+            self._path_str = "/".join(
+                [self.mark] + [
+                    str(i - HARDENED) + "'" if i >= HARDENED else str(i)
+                    for i in self.path
+                ]
+            )
+        return self._path_str
 
     def is_hardened(self) -> bool:
         """Check whether current key node is hardened."""
@@ -151,7 +168,9 @@ class PubKeyNode(object):
 
         :return: first four bytes of SHA256(RIPEMD160(public key))
         """
-        return hash160(self.public_key.sec())[:4]
+        if self._fingerprint is None:
+            self._fingerprint = hash160(self.public_key.sec())[:4]
+        return self._fingerprint
 
     @classmethod
     def parse(cls, s: Union[str, bytes, BytesIO],
@@ -248,7 +267,30 @@ class PubKeyNode(object):
         """
         return encode_base58_checksum(self.serialize_public(version=version))
 
-    def ckd(self, index: int) -> "PubKeyNode":
+    def _public_child(self, index: int, point: ecc.Point,
+                      chain_code: bytes) -> "PubKeyNode":
+        """
+        Creates public child node from already derived child point.
+
+        :param index: derivation index
+        :param point: child public key point
+        :param chain_code: child chain code
+        :return: child node
+        """
+        child = self.__class__(
+            key=ecc.backend.sec_encode(point),
+            chain_code=chain_code,
+            index=index,
+            depth=self.depth + 1,
+            testnet=self.testnet,
+            parent=self,
+            parent_fingerprint=self.fingerprint()
+        )
+        # point is already known - no need to decompress it from sec later
+        child._public_key = PublicKey(point=point)
+        return child
+
+    def ckd(self, index: int, retain: bool = True) -> "PubKeyNode":
         """
         The function CKDpub((Kpar, cpar), i) → (Ki, ci) computes a child
         extended public key from the parent extended public key.
@@ -267,6 +309,8 @@ class PubKeyNode(object):
              value for i.
 
         :param index: derivation index
+        :param retain: whether to append child to self.children
+                        (default=True)
         :return: derived child
         """
         if index >= HARDENED:
@@ -282,21 +326,77 @@ class PubKeyNode(object):
                     big_endian_to_int(IL)
                 )
             )
-        point = PrivateKey.parse(IL).K.point + self.public_key.point
-        if point == INFINITY:
-            raise InvalidKeyError("public key is a point at infinity")
-        Ki = PublicKey.from_point(point=point)
-        child = self.__class__(
-            key=Ki.sec(),
-            chain_code=IR,
-            index=index,
-            depth=self.depth + 1,
-            testnet=self.testnet,
-            parent=self
+        point = ecc.backend.tweak_add(
+            self.public_key.point, big_endian_to_int(IL)
         )
-        self.children.append(child)
+        if point is None:
+            raise InvalidKeyError("public key is a point at infinity")
+        child = self._public_child(index=index, point=point, chain_code=IR)
+        if retain:
+            self.children.append(child)
         return child
 
+    def _batch_ckd(self, interval: tuple
+                   ) -> List[Tuple[int, ecc.Point, bytes]]:
+        """
+        Public child key derivation (CKDpub) for contiguous range of indexes.
+        Child points are computed in Jacobian coordinates and normalized
+        to affine together with single modular inversion.
+
+        :param interval: specific interval of integers
+                        from which to derive children
+        :return: list of (index, point, chain code)
+        """
+        indexes = range(*interval)
+        if indexes and max(indexes[0], indexes[-1]) >= HARDENED:
+            raise RuntimeError("failure: hardened child for public ckd")
+        sec = self.public_key.sec()
+        tweaks = []
+        chain_codes = []
+        for index in indexes:
+            I = hmac_sha512(
+                key=self.chain_code,
+                msg=sec + int_to_big_endian(index, 4)
+            )
+            tweaks.append(big_endian_to_int(I[:32]))
+            chain_codes.append(I[32:])
+        points = ecc.backend.tweak_add_batch(self.public_key.point, tweaks)
+        if None in points:
+            raise InvalidKeyError("public key is a point at infinity")
+        return list(zip(indexes, points, chain_codes))
+
+    def batch_ckd(self, interval: tuple = (0, 20)) -> List[ChildRecord]:
+        """
+        Derives public children of current node for whole interval at once.
+        Children are not retained in current node. Private key node derives
+        public (neutered) children too.
+
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :return: list of child records (index, SEC public key, chain code)
+        """
+        sec_encode = ecc.backend.sec_encode
+        return [
+            ChildRecord(index, sec_encode(point), chain_code)
+            for index, point, chain_code in self._batch_ckd(interval)
+        ]
+
+    def batch_public_keys(self, interval: tuple = (0, 20)
+                          ) -> List[Tuple[int, PublicKey]]:
+        """
+        Derives public keys of children of current node for whole
+        interval at once. Same as batch_ckd, but keeps child points
+        (no SEC encoding and decoding when only keys/addresses are needed).
+
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :return: list of (index, public key)
+        """
+        return [
+            (index, PublicKey(point=point))
+            for index, point, _ in self._batch_ckd(interval)
+        ]
+
     def generate_children(self, interval: tuple = (0, 20)
                           ) -> List[Prv_or_PubKeyNode]:
         """
@@ -306,18 +406,46 @@ class PubKeyNode(object):
                         from which to generate children (default=(0, 20))
         :return: list of generated children
         """
-        return [self.ckd(index=i) for i in range(*interval)]
+        children = [
+            self._public_child(index=index, point=point, chain_code=chain_code)
+            for index, point, chain_code in self._batch_ckd(interval)
+        ]
+        self.children.extend(children)
+        return children
+
+    def iter_children(self, interval: tuple = (0, 20), batch_size: int = 1000
+                      ) -> Generator[Prv_or_PubKeyNode, None, None]:
+        """
+        Lazily derives children of current node. Children are not retained
+        in current node, so memory stays constant regardless of interval size.
+
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :param batch_size: number of children derived at once (default=1000)
+        :return: children generator
+        """
+        start, stop = interval
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            for index, point, chain_code in self._batch_ckd(
+                    (batch_start, batch_stop)):
+                yield self._public_child(
+                    index=index, point=point, chain_code=chain_code
+                )
 
-    def derive_path(self, index_list: List[int]) -> Prv_or_PubKeyNode:
+    def derive_path(self, index_list: List[int],
+                    retain: bool = True) -> Prv_or_PubKeyNode:
         """
         Derives node from current node.
 
         :param index_list: specific index list (or index path) for derivation
+        :param retain: whether derived nodes are appended to their parents'
+                        children (default=True)
         :return: derived node
         """
         node = self
         for i in index_list:
-            node = node.ckd(index=i)
+            node = node.ckd(index=i, retain=retain)
         return node
 
 
@@ -332,18 +460,22 @@ class PrvKeyNode(PubKeyNode):
         """
         Private key node's private key.
 
-        :return: public key of private key node
+        :return: private key of private key node
         """
-        return PrivateKey(sec_exp=big_endian_to_int(self.key))
+        if self._private_key is None:
+            self._private_key = PrivateKey(sec_exp=big_endian_to_int(self.key))
+        return self._private_key
 
     @property
     def public_key(self) -> PublicKey:
         """
         Private key node's public key.
 
-        :return: public key of public key node
+        :return: public key of private key node
         """
-        return self.private_key.K
+        if self._public_key is None:
+            self._public_key = self.private_key.K
+        return self._public_key
 
     @property
     def prv_version(self) -> int:
@@ -393,6 +525,30 @@ class PrvKeyNode(PubKeyNode):
             testnet=testnet
         )
 
+    def generate_children(self, interval: tuple = (0, 20)
+                          ) -> List["PrvKeyNode"]:
+        """
+        Generates children of current node.
+
+        :param interval: specific interval of integers
+                        from which to generate children (default=(0, 20))
+        :return: list of generated children
+        """
+        return [self.ckd(index=i) for i in range(*interval)]
+
+    def iter_children(self, interval: tuple = (0, 20)
+                      ) -> Generator["PrvKeyNode", None, None]:
+        """
+        Lazily derives children of current node. Children are not retained
+        in current node, so memory stays constant regardless of interval size.
+
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :return: children generator
+        """
+        for i in range(*interval):
+            yield self.ckd(index=i, retain=False)
+
     def serialize_private(self, version: int = None) -> bytes:
         """
         Serializes private key node to extended key format.
@@ -415,7 +571,7 @@ class PrvKeyNode(PubKeyNode):
         """
         return encode_base58_checksum(self.serialize_private(version=version))
 
-    def ckd(self, index: int) -> "PrvKeyNode":
+    def ckd(self, index: int, retain: bool = True) -> "PrvKeyNode":
         """
         The function CKDpriv((kpar, cpar), i) → (ki, ci) computes
         a child extended private key from the parent extended private key:
@@ -434,13 +590,19 @@ class PrvKeyNode(PubKeyNode):
             (Note: this has probability lower than 1 in 2**127.)
 
         :param index: derivation index
+        :param retain: whether to append child to self.children
+                        (default=True)
         :return: derived child
         """
         if index >= HARDENED:
             # hardened
             data = b"\x00"+bytes(self.private_key) + int_to_big_endian(index, 4)
+            # do not compute public key just for fingerprint, if it is
+            # not known yet it is calculated from parent on first access
+            fingerprint = self._fingerprint
         else:
             data = self.public_key.sec() + int_to_big_endian(index, 4)
+            fingerprint = self.fingerprint()
         I = hmac_sha512(key=self.chain_code, msg=data)
         IL, IR = I[:32], I[32:]
         if big_endian_to_int(IL) >= CURVE_ORDER:
@@ -449,8 +611,7 @@ class PrvKeyNode(PubKeyNode):
                     big_endian_to_int(IL)
                 )
             )
-        ki = (int.from_bytes(IL, "big") +
-              big_endian_to_int(bytes(self.private_key))) % CURVE_ORDER
+        ki = (big_endian_to_int(IL) + big_endian_to_int(self.key)) % CURVE_ORDER
         if ki == 0:
             InvalidKeyError("private key is zero")
         child = self.__class__(
@@ -459,7 +620,9 @@ class PrvKeyNode(PubKeyNode):
             index=index,
             depth=self.depth + 1,
             testnet=self.testnet,
-            parent=self
+            parent=self,
+            parent_fingerprint=fingerprint
         )
-        self.children.append(child)
+        if retain:
+            self.children.append(child)
         return child
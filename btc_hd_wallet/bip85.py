@@ -1,5 +1,5 @@
 from btc_hd_wallet.bip32 import PrvKeyNode, InvalidKeyError, CURVE_ORDER
-from btc_hd_wallet.wallet_utils import Bip32Path
+from btc_hd_wallet.wallet_utils import DerivationPath
 from btc_hd_wallet.helper import hmac_sha512, big_endian_to_int
 from btc_hd_wallet.keys import PrivateKey
 from btc_hd_wallet.bip39 import mnemonic_from_entropy, CORRECT_MNEMONIC_LENGTH
@@ -53,8 +53,11 @@ class BIP85DeterministicEntropy(object):
         :param path: path to child node
         :return: 64 bytes of entropy
         """
-        path = Bip32Path.parse(path)
-        node = self.master_node.derive_path(index_list=path.to_list())
+        path = DerivationPath.parse(path)
+        node = self.master_node.derive_path(
+            index_list=path.to_list(),
+            retain=False
+        )
         return self._hmac_sha512(msg=bytes(node.private_key))
 
     @staticmethod
@@ -0,0 +1,283 @@
+"""
+Offline scanning of Bitcoin Core block files (blk*.dat) for wallet outputs.
+
+Block files are memory-mapped and walked with plain offset arithmetic -
+no block, transaction or script objects are created. Every output's
+scriptPubKey is looked up in a script map (raw scriptPubKey -> derivation
+path) built from wallet nodes. Transaction id is only computed for
+transactions that pay to the wallet.
+
+Block files written by Bitcoin Core 28+ may be obfuscated with xor key
+(blocksdir/xor.dat), such files have to be deobfuscated first.
+"""
+
+import os
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict, Generator, Iterable, List, NamedTuple, Set, Union, Tuple
+)
+
+from btc_hd_wallet.bip32 import Prv_or_PubKeyNode
+from btc_hd_wallet.helper import (
+    read_varint_at, hash160, hash160_records
+)
+from btc_hd_wallet.script import p2pkh_script, p2sh_script, p2wpkh_script
+
+
+MAINNET_MAGIC = bytes.fromhex("f9beb4d9")
+TESTNET_MAGIC = bytes.fromhex("0b110907")
+SIGNET_MAGIC = bytes.fromhex("0a03cf40")
+REGTEST_MAGIC = bytes.fromhex("fabfb5da")
+
+SCRIPT_TYPES = ("p2pkh", "p2sh-p2wpkh", "p2wpkh")
+
+ScriptMap = Dict[bytes, str]
+
+
+class BlockHit(NamedTuple):
+    # transaction id in RPC/explorer (reversed) hex
+    txid: str
+    vout: int
+    # output value in satoshis
+    value: int
+    path: str
+
+
+def build_script_map(node: Prv_or_PubKeyNode, interval: tuple = (0, 20),
+                     script_types: Iterable[str] = ("p2wpkh",),
+                     script_map: ScriptMap = None) -> ScriptMap:
+    """
+    Derives children of (chain) node and maps their scriptPubKeys to
+    derivation paths.
+
+    :param node: key node (e.g. external chain m/84'/0'/0'/0)
+    :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+    :param script_types: scriptPubKey types to generate - any of
+                        p2pkh, p2sh-p2wpkh, p2wpkh (default=("p2wpkh",))
+    :param script_map: existing map to extend (default=None - new map)
+    :return: script map
+    """
+    script_types = tuple(script_types)
+    for script_type in script_types:
+        if script_type not in SCRIPT_TYPES:
+            raise ValueError("Unsupported script type {}".format(script_type))
+    script_map = {} if script_map is None else script_map
+    records = node.batch_ckd(interval=interval)
+    h160s = hash160_records(b"".join(r.key for r in records), 33)
+    prefix = str(node)
+    for i, record in enumerate(records):
+        h160 = h160s[20 * i:20 * i + 20]
+        path = "{}/{}".format(prefix, record.index)
+        for script_type in script_types:
+            if script_type == "p2pkh":
+                script = p2pkh_script(h160)
+            elif script_type == "p2wpkh":
+                script = p2wpkh_script(h160)
+            else:
+                script = p2sh_script(
+                    hash160(p2wpkh_script(h160).raw_serialize())
+                )
+            script_map[script.raw_serialize()] = path
+    return script_map
+
+
+def _varint(buf: Union[bytes, mmap.mmap], offset: int) -> Tuple[int, int]:
+    """
+    Reads varint at offset - single byte fast path inlined.
+
+    :param buf: buffer
+    :param offset: offset
+    :return: integer and offset right after varint
+    """
+    n = buf[offset]
+    if n < 0xfd:
+        return n, offset + 1
+    return read_varint_at(buf, offset)
+
+
+def script_lengths(script_map: ScriptMap) -> Set[int]:
+    """
+    Lengths of scripts in script map - outputs of other lengths are
+    skipped without lookup.
+
+    :param script_map: raw scriptPubKey -> path
+    :return: set of script lengths
+    """
+    return {len(script) for script in script_map}
+
+
+def scan_block(buf: Union[bytes, mmap.mmap], start: int, end: int,
+               script_map: ScriptMap, lengths: Set[int] = None
+               ) -> Generator[BlockHit, None, None]:
+    """
+    Walks serialized block and yields outputs paying to script map.
+
+    :param buf: buffer containing block
+    :param start: offset of block header
+    :param end: offset right after block
+    :param script_map: raw scriptPubKey -> path
+    :param lengths: script_lengths of script map - pass it when scanning
+                    many blocks (default=None - computed from script map)
+    :return: hit generator
+    """
+    if lengths is None:
+        lengths = script_lengths(script_map)
+    get = script_map.get
+    # skip 80 byte header
+    tx_count, o = _varint(buf, start + 80)
+    for _ in range(tx_count):
+        tx_start = o
+        o += 4  # version
+        segwit = buf[o] == 0 and buf[o + 1] != 0
+        if segwit:
+            o += 2  # marker + flag
+        body_start = o
+        n_in = buf[o]
+        o += 1
+        if n_in >= 0xfd:
+            n_in, o = read_varint_at(buf, o - 1)
+        for _ in range(n_in):
+            o += 36  # previous output (txid + vout)
+            n = buf[o]
+            o += 1
+            if n >= 0xfd:
+                n, o = read_varint_at(buf, o - 1)
+            o += n + 4  # scriptSig + sequence
+        n_out = buf[o]
+        o += 1
+        if n_out >= 0xfd:
+            n_out, o = read_varint_at(buf, o - 1)
+        hits = None
+        for vout in range(n_out):
+            value_offset = o
+            o += 8
+            n = buf[o]
+            o += 1
+            if n >= 0xfd:
+                n, o = read_varint_at(buf, o - 1)
+            if n in lengths:
+                path = get(buf[o:o + n])
+                if path is not None:
+                    if hits is None:
+                        hits = []
+                    value = int.from_bytes(
+                        buf[value_offset:value_offset + 8], "little"
+                    )
+                    hits.append((vout, value, path))
+            o += n
+        body_end = o
+        if segwit:
+            for _ in range(n_in):
+                items, o = _varint(buf, o)
+                for _ in range(items):
+                    n, o = _varint(buf, o)
+                    o += n
+        o += 4  # locktime
+        if o > end:
+            raise ValueError("transaction exceeds block at {}".format(tx_start))
+        if hits:
+            # txid commits to serialization without marker, flag and witness
+            sha = hashlib.sha256
+            txid = sha(sha(
+                buf[tx_start:tx_start + 4] + buf[body_start:body_end] +
+                buf[o - 4:o]
+            ).digest()).digest()[::-1].hex()
+            for vout, value, path in hits:
+                yield BlockHit(txid, vout, value, path)
+
+
+def iter_blocks(buf: Union[bytes, mmap.mmap], magic: bytes = MAINNET_MAGIC
+                ) -> Generator[Tuple[int, int], None, None]:
+    """
+    Iterates over blocks stored in block file buffer. Stops at zero
+    padding Bitcoin Core preallocates at the end of files.
+
+    :param buf: block file buffer
+    :param magic: network magic (default=MAINNET_MAGIC)
+    :return: generator of (block start, block end) offsets
+    """
+    o = 0
+    size = len(buf)
+    while o + 8 <= size:
+        record_magic = buf[o:o + 4]
+        if record_magic != magic:
+            if record_magic == b"\x00\x00\x00\x00":
+                return
+            raise ValueError("invalid magic at offset {}".format(o))
+        length = int.from_bytes(buf[o + 4:o + 8], "little")
+        start = o + 8
+        o = start + length
+        if o > size:
+            raise ValueError("truncated block at offset {}".format(start))
+        yield start, o
+
+
+def scan_block_file(path: Union[str, os.PathLike], script_map: ScriptMap,
+                    magic: bytes = MAINNET_MAGIC, lengths: Set[int] = None
+                    ) -> Generator[BlockHit, None, None]:
+    """
+    Memory-maps block file and yields outputs paying to script map.
+
+    :param path: path to blk*.dat file
+    :param script_map: raw scriptPubKey -> path
+    :param magic: network magic (default=MAINNET_MAGIC)
+    :param lengths: script_lengths of script map
+                    (default=None - computed from script map)
+    :return: hit generator
+    """
+    if lengths is None:
+        lengths = script_lengths(script_map)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in iter_blocks(mm, magic=magic):
+                yield from scan_block(mm, start, end, script_map, lengths)
+
+
+# script map of worker process and its script lengths - sent (computed)
+# once per worker, not once per file
+_worker_script_map = None
+_worker_lengths = None
+
+
+def _init_worker(script_map: ScriptMap) -> None:
+    global _worker_script_map, _worker_lengths
+    _worker_script_map = script_map
+    _worker_lengths = script_lengths(script_map)
+
+
+def _scan_file_worker(path: str, magic: bytes) -> List[BlockHit]:
+    return list(scan_block_file(path, _worker_script_map, magic=magic,
+                                lengths=_worker_lengths))
+
+
+def scan_block_files(paths: Iterable[Union[str, os.PathLike]],
+                     script_map: ScriptMap, magic: bytes = MAINNET_MAGIC,
+                     workers: int = None
+                     ) -> Generator[BlockHit, None, None]:
+    """
+    Scans block files and yields outputs paying to script map, in file
+    order. With workers every file is scanned in separate worker process.
+
+    :param paths: paths to blk*.dat files
+    :param script_map: raw scriptPubKey -> path
+    :param magic: network magic (default=MAINNET_MAGIC)
+    :param workers: number of worker processes (default=None - no pool)
+    :return: hit generator
+    """
+    paths = [os.fspath(path) for path in paths]
+    if not workers or workers < 2 or len(paths) < 2:
+        lengths = script_lengths(script_map)
+        for path in paths:
+            yield from scan_block_file(path, script_map, magic=magic,
+                                       lengths=lengths)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(script_map,)) as executor:
+        for hits in executor.map(_scan_file_worker, paths,
+                                 [magic] * len(paths)):
+            yield from hits
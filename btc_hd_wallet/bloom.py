@@ -0,0 +1,301 @@
+"""
+BIP37 Bloom filter of wallet scripts.
+
+Filter follows BIP37 (murmur3 hash functions, filterload serialization),
+so it can be sent to light client peers as well as used to pre-filter
+scriptPubKeys locally. Same as BIP37 matching, data pushes of scripts
+are inserted and tested - for wallet scripts these are hash160 (p2pkh,
+p2wpkh, p2sh) and sha256 (p2wsh) programs.
+
+Murmur3 block mixing does not depend on seed, so for every inserted or
+tested element blocks are mixed only once and reused by all hash
+functions.
+"""
+
+import math
+import struct
+from typing import Iterable, List, Tuple, Union
+
+from btc_hd_wallet.bip32 import Prv_or_PubKeyNode
+from btc_hd_wallet.helper import (
+    hash160_records, encode_varint, read_varint_at
+)
+from btc_hd_wallet.script import (
+    Script, p2wpkh_script, p2pkh_script, iter_script_cmds
+)
+
+M32 = 0xFFFFFFFF
+
+MAX_BLOOM_FILTER_SIZE = 36000  # bytes
+MAX_HASH_FUNCS = 50
+BIP37_CONSTANT = 0xFBA4C795
+
+BLOOM_UPDATE_NONE = 0
+BLOOM_UPDATE_ALL = 1
+BLOOM_UPDATE_P2PUBKEY_ONLY = 2
+
+LN2 = math.log(2)
+LN2SQUARED = LN2 * LN2
+
+_WORD = struct.Struct("<I")
+
+
+def _murmur3_blocks(data: bytes) -> Tuple[List[int], int]:
+    """
+    Seed independent part of murmur3 - mixes 4 byte blocks and tail.
+
+    :param data: data
+    :return: mixed blocks and mixed tail (0 if there is no tail)
+    """
+    blocks = []
+    for (k,) in _WORD.iter_unpack(data[:len(data) & ~3]):
+        k = (k * 0xcc9e2d51) & M32
+        k = ((k << 15) | (k >> 17)) & M32
+        blocks.append((k * 0x1b873593) & M32)
+    tail = 0
+    if len(data) & 3:
+        k = int.from_bytes(data[len(data) & ~3:], "little")
+        k = (k * 0xcc9e2d51) & M32
+        k = ((k << 15) | (k >> 17)) & M32
+        tail = (k * 0x1b873593) & M32
+    return blocks, tail
+
+
+def _murmur3_finish(blocks: List[int], tail: int, length: int,
+                    seed: int) -> int:
+    """
+    Seed dependent part of murmur3.
+
+    :param blocks: mixed blocks
+    :param tail: mixed tail
+    :param length: data length
+    :param seed: seed
+    :return: 32 bit hash
+    """
+    h = seed
+    for k in blocks:
+        h ^= k
+        h = ((h << 13) | (h >> 19)) & M32
+        h = (h * 5 + 0xe6546b64) & M32
+    h ^= tail ^ length
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & M32
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & M32
+    return h ^ (h >> 16)
+
+
+def murmur3(data: bytes, seed: int = 0) -> int:
+    """
+    32 bit murmur3 (x86 variant) as used by BIP37.
+
+    :param data: data
+    :param seed: seed (default=0)
+    :return: 32 bit hash
+    """
+    blocks, tail = _murmur3_blocks(data)
+    return _murmur3_finish(blocks, tail, len(data), seed & M32)
+
+
+class BloomFilter(object):
+
+    __slots__ = (
+        "bits",
+        "hash_funcs",
+        "tweak",
+        "flags",
+        "_seeds",
+        "_nbits"
+    )
+
+    def __init__(self, size: int, hash_funcs: int, tweak: int = 0,
+                 flags: int = BLOOM_UPDATE_ALL):
+        """
+        Initializes empty filter.
+
+        :param size: filter size in bytes
+        :param hash_funcs: number of hash functions
+        :param tweak: random value added to hash function seeds
+                        (default=0)
+        :param flags: BIP37 nFlags - how peer updates filter on match
+                        (default=BLOOM_UPDATE_ALL)
+        """
+        if size < 1 or hash_funcs < 1:
+            raise ValueError("filter size and hash_funcs have to be positive")
+        self.bits = bytearray(size)
+        self.hash_funcs = hash_funcs
+        self.tweak = tweak & M32
+        self.flags = flags
+        self._nbits = size * 8
+        self._seeds = tuple(
+            (i * BIP37_CONSTANT + self.tweak) & M32 for i in range(hash_funcs)
+        )
+
+    @classmethod
+    def for_elements(cls, elements: int, fp_rate: float = 0.0001,
+                     tweak: int = 0, flags: int = BLOOM_UPDATE_ALL,
+                     bip37_limits: bool = True) -> "BloomFilter":
+        """
+        Creates filter sized for number of elements and false positive
+        rate (same formula as Bitcoin Core).
+
+        :param elements: expected number of elements
+        :param fp_rate: false positive rate (default=0.0001)
+        :param tweak: hash function seed tweak (default=0)
+        :param flags: BIP37 nFlags (default=BLOOM_UPDATE_ALL)
+        :param bip37_limits: whether to cap size at 36000 bytes and hash
+                                functions at 50 (default=True) - local only
+                                filters of big wallets should not be capped
+        :return: bloom filter
+        """
+        if elements < 1 or not 0 < fp_rate < 1:
+            raise ValueError("invalid number of elements or false positive rate")
+        nbits = int(-1 / LN2SQUARED * elements * math.log(fp_rate))
+        if bip37_limits:
+            nbits = min(nbits, MAX_BLOOM_FILTER_SIZE * 8)
+        size = max(nbits // 8, 1)
+        hash_funcs = max(int(size * 8 / elements * LN2), 1)
+        if bip37_limits:
+            hash_funcs = min(hash_funcs, MAX_HASH_FUNCS)
+        return cls(size, hash_funcs, tweak=tweak, flags=flags)
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def __contains__(self, data: bytes) -> bool:
+        return self.contains(data)
+
+    def __repr__(self) -> str:
+        return "BloomFilter(size={}, hash_funcs={}, tweak={}, flags={})".format(
+            len(self.bits), self.hash_funcs, self.tweak, self.flags
+        )
+
+    def add(self, data: Union[bytes, memoryview]) -> None:
+        """
+        Inserts element.
+
+        :param data: element
+        """
+        bits, nbits = self.bits, self._nbits
+        blocks, tail = _murmur3_blocks(data)
+        length = len(data)
+        for seed in self._seeds:
+            i = _murmur3_finish(blocks, tail, length, seed) % nbits
+            bits[i >> 3] |= 1 << (i & 7)
+
+    def add_many(self, items: Iterable[Union[bytes, memoryview]]) -> None:
+        """
+        Inserts many elements.
+
+        :param items: elements
+        """
+        for data in items:
+            self.add(data)
+
+    def contains(self, data: Union[bytes, memoryview]) -> bool:
+        """
+        Tests element. Stops at first hash function with unset bit.
+
+        :param data: element
+        :return: False if element was surely not inserted, True if it
+                    was inserted or on false positive
+        """
+        bits, nbits = self.bits, self._nbits
+        blocks, tail = _murmur3_blocks(data)
+        length = len(data)
+        for seed in self._seeds:
+            i = _murmur3_finish(blocks, tail, length, seed) % nbits
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+        return True
+
+    def contains_many(self, items: Iterable[Union[bytes, memoryview]]
+                      ) -> List[bool]:
+        """
+        Tests many elements.
+
+        :param items: elements
+        :return: test results in input order
+        """
+        contains = self.contains
+        return [contains(data) for data in items]
+
+    def add_script(self, script: Union[Script, bytes]) -> None:
+        """
+        Inserts all data pushes of script (as BIP37 peers match them).
+
+        :param script: script or raw (not length prefixed) script
+        """
+        if isinstance(script, Script):
+            script = script.raw_serialize()
+        for cmd in iter_script_cmds(script):
+            if not isinstance(cmd, int):
+                self.add(cmd)
+
+    def match_script(self, script: Union[bytes, memoryview]) -> bool:
+        """
+        Tests whether any data push of raw scriptPubKey matches filter.
+
+        :param script: raw (not length prefixed) script
+        :return: whether script may pay to filtered wallet
+        """
+        try:
+            for cmd in iter_script_cmds(script):
+                if not isinstance(cmd, int) and self.contains(cmd):
+                    return True
+        except SyntaxError:
+            pass
+        return False
+
+    def add_node(self, node: Prv_or_PubKeyNode, interval: tuple = (0, 20),
+                 script_types: Iterable[str] = ("p2wpkh",)) -> None:
+        """
+        Derives children of (chain) node and inserts their scriptPubKeys.
+
+        :param node: key node (e.g. external chain m/84'/0'/0'/0)
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :param script_types: any of p2pkh, p2wpkh (default=("p2wpkh",))
+        """
+        script_fncs = {"p2pkh": p2pkh_script, "p2wpkh": p2wpkh_script}
+        fncs = []
+        for script_type in script_types:
+            if script_type not in script_fncs:
+                raise ValueError(
+                    "Unsupported script type {}".format(script_type)
+                )
+            fncs.append(script_fncs[script_type])
+        records = node.batch_ckd(interval=interval)
+        h160s = hash160_records(b"".join(r.key for r in records), 33)
+        for i in range(0, len(h160s), 20):
+            for fnc in fncs:
+                self.add_script(fnc(h160s[i:i + 20]))
+
+    def filterload_payload(self) -> bytes:
+        """
+        Serializes filter as BIP37 filterload message payload.
+
+        :return: filterload payload
+        """
+        return (
+            encode_varint(len(self.bits)) + bytes(self.bits) +
+            struct.pack("<IIB", self.hash_funcs, self.tweak, self.flags)
+        )
+
+    @classmethod
+    def parse_filterload(cls, payload: bytes) -> "BloomFilter":
+        """
+        Parses BIP37 filterload message payload.
+
+        :param payload: filterload payload
+        :return: bloom filter
+        """
+        size, offset = read_varint_at(payload)
+        if len(payload) != offset + size + 9:
+            raise ValueError("invalid filterload payload length")
+        hash_funcs, tweak, flags = struct.unpack_from(
+            "<IIB", payload, offset + size
+        )
+        bloom = cls(size, hash_funcs, tweak=tweak, flags=flags)
+        bloom.bits[:] = payload[offset:offset + size]
+        return bloom
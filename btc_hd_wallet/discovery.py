@@ -0,0 +1,304 @@
+"""
+BIP44 account discovery with gap limit.
+
+Addresses of chain are derived in lookahead windows (batch public
+derivation) and checked by pluggable history backend. Backend queries
+of window are sent concurrently, external and internal chains of account
+are scanned concurrently too. Chain scan stops once gap limit of unused
+addresses after last used one is reached, account discovery stops at
+first account without used external address.
+
+Backends subclass HistoryBackend and implement coroutine
+has_history(addresses) returning list of booleans (e.g. electrum server
+or block explorer client).
+MemoryHistoryBackend serves as local stand-in.
+"""
+
+import abc
+import asyncio
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Generator, Iterable, List, NamedTuple, Optional, Tuple
+
+from btc_hd_wallet.base_wallet import BaseWallet
+from btc_hd_wallet.bip32 import PubKeyNode, Prv_or_PubKeyNode, HARDENED
+from btc_hd_wallet.parallel import derive_range
+
+
+DEFAULT_GAP_LIMIT = 20
+DEFAULT_WINDOW = 100
+DEFAULT_QUERY_SIZE = 50
+DEFAULT_CONCURRENCY = 8
+
+PURPOSE_ADDR_TYPES = {44: "p2pkh", 84: "p2wpkh"}
+
+
+class ChainResult(NamedTuple):
+    path: str
+    # (index, address) of used addresses
+    used: List[Tuple[int, str]]
+    # first index after last used address
+    next_index: int
+
+
+class AccountResult(NamedTuple):
+    account: int
+    path: str
+    external: ChainResult
+    internal: ChainResult
+
+
+class HistoryBackend(abc.ABC):
+    """Interface of history backend."""
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    async def has_history(self, addresses: List[str]) -> List[bool]:
+        """
+        Checks whether addresses have any transaction history.
+
+        :param addresses: addresses
+        :return: whether address at the same position has history
+        """
+
+
+class MemoryHistoryBackend(HistoryBackend):
+    """In-memory backend - set of used addresses."""
+
+    __slots__ = (
+        "used",
+        "delay",
+        "queries"
+    )
+
+    def __init__(self, used: Iterable[str] = (), delay: float = 0.0):
+        """
+        Initializes backend.
+
+        :param used: addresses with history
+        :param delay: simulated latency of each query in seconds
+                        (default=0.0)
+        """
+        self.used = set(used)
+        self.delay = delay
+        # number of has_history calls
+        self.queries = 0
+
+    async def has_history(self, addresses: List[str]) -> List[bool]:
+        self.queries += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [address in self.used for address in addresses]
+
+
+@contextlib.contextmanager
+def _process_pool(workers: int, executor: Optional[ProcessPoolExecutor]
+                  ) -> Generator[Optional[ProcessPoolExecutor], None, None]:
+    """
+    Provides process pool for whole discovery run. Existing executor is
+    passed through, no pool is started for single worker.
+
+    :param workers: number of derivation worker processes
+    :param executor: existing process pool
+    :return: process pool or None (derive in current process)
+    """
+    if executor is not None or workers < 2:
+        yield executor
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
+
+
+async def _derive_window(node: PubKeyNode, start: int, stop: int,
+                         addr_type: str, workers: int,
+                         executor: Optional[ProcessPoolExecutor]
+                         ) -> List[Tuple[int, str]]:
+    """
+    Derives window of addresses in thread so that event loop keeps
+    serving backend queries of other chains. With executor window is
+    split among its worker processes.
+
+    :param node: public chain node
+    :param start: first index
+    :param stop: stop index (exclusive)
+    :param addr_type: address type
+    :param workers: number of derivation worker processes
+    :param executor: process pool (None - derive in current process)
+    :return: list of (index, address)
+    """
+    if executor is None:
+        workers = 1
+    chunk_size = -(-(stop - start) // workers)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        lambda: list(derive_range(node, (start, stop), addr_type=addr_type,
+                                  workers=workers, chunk_size=chunk_size,
+                                  executor=executor))
+    )
+
+
+async def discover_chain(node: Prv_or_PubKeyNode, backend: HistoryBackend,
+                         gap_limit: int = DEFAULT_GAP_LIMIT,
+                         addr_type: str = "p2wpkh",
+                         window: int = DEFAULT_WINDOW,
+                         query_size: int = DEFAULT_QUERY_SIZE,
+                         semaphore: asyncio.Semaphore = None,
+                         workers: int = 1,
+                         executor: ProcessPoolExecutor = None) -> ChainResult:
+    """
+    Discovers used addresses of chain.
+
+    :param node: chain node (e.g. m/84'/0'/0'/0)
+    :param backend: history backend
+    :param gap_limit: number of consecutive unused addresses after last
+                        used one that ends the scan (default=20)
+    :param addr_type: address type p2pkh/p2wpkh (default=p2wpkh)
+    :param window: number of addresses derived at once (default=100)
+    :param query_size: number of addresses in one backend query
+                        (default=50)
+    :param semaphore: limits concurrent backend queries (default=None -
+                        DEFAULT_CONCURRENCY queries of this chain)
+    :param workers: number of derivation worker processes (default=1)
+    :param executor: process pool shared by all windows (default=None -
+                        started for this chain if workers > 1)
+    :return: chain result
+    """
+    if gap_limit < 1 or window < 1 or query_size < 1:
+        raise ValueError(
+            "gap_limit, window and query_size have to be positive"
+        )
+    semaphore = semaphore or asyncio.Semaphore(DEFAULT_CONCURRENCY)
+    # only public derivation is needed - it can be batched
+    pub = PubKeyNode.parse(node.serialize_public(), testnet=node.testnet)
+
+    async def query(addresses: List[str]) -> List[bool]:
+        async with semaphore:
+            return await backend.has_history(addresses)
+
+    with _process_pool(workers, executor) as executor:
+        used = []
+        last_used = -1
+        start = 0
+        while start < HARDENED:
+            stop = min(start + max(window, gap_limit), HARDENED)
+            children = await _derive_window(pub, start, stop, addr_type,
+                                            workers, executor)
+            addresses = [address for _, address in children]
+            results = await asyncio.gather(*[
+                query(addresses[i:i + query_size])
+                for i in range(0, len(addresses), query_size)
+            ])
+            flags = [flag for result in results for flag in result]
+            if len(flags) != len(addresses):
+                raise ValueError("backend returned wrong number of results")
+            for (index, address), flag in zip(children, flags):
+                if index - last_used > gap_limit:
+                    # gap limit reached - later results are not looked at
+                    return ChainResult(str(node), used, last_used + 1)
+                if flag:
+                    used.append((index, address))
+                    last_used = index
+            start = stop
+        return ChainResult(str(node), used, last_used + 1)
+
+
+async def discover_account(account_node: Prv_or_PubKeyNode,
+                           backend: HistoryBackend,
+                           gap_limit: int = DEFAULT_GAP_LIMIT,
+                           addr_type: str = "p2wpkh",
+                           window: int = DEFAULT_WINDOW,
+                           query_size: int = DEFAULT_QUERY_SIZE,
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           workers: int = 1,
+                           executor: ProcessPoolExecutor = None
+                           ) -> AccountResult:
+    """
+    Discovers external and internal chain of account concurrently.
+    Works with account extended public key too (watch-only).
+
+    :param account_node: account node (e.g. m/84'/0'/0')
+    :param backend: history backend
+    :param gap_limit: gap limit (default=20)
+    :param addr_type: address type p2pkh/p2wpkh (default=p2wpkh)
+    :param window: number of addresses derived at once (default=100)
+    :param query_size: number of addresses in one backend query
+                        (default=50)
+    :param concurrency: maximum number of concurrent backend queries
+                        (default=8)
+    :param workers: number of derivation worker processes (default=1)
+    :param executor: process pool shared by all windows (default=None -
+                        started for this account if workers > 1)
+    :return: account result
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    with _process_pool(workers, executor) as executor:
+        external, internal = await asyncio.gather(*[
+            discover_chain(
+                account_node.ckd(index=chain, retain=False), backend,
+                gap_limit=gap_limit, addr_type=addr_type, window=window,
+                query_size=query_size, semaphore=semaphore, workers=workers,
+                executor=executor
+            )
+            for chain in (0, 1)
+        ])
+    account = account_node.index
+    if account >= HARDENED:
+        account -= HARDENED
+    return AccountResult(account, str(account_node), external, internal)
+
+
+async def discover(wallet: BaseWallet, backend: HistoryBackend,
+                   purpose: int = 84, coin_type: Optional[int] = None,
+                   gap_limit: int = DEFAULT_GAP_LIMIT,
+                   addr_type: Optional[str] = None,
+                   max_accounts: int = 100,
+                   window: int = DEFAULT_WINDOW,
+                   query_size: int = DEFAULT_QUERY_SIZE,
+                   concurrency: int = DEFAULT_CONCURRENCY,
+                   workers: int = 1) -> List[AccountResult]:
+    """
+    BIP44 account discovery - scans accounts m/purpose'/coin_type'/n'
+    from 0 until first account without used external address.
+
+    :param wallet: wallet (with private master key)
+    :param backend: history backend
+    :param purpose: purpose - 44 or 84 (default=84)
+    :param coin_type: coin type (default=None - 1 for testnet wallet
+                        otherwise 0)
+    :param gap_limit: gap limit (default=20)
+    :param addr_type: address type (default=None - derived from purpose)
+    :param max_accounts: maximum number of accounts to scan (default=100)
+    :param window: number of addresses derived at once (default=100)
+    :param query_size: number of addresses in one backend query
+                        (default=50)
+    :param concurrency: maximum number of concurrent backend queries
+                        (default=8)
+    :param workers: number of derivation worker processes - single pool
+                        is used for whole run (default=1)
+    :return: used accounts
+    """
+    if addr_type is None:
+        if purpose not in PURPOSE_ADDR_TYPES:
+            raise ValueError("addr_type required for purpose {}".format(
+                purpose
+            ))
+        addr_type = PURPOSE_ADDR_TYPES[purpose]
+    if coin_type is None:
+        coin_type = 1 if wallet.testnet else 0
+    accounts = []
+    with _process_pool(workers, None) as executor:
+        for account in range(max_accounts):
+            account_node = wallet.by_path(
+                "m/{}'/{}'/{}'".format(purpose, coin_type, account)
+            )
+            result = await discover_account(
+                account_node, backend, gap_limit=gap_limit,
+                addr_type=addr_type, window=window, query_size=query_size,
+                concurrency=concurrency, workers=workers, executor=executor
+            )
+            if not result.external.used:
+                break
+            accounts.append(result)
+    return accounts
@@ -0,0 +1,567 @@
+"""
+Elliptic curve arithmetic on secp256k1.
+
+Points are represented as affine (x, y) tuples of plain integers and
+the point at infinity as None. Backend is chosen at import time: first
+available of coincurve, gmpy2 and pure python (always available).
+Environment variable BTC_HD_WALLET_EC_BACKEND can be used to force
+specific backend - if it names unknown or not installed backend, warning
+is issued and backend is chosen automatically.
+"""
+import os
+import warnings
+from typing import List, Optional, Tuple
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+try:
+    import coincurve
+except ImportError:
+    coincurve = None
+
+
+Point = Optional[Tuple[int, int]]
+JacobianPoint = Optional[Tuple[int, int, int]]
+
+# field order
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+# curve order
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+# generator
+G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+)
+# curve equation y^2 = x^3 + 7
+B = 7
+# bit width of fixed-base window for generator multiplication
+BASE_WINDOW = 8
+
+
+try:
+    pow(2, -1, 3)
+
+    def inverse_mod(a: int, m: int) -> int:
+        """
+        Modular multiplicative inverse.
+
+        :param a: integer
+        :param m: modulus
+        :return: inverse of a modulo m
+        """
+        return pow(a, -1, m)
+except ValueError:
+    # python < 3.8 - modulus is prime in all our use cases
+    def inverse_mod(a: int, m: int) -> int:
+        """
+        Modular multiplicative inverse.
+
+        :param a: integer
+        :param m: prime modulus
+        :return: inverse of a modulo m
+        """
+        return pow(a, m - 2, m)
+
+
+class PythonBackend(object):
+    """secp256k1 arithmetic on plain integers in Jacobian coordinates."""
+
+    name = "python"
+
+    def __init__(self):
+        self.p = P
+        self.n = N
+        self.g = G
+        # fixed-base table for generator (built lazily on first use)
+        self._base_table = None
+
+    def _inverse(self, a: int) -> int:
+        return inverse_mod(a, self.p)
+
+    def _int(self, a) -> int:
+        return a
+
+    def jacobian_double(self, p1: JacobianPoint) -> JacobianPoint:
+        """
+        Doubles point in Jacobian coordinates.
+
+        :param p1: point
+        :return: 2 * p1
+        """
+        if p1 is None:
+            return None
+        x1, y1, z1 = p1
+        if not y1:
+            return None
+        p = self.p
+        yy = y1 * y1 % p
+        s = 4 * x1 * yy % p
+        m = 3 * x1 * x1 % p
+        x3 = (m * m - 2 * s) % p
+        y3 = (m * (s - x3) - 8 * yy * yy) % p
+        z3 = 2 * y1 * z1 % p
+        return x3, y3, z3
+
+    def jacobian_add_affine(self, p1: JacobianPoint,
+                            p2: Point) -> JacobianPoint:
+        """
+        Adds affine point to point in Jacobian coordinates.
+
+        :param p1: point in Jacobian coordinates
+        :param p2: affine point
+        :return: p1 + p2 in Jacobian coordinates
+        """
+        if p1 is None:
+            return None if p2 is None else (p2[0], p2[1], 1)
+        if p2 is None:
+            return p1
+        p = self.p
+        x1, y1, z1 = p1
+        x2, y2 = p2
+        z1z1 = z1 * z1 % p
+        h = (x2 * z1z1 - x1) % p
+        r = (y2 * z1 * z1z1 - y1) % p
+        if not h:
+            if not r:
+                return self.jacobian_double(p1)
+            return None
+        hh = h * h % p
+        hhh = h * hh % p
+        v = x1 * hh % p
+        x3 = (r * r - hhh - 2 * v) % p
+        y3 = (r * (v - x3) - y1 * hhh) % p
+        z3 = z1 * h % p
+        return x3, y3, z3
+
+    def jacobian_add(self, p1: JacobianPoint,
+                     p2: JacobianPoint) -> JacobianPoint:
+        """
+        Adds two points in Jacobian coordinates.
+
+        :param p1: point
+        :param p2: point
+        :return: p1 + p2
+        """
+        if p1 is None:
+            return p2
+        if p2 is None:
+            return p1
+        p = self.p
+        x1, y1, z1 = p1
+        x2, y2, z2 = p2
+        z1z1 = z1 * z1 % p
+        z2z2 = z2 * z2 % p
+        u1 = x1 * z2z2 % p
+        u2 = x2 * z1z1 % p
+        s1 = y1 * z2 * z2z2 % p
+        s2 = y2 * z1 * z1z1 % p
+        h = (u2 - u1) % p
+        r = (s2 - s1) % p
+        if not h:
+            if not r:
+                return self.jacobian_double(p1)
+            return None
+        hh = h * h % p
+        hhh = h * hh % p
+        v = u1 * hh % p
+        x3 = (r * r - hhh - 2 * v) % p
+        y3 = (r * (v - x3) - s1 * hhh) % p
+        z3 = z1 * z2 * h % p
+        return x3, y3, z3
+
+    def to_affine(self, p1: JacobianPoint) -> Point:
+        """
+        Converts point in Jacobian coordinates to affine coordinates.
+
+        :param p1: point in Jacobian coordinates
+        :return: affine point
+        """
+        if p1 is None:
+            return None
+        p = self.p
+        x1, y1, z1 = p1
+        z_inv = self._inverse(z1)
+        zz_inv = z_inv * z_inv % p
+        return (
+            self._int(x1 * zz_inv % p),
+            self._int(y1 * zz_inv * z_inv % p)
+        )
+
+    def batch_to_affine(self, points: List[JacobianPoint]) -> List[Point]:
+        """
+        Converts many points in Jacobian coordinates to affine coordinates
+        with single modular inversion (Montgomery's trick).
+
+        :param points: points in Jacobian coordinates
+        :return: affine points
+        """
+        p = self.p
+        # prefix products of all non-infinity z coordinates
+        prefix = []
+        acc = 1
+        for point in points:
+            if point is not None:
+                acc = acc * point[2] % p
+            prefix.append(acc)
+        acc_inv = self._inverse(acc)
+        result = [None] * len(points)
+        for i in range(len(points) - 1, -1, -1):
+            point = points[i]
+            if point is None:
+                continue
+            x1, y1, z1 = point
+            # inverse of z1 = (inverse of all up to i) * (all up to i - 1)
+            z_inv = acc_inv * (prefix[i - 1] if i else 1) % p
+            acc_inv = acc_inv * z1 % p
+            zz_inv = z_inv * z_inv % p
+            result[i] = (
+                self._int(x1 * zz_inv % p),
+                self._int(y1 * zz_inv * z_inv % p)
+            )
+        return result
+
+    def _build_base_table(self) -> List[Point]:
+        """
+        Builds fixed-base table for generator multiplication. Table is
+        flat list where entry at w * (2 ** BASE_WINDOW) + d is affine point
+        d * (2 ** (BASE_WINDOW * w)) * G.
+
+        :return: fixed-base table
+        """
+        size = 1 << BASE_WINDOW
+        windows = -(-self.n.bit_length() // BASE_WINDOW)
+        jacobian = []
+        base = self.g
+        for _ in range(windows):
+            jacobian.append(None)
+            point = (base[0], base[1], 1)
+            for _ in range(size - 1):
+                jacobian.append(point)
+                point = self.jacobian_add_affine(point, base)
+            # point is now size * base - base of next window
+            base = self.to_affine(point)
+        return self.batch_to_affine(jacobian)
+
+    def _point_mul_base_generic(self, k: int) -> JacobianPoint:
+        """
+        Multiplies generator by scalar using fixed-base table
+        and generic mixed addition.
+
+        :param k: scalar
+        :return: k * G in Jacobian coordinates
+        """
+        table = self._base_table
+        mask = (1 << BASE_WINDOW) - 1
+        result = None
+        offset = 0
+        while k:
+            digit = k & mask
+            if digit:
+                result = self.jacobian_add_affine(result, table[offset + digit])
+            k >>= BASE_WINDOW
+            offset += mask + 1
+        return result
+
+    def point_mul_base_jacobian(self, k: int) -> JacobianPoint:
+        """
+        Multiplies generator by scalar using precomputed fixed-base table.
+        Result is left in Jacobian coordinates.
+
+        :param k: scalar
+        :return: k * G in Jacobian coordinates
+        """
+        table = self._base_table
+        if table is None:
+            table = self._base_table = self._build_base_table()
+        k %= self.n
+        if not k:
+            return None
+        p = self.p
+        mask = (1 << BASE_WINDOW) - 1
+        rest = k
+        offset = 0
+        # lowest non-zero digit is the starting point
+        while not rest & mask:
+            rest >>= BASE_WINDOW
+            offset += mask + 1
+        x1, y1 = table[offset + (rest & mask)]
+        z1 = 1
+        rest >>= BASE_WINDOW
+        offset += mask + 1
+        while rest:
+            digit = rest & mask
+            if digit:
+                # mixed addition inlined - this is the hot loop
+                x2, y2 = table[offset + digit]
+                z1z1 = z1 * z1 % p
+                h = (x2 * z1z1 - x1) % p
+                if not h:
+                    # doubling or infinity, practically unreachable
+                    return self._point_mul_base_generic(k)
+                r = (y2 * z1 * z1z1 - y1) % p
+                hh = h * h % p
+                hhh = h * hh % p
+                v = x1 * hh % p
+                x1 = (r * r - hhh - 2 * v) % p
+                y1 = (r * (v - x1) - y1 * hhh) % p
+                z1 = z1 * h % p
+            rest >>= BASE_WINDOW
+            offset += mask + 1
+        return x1, y1, z1
+
+    def point_mul(self, k: int, point: Point) -> Point:
+        """
+        Multiplies point by scalar.
+
+        :param k: scalar
+        :param point: affine point
+        :return: k * point
+        """
+        if point == self.g:
+            return self.point_mul_base(k)
+        k %= self.n
+        if not k or point is None:
+            return None
+        # fixed 4-bit window: table[i] = i * point
+        table = [None, (point[0], point[1], 1)]
+        for _ in range(14):
+            table.append(self.jacobian_add_affine(table[-1], point))
+        result = None
+        for shift in range((k.bit_length() - 1) & ~3, -1, -4):
+            for _ in range(4):
+                result = self.jacobian_double(result)
+            result = self.jacobian_add(result, table[(k >> shift) & 0xf])
+        return self.to_affine(result)
+
+    def point_mul_base(self, k: int) -> Point:
+        """
+        Multiplies generator by scalar.
+
+        :param k: scalar
+        :return: k * G
+        """
+        return self.to_affine(self.point_mul_base_jacobian(k))
+
+    def point_add(self, p1: Point, p2: Point) -> Point:
+        """
+        Adds two affine points.
+
+        :param p1: affine point
+        :param p2: affine point
+        :return: p1 + p2
+        """
+        if p1 is None:
+            return p2
+        return self.to_affine(
+            self.jacobian_add_affine((p1[0], p1[1], 1), p2)
+        )
+
+    def tweak_add(self, point: Point, tweak: int) -> Point:
+        """
+        Adds tweak multiple of generator to point.
+
+        :param point: affine point
+        :param tweak: scalar
+        :return: point + tweak * G
+        """
+        return self.to_affine(
+            self.jacobian_add_affine(self.point_mul_base_jacobian(tweak), point)
+        )
+
+    def tweak_add_batch(self, point: Point, tweaks: List[int]) -> List[Point]:
+        """
+        Adds many tweak multiples of generator to the same point. All sums
+        are kept in Jacobian coordinates and normalized together with
+        single modular inversion.
+
+        :param point: affine point
+        :param tweaks: scalars
+        :return: point + tweak * G for every tweak
+        """
+        add = self.jacobian_add_affine
+        mul = self.point_mul_base_jacobian
+        return self.batch_to_affine([add(mul(t), point) for t in tweaks])
+
+    @staticmethod
+    def sec_encode(point: Point, compressed: bool = True) -> bytes:
+        """
+        Encodes point to SEC format.
+
+        :param point: affine point
+        :param compressed: whether to use compressed format (default=True)
+        :return: SEC encoded point
+        """
+        if point is None:
+            raise ValueError("point at infinity can not be encoded")
+        x, y = point
+        if compressed:
+            return (b"\x03" if y & 1 else b"\x02") + x.to_bytes(32, "big")
+        return b"\x04" + x.to_bytes(32, "big") + y.to_bytes(32, "big")
+
+    @staticmethod
+    def sec_decode(data: bytes) -> Point:
+        """
+        Decodes point from SEC format.
+
+        :param data: SEC encoded point
+        :return: affine point
+        """
+        prefix = data[0] if data else None
+        if prefix == 4 and len(data) == 65:
+            x = int.from_bytes(data[1:33], "big")
+            y = int.from_bytes(data[33:], "big")
+            if x >= P or y >= P or (y * y - x * x * x - B) % P:
+                raise ValueError("point is not on curve")
+            return x, y
+        if prefix in (2, 3) and len(data) == 33:
+            x = int.from_bytes(data[1:], "big")
+            if x >= P:
+                raise ValueError("point is not on curve")
+            y2 = (x * x * x + B) % P
+            y = pow(y2, (P + 1) // 4, P)
+            if y * y % P != y2:
+                raise ValueError("point is not on curve")
+            if (y & 1) != (prefix & 1):
+                y = P - y
+            return x, y
+        raise ValueError("invalid SEC encoding")
+
+
+class Gmpy2Backend(PythonBackend):
+    """Same algorithms as python backend computed on gmpy2 integers."""
+
+    name = "gmpy2"
+
+    def __init__(self):
+        if gmpy2 is None:
+            raise ImportError("gmpy2 is not installed")
+        super().__init__()
+        self.p = gmpy2.mpz(P)
+
+    def _inverse(self, a: int) -> int:
+        return gmpy2.invert(a, self.p)
+
+    def _int(self, a) -> int:
+        return int(a)
+
+
+class CoincurveBackend(PythonBackend):
+    """Scalar multiplication and point addition done by libsecp256k1."""
+
+    name = "coincurve"
+
+    def __init__(self):
+        if coincurve is None:
+            raise ImportError("coincurve is not installed")
+        super().__init__()
+
+    @staticmethod
+    def _to_point(key: "coincurve.PublicKey") -> Point:
+        data = key.format(compressed=False)
+        return int.from_bytes(data[1:33], "big"), int.from_bytes(data[33:], "big")
+
+    def _to_key(self, point: Point) -> "coincurve.PublicKey":
+        return coincurve.PublicKey(self.sec_encode(point, compressed=False))
+
+    def point_mul(self, k: int, point: Point) -> Point:
+        k %= self.n
+        if not k or point is None:
+            return None
+        return self._to_point(
+            self._to_key(point).multiply(k.to_bytes(32, "big"))
+        )
+
+    def point_mul_base(self, k: int) -> Point:
+        k %= self.n
+        if not k:
+            return None
+        return self._to_point(
+            coincurve.PublicKey.from_secret(k.to_bytes(32, "big"))
+        )
+
+    def point_add(self, p1: Point, p2: Point) -> Point:
+        if p1 is None:
+            return p2
+        if p2 is None:
+            return p1
+        try:
+            return self._to_point(
+                coincurve.PublicKey.combine_keys(
+                    [self._to_key(p1), self._to_key(p2)]
+                )
+            )
+        except ValueError:
+            # sum is point at infinity
+            return None
+
+    def tweak_add(self, point: Point, tweak: int) -> Point:
+        tweak %= self.n
+        if not tweak:
+            return point
+        try:
+            return self._to_point(
+                self._to_key(point).add(tweak.to_bytes(32, "big"))
+            )
+        except ValueError:
+            return None
+
+    def tweak_add_batch(self, point: Point, tweaks: List[int]) -> List[Point]:
+        return [self.tweak_add(point, tweak) for tweak in tweaks]
+
+
+BACKENDS = {
+    CoincurveBackend.name: CoincurveBackend,
+    Gmpy2Backend.name: Gmpy2Backend,
+    PythonBackend.name: PythonBackend,
+}
+
+
+def get_backend(name: str = None) -> PythonBackend:
+    """
+    Initializes elliptic curve backend. If name is not provided, first
+    available backend is chosen (coincurve, gmpy2, python).
+
+    :param name: backend name (default=None)
+    :return: elliptic curve backend
+    """
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError("unknown backend {} (one of {})".format(
+                name, ", ".join(BACKENDS)
+            ))
+        return BACKENDS[name]()
+    for backend_cls in BACKENDS.values():
+        try:
+            return backend_cls()
+        except ImportError:
+            continue
+    return PythonBackend()
+
+
+BACKEND_ENV_VAR = "BTC_HD_WALLET_EC_BACKEND"
+
+
+def _env_backend() -> PythonBackend:
+    """
+    Initializes backend forced by environment variable or first available.
+    Import of package must not fail because of bad environment variable,
+    so unusable backend only issues warning.
+
+    :return: elliptic curve backend
+    """
+    name = os.environ.get(BACKEND_ENV_VAR) or None
+    try:
+        return get_backend(name)
+    except (ValueError, ImportError) as e:
+        warnings.warn(
+            "{}={} cannot be used ({}), choosing backend "
+            "automatically".format(BACKEND_ENV_VAR, name, e),
+            RuntimeWarning
+        )
+        return get_backend()
+
+
+backend = _env_backend()
@@ -1,13 +1,46 @@
 import hmac
 import hashlib
+import itertools
 from io import BytesIO
-from typing import List, Any, Generator
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    List, Any, Generator, Callable, NamedTuple, Optional, Iterable, Union,
+    Tuple
+)
 
 import btc_hd_wallet.bech32 as bech32
+from btc_hd_wallet.ripemd160 import (
+    ripemd160 as python_ripemd160, ripemd160_batch as python_ripemd160_batch
+)
+
+try:
+    # OpenSSL 3 does not provide ripemd160 in its default provider
+    hashlib.new("ripemd160")
+    HASHLIB_RIPEMD160 = True
+except ValueError:
+    HASHLIB_RIPEMD160 = False
 
 
 BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
 TWO_WEEKS = 60 * 60 * 24 * 14
+# batch functions only fan out to processes for inputs bigger than this
+BATCH_CHUNK_SIZE = 10000
+# base58 digits processed per big integer operation
+BASE58_CHUNK_DIGITS = 10
+BASE58_CHUNK = 58 ** BASE58_CHUNK_DIGITS
+# two character strings for every value in range(58 * 58)
+BASE58_PAIRS = [a + b for a in BASE58_ALPHABET for b in BASE58_ALPHABET]
+# bytes.translate table: ascii character -> digit value, 0xff if invalid
+BASE58_DECODE_TABLE = bytes(
+    BASE58_ALPHABET.index(chr(c)) if chr(c) in BASE58_ALPHABET else 0xff
+    for c in range(256)
+)
+
+
+class Base58CheckResult(NamedTuple):
+    data: Optional[bytes]
+    error: Optional[str]
 
 
 def chunks(lst: List[Any], n: int) -> Generator[List[Any], None, None]:
@@ -16,26 +49,90 @@ def chunks(lst: List[Any], n: int) -> Generator[List[Any], None, None]:
         yield lst[i:i + n]
 
 
+def map_chunks(fnc: Callable[[List[Any]], List[Any]], items: List[Any],
+               workers: int = None, chunk_size: int = BATCH_CHUNK_SIZE
+               ) -> List[Any]:
+    """
+    Applies list-in/list-out function to items. If workers is bigger
+    than one and there is more than one chunk of items, chunks are
+    processed in process pool. Order of results is preserved.
+
+    :param fnc: picklable (module level) list-in/list-out function
+    :param items: items to process
+    :param workers: number of worker processes (default=None - no pool)
+    :param chunk_size: number of items sent to worker at once
+                        (default=BATCH_CHUNK_SIZE)
+    :return: results
+    """
+    items = list(items)
+    if not workers or workers < 2 or len(items) <= chunk_size:
+        return fnc(items)
+    result = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for part in executor.map(fnc, chunks(items, chunk_size)):
+            result.extend(part)
+    return result
+
+
+def imap_chunks(fnc: Callable[[List[Any]], List[Any]], items: Iterable[Any],
+                workers: int = None, chunk_size: int = BATCH_CHUNK_SIZE
+                ) -> Generator[Any, None, None]:
+    """
+    Streaming version of map_chunks. Items are consumed lazily chunk by
+    chunk and results are yielded in input order, with at most two chunks
+    per worker in flight.
+
+    :param fnc: picklable (module level) list-in/list-out function
+    :param items: items to process (any iterable)
+    :param workers: number of worker processes (default=None - no pool)
+    :param chunk_size: number of items sent to worker at once
+                        (default=BATCH_CHUNK_SIZE)
+    :return: results generator
+    """
+    items = iter(items)
+    parts = iter(lambda: list(itertools.islice(items, chunk_size)), [])
+    if not workers or workers < 2:
+        for part in parts:
+            yield from fnc(part)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for part in parts:
+                pending.append(executor.submit(fnc, part))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def encode_base58(data: bytes) -> str:
     """
     Encode base58.
 
+    Number is divided by 58^10 so that big integer division happens once
+    per ten output characters, each 10 digit chunk is then rendered from
+    precomputed two character table.
+
     :param data: data to encode
     :return: base58 encoded string
     """
-    count = 0
-    for c in data:
-        if c == 0:
-            count += 1
-        else:
-            break
-    num = int.from_bytes(data, 'big')
-    prefix = '1' * count
-    result = ''
+    # leading zero bytes are encoded as leading '1' characters
+    count = len(data) - len(data.lstrip(b"\x00"))
+    num = int.from_bytes(data, "big")
+    pairs = BASE58_PAIRS
+    parts = []
     while num > 0:
-        num, mod = divmod(num, 58)
-        result = BASE58_ALPHABET[mod] + result
-    return prefix + result
+        num, chunk = divmod(num, BASE58_CHUNK)
+        for _ in range(BASE58_CHUNK_DIGITS // 2):
+            chunk, pair = divmod(chunk, 58 * 58)
+            parts.append(pairs[pair])
+    parts.reverse()
+    # most significant chunk is zero padded - strip it
+    return "1" * count + "".join(parts).lstrip("1")
 
 
 def encode_base58_checksum(data: bytes) -> str:
@@ -55,27 +152,31 @@ def decode_base58(s: str) -> bytes:
     :param s: base58 encoded string
     :return: decoded data
     """
+    try:
+        digits = s.encode("ascii").translate(BASE58_DECODE_TABLE)
+    except UnicodeEncodeError:
+        digits = b"\xff"
+    if b"\xff" in digits:
+        for c in s:
+            if c not in BASE58_ALPHABET:
+                raise ValueError(
+                    "character {} is not valid base58 character".format(c)
+                )
     num = 0
-    for c in s:
-        if c not in BASE58_ALPHABET:
-            raise ValueError(
-                "character {} is not valid base58 character".format(c)
-            )
-        num *= 58
-        num += BASE58_ALPHABET.index(c)
-
-    h = hex(num)[2:]
-    h = '0' + h if len(h) % 2 else h
-    res = bytes.fromhex(h)
-
-    # Add padding back.
-    pad = 0
-    for c in s[:-1]:
-        if c == BASE58_ALPHABET[0]:
-            pad += 1
-        else:
-            break
-    return b'\x00' * pad + res
+    step = BASE58_CHUNK_DIGITS
+    remainder = len(digits) % step
+    if remainder:
+        # shorter (most significant) chunk goes first
+        for d in digits[:remainder]:
+            num = num * 58 + d
+    for i in range(remainder, len(digits), step):
+        chunk = 0
+        for d in digits[i:i + step]:
+            chunk = chunk * 58 + d
+        num = num * BASE58_CHUNK + chunk
+    # leading '1' characters are leading zero bytes
+    pad = len(s) - len(s.lstrip(BASE58_ALPHABET[0]))
+    return b"\x00" * pad + num.to_bytes((num.bit_length() + 7) // 8, "big")
 
 
 def decode_base58_checksum(s: str) -> bytes:
@@ -97,6 +198,94 @@ def decode_base58_checksum(s: str) -> bytes:
     return num_bytes[:-4]
 
 
+def _encode_base58_checksum_list(items: List[bytes]) -> List[str]:
+    """
+    Encode base58 checksum for every item in list.
+
+    :param items: data to encode
+    :return: base58 encoded strings with checksum
+    """
+    sha = hashlib.sha256
+    encode = encode_base58
+    return [encode(data + sha(sha(data).digest()).digest()[:4])
+            for data in items]
+
+
+def _decode_base58_checksum_list(items: List[str]
+                                 ) -> List[Base58CheckResult]:
+    """
+    Decode base58 checksum for every item in list. Invalid items do not
+    raise, error message is reported in their result instead.
+
+    :param items: base58 encoded strings with checksum
+    :return: decode results
+    """
+    sha = hashlib.sha256
+    decode = decode_base58
+    result = []
+    for s in items:
+        if not isinstance(s, str):
+            # e.g. None from blank CSV cell
+            result.append(Base58CheckResult(None, "not a string"))
+            continue
+        try:
+            raw = decode(s)
+        except ValueError as e:
+            result.append(Base58CheckResult(None, str(e)))
+            continue
+        if len(raw) < 4:
+            result.append(Base58CheckResult(None, "too short"))
+            continue
+        data = raw[:-4]
+        checksum = sha(sha(data).digest()).digest()[:4]
+        if checksum != raw[-4:]:
+            result.append(Base58CheckResult(
+                None, "bad checksum: {} {}".format(raw[-4:], checksum)
+            ))
+            continue
+        result.append(Base58CheckResult(data, None))
+    return result
+
+
+def encode_base58_checksum_batch(items: List[bytes], workers: int = None,
+                                 chunk_size: int = BATCH_CHUNK_SIZE
+                                 ) -> List[str]:
+    """
+    Encode base58 checksum for many payloads.
+
+    :param items: data to encode
+    :param workers: number of worker processes for large inputs
+                    (default=None - current process only)
+    :param chunk_size: number of items sent to worker at once
+                        (default=BATCH_CHUNK_SIZE)
+    :return: base58 encoded strings with checksum (in input order)
+    """
+    return map_chunks(
+        _encode_base58_checksum_list, items,
+        workers=workers, chunk_size=chunk_size
+    )
+
+
+def decode_base58_checksum_batch(items: List[str], workers: int = None,
+                                 chunk_size: int = BATCH_CHUNK_SIZE
+                                 ) -> List[Base58CheckResult]:
+    """
+    Decode base58 checksum for many strings. Does not raise on invalid
+    item - its result has data set to None and error describing failure.
+
+    :param items: base58 encoded strings with checksum
+    :param workers: number of worker processes for large inputs
+                    (default=None - current process only)
+    :param chunk_size: number of items sent to worker at once
+                        (default=BATCH_CHUNK_SIZE)
+    :return: decode results (data, error) in input order
+    """
+    return map_chunks(
+        _decode_base58_checksum_list, items,
+        workers=workers, chunk_size=chunk_size
+    )
+
+
 def read_varint(s: BytesIO) -> int:
     """
     Reads variable integer from buffer.
@@ -122,6 +311,26 @@ def read_varint(s: BytesIO) -> int:
         return i
 
 
+def read_varint_at(buf: Union[bytes, bytearray, memoryview],
+                   offset: int = 0) -> Tuple[int, int]:
+    """
+    Reads variable integer from buffer at offset without copying.
+
+    :param buf: buffer (bytes, bytearray, memoryview)
+    :param offset: offset of varint in buffer (default=0)
+    :return: integer and offset right after varint
+    """
+    i = buf[offset]
+    if i < 0xfd:
+        return i, offset + 1
+    # 0xfd -> 2 bytes, 0xfe -> 4 bytes, 0xff -> 8 bytes follow
+    size = 2 << (i - 0xfd)
+    end = offset + 1 + size
+    if end > len(buf):
+        raise ValueError("truncated varint at offset {}".format(offset))
+    return int.from_bytes(buf[offset + 1:end], "little"), end
+
+
 def encode_varint(i: int) -> bytes:
     """
     Encode variable integer.
@@ -151,6 +360,20 @@ def b58decode_addr(s: str) -> bytes:
     return decode_base58_checksum(s=s)[1:]
 
 
+def hashlib_ripemd160(s: bytes) -> bytes:
+    """
+    ripemd160 provided by hashlib (OpenSSL)
+
+    :param s: data
+    :return: hashed data
+    """
+    return hashlib.new("ripemd160", s).digest()
+
+
+# chosen once at import time
+ripemd160 = hashlib_ripemd160 if HASHLIB_RIPEMD160 else python_ripemd160
+
+
 def hash160(s: bytes) -> bytes:
     """
     sha256 followed by ripemd160
@@ -158,7 +381,21 @@ def hash160(s: bytes) -> bytes:
     :param s: data
     :return: hashed data
     """
-    return hashlib.new('ripemd160', hashlib.sha256(s).digest()).digest()
+    return ripemd160(hashlib.sha256(s).digest())
+
+
+def hash160_batch(items: List[bytes]) -> List[bytes]:
+    """
+    hash160 of many items (e.g. SEC public keys)
+
+    :param items: data
+    :return: hashed data
+    """
+    sha = hashlib.sha256
+    if HASHLIB_RIPEMD160:
+        new = hashlib.new
+        return [new("ripemd160", sha(s).digest()).digest() for s in items]
+    return python_ripemd160_batch([sha(s).digest() for s in items])
 
 
 def hash256(s: bytes) -> bytes:
@@ -171,6 +408,131 @@ def hash256(s: bytes) -> bytes:
     return hashlib.sha256(hashlib.sha256(s).digest()).digest()
 
 
+_SHA256 = hashlib.sha256()
+_RIPEMD160 = hashlib.new("ripemd160") if HASHLIB_RIPEMD160 else None
+
+
+def _hash256_range(view: memoryview, record_size: int, start: int,
+                   stop: int) -> bytes:
+    """
+    hash256 of records [start, stop) of buffer.
+
+    :param view: buffer of records
+    :param record_size: size of one record in bytes
+    :param start: first record
+    :param stop: stop record (exclusive)
+    :return: packed digests
+    """
+    sha = _SHA256.copy
+    out = []
+    append = out.append
+    for offset in range(start * record_size, stop * record_size, record_size):
+        h = sha()
+        h.update(view[offset:offset + record_size])
+        outer = sha()
+        outer.update(h.digest())
+        append(outer.digest())
+    return b"".join(out)
+
+
+def _hash160_range(view: memoryview, record_size: int, start: int,
+                   stop: int) -> bytes:
+    """
+    hash160 of records [start, stop) of buffer.
+
+    :param view: buffer of records
+    :param record_size: size of one record in bytes
+    :param start: first record
+    :param stop: stop record (exclusive)
+    :return: packed digests
+    """
+    sha = _SHA256.copy
+    offsets = range(start * record_size, stop * record_size, record_size)
+    if _RIPEMD160 is None:
+        digests = []
+        for offset in offsets:
+            h = sha()
+            h.update(view[offset:offset + record_size])
+            digests.append(h.digest())
+        return b"".join(python_ripemd160_batch(digests))
+    ripemd = _RIPEMD160.copy
+    out = []
+    append = out.append
+    for offset in offsets:
+        h = sha()
+        h.update(view[offset:offset + record_size])
+        r = ripemd()
+        r.update(h.digest())
+        append(r.digest())
+    return b"".join(out)
+
+
+def _hash_records(buf: Union[bytes, bytearray, memoryview],
+                  record_size: int,
+                  fnc: Callable[[memoryview, int, int, int], bytes],
+                  threads: int = None) -> bytes:
+    """
+    Splits buffer of fixed-size records between threads and applies range
+    hashing function to each part.
+
+    :param buf: contiguous buffer of records
+    :param record_size: size of one record in bytes
+    :param fnc: range hashing function
+    :param threads: number of threads (default=None - current thread only)
+    :return: packed digests
+    """
+    view = memoryview(buf).cast("B")
+    if record_size < 1 or len(view) % record_size:
+        raise ValueError(
+            "buffer length {} is not multiple of record size {}".format(
+                len(view), record_size
+            )
+        )
+    count = len(view) // record_size
+    if not threads or threads < 2 or count < 2 * threads:
+        return fnc(view, record_size, 0, count)
+    # hashlib releases GIL only while hashing inputs of 2048 bytes or more,
+    # so threads pay off for big records (or on free-threaded builds)
+    step = -(-count // threads)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        parts = executor.map(
+            lambda start: fnc(view, record_size, start,
+                              min(start + step, count)),
+            range(0, count, step)
+        )
+        return b"".join(parts)
+
+
+def hash256_records(buf: Union[bytes, bytearray, memoryview],
+                    record_size: int, threads: int = None) -> bytes:
+    """
+    hash256 of every fixed-size record in contiguous buffer. Hash objects
+    are copied from pre-initialized ones instead of being created per
+    record.
+
+    :param buf: contiguous buffer of records (bytes, bytearray, memoryview)
+    :param record_size: size of one record in bytes
+    :param threads: number of threads (default=None - current thread only)
+    :return: packed 32 byte digests in record order
+    """
+    return _hash_records(buf, record_size, _hash256_range, threads=threads)
+
+
+def hash160_records(buf: Union[bytes, bytearray, memoryview],
+                    record_size: int, threads: int = None) -> bytes:
+    """
+    hash160 of every fixed-size record in contiguous buffer (for instance
+    33 byte SEC public keys). Hash objects are copied from pre-initialized
+    ones instead of being created per record.
+
+    :param buf: contiguous buffer of records (bytes, bytearray, memoryview)
+    :param record_size: size of one record in bytes
+    :param threads: number of threads (default=None - current thread only)
+    :return: packed 20 byte digests in record order
+    """
+    return _hash_records(buf, record_size, _hash160_range, threads=threads)
+
+
 def sha256(s: bytes) -> bytes:
     """
     one round of sha256
@@ -319,8 +681,9 @@ def merkle_parent_level(hashes: List[bytes]) -> List[bytes]:
         raise ValueError("Cannot take a parent level with only 1 item")
     # if the list has an odd number of elements, duplicate the last one
     # and put it at the end so it has an even number of elements
+    # (on a copy - caller's list is not modified)
     if len(hashes) % 2 == 1:
-        hashes.append(hashes[-1])
+        hashes = hashes + [hashes[-1]]
     # initialize next level
     parent_level = []
     # loop over every pair
@@ -1,14 +1,16 @@
 import ecdsa
 from typing import Union
 
+from btc_hd_wallet import ecc
 from btc_hd_wallet.helper import (
     encode_base58_checksum, decode_base58_checksum, big_endian_to_int,
-    hash160, h160_to_p2wpkh_address, h160_to_p2pkh_address
+    int_to_big_endian, hash160, h160_to_p2wpkh_address, h160_to_p2pkh_address
 )
 
 
 SECP256k1 = ecdsa.curves.SECP256k1
 Point_or_PointJacobi = Union[
+    ecc.Point,
     ecdsa.ellipticcurve.Point,
     ecdsa.ellipticcurve.PointJacobi
 ]
@@ -18,22 +20,23 @@ class PrivateKey(object):
 
     __slots__ = (
         "sec_exp",
-        "k",
-        "K"
+        "_k",
+        "_K"
     )
 
     def __init__(self, sec_exp: int):
         """
         Initializes private key from secret exponent.
 
+        Public key and ecdsa signing key are computed lazily on first access.
+
         :param sec_exp: secret
         """
+        if not 0 < sec_exp < ecc.N:
+            raise ValueError("secret exponent has to be in range <1, n-1>")
         self.sec_exp = sec_exp
-        self.k = ecdsa.SigningKey.from_secret_exponent(
-            secexp=sec_exp,
-            curve=SECP256k1
-        )
-        self.K = PublicKey(key=self.k.get_verifying_key())
+        self._k = None
+        self._K = None
 
     def __bytes__(self) -> bytes:
         """
@@ -41,7 +44,32 @@ class PrivateKey(object):
 
         :return: byte representation of PrivateKey object
         """
-        return self.k.to_string()
+        return int_to_big_endian(self.sec_exp, 32)
+
+    @property
+    def k(self) -> ecdsa.SigningKey:
+        """
+        Ecdsa signing key.
+
+        :return: signing key
+        """
+        if self._k is None:
+            self._k = ecdsa.SigningKey.from_secret_exponent(
+                secexp=self.sec_exp,
+                curve=SECP256k1
+            )
+        return self._k
+
+    @property
+    def K(self) -> "PublicKey":
+        """
+        Public key corresponding to this private key.
+
+        :return: public key
+        """
+        if self._K is None:
+            self._K = PublicKey(point=ecc.backend.point_mul_base(self.sec_exp))
+        return self._K
 
     def __eq__(self, other: "PrivateKey") -> bool:
         """
@@ -92,33 +120,49 @@ class PrivateKey(object):
 class PublicKey(object):
 
     __slots__ = (
-        "K"
+        "point",
+        "_K"
     )
 
-    def __init__(self, key: ecdsa.VerifyingKey):
+    def __init__(self, point: ecc.Point = None,
+                 key: ecdsa.VerifyingKey = None):
         """
-        Initializes PublicKey object from ecdsa verifying key
+        Initializes PublicKey object from affine point on curve
+        or from ecdsa verifying key.
 
-        :param key: ecdsa verifying key
+        :param point: affine point (x, y)
+        :param key: ecdsa verifying key (default=None)
         """
-        self.K = key
+        if isinstance(point, ecdsa.VerifyingKey):
+            # PublicKey(key) as before points were used
+            point, key = None, point
+        if key is not None:
+            point = (key.pubkey.point.x(), key.pubkey.point.y())
+        if point is None:
+            raise ValueError("public key is a point at infinity")
+        self.point = point
+        self._K = key
 
-    def __eq__(self, other: "PublicKey") -> bool:
+    @property
+    def K(self) -> ecdsa.VerifyingKey:
         """
-        Checks whether two public keys are equal.
+        Ecdsa verifying key.
 
-        :param other: other public key
+        :return: verifying key
         """
-        return self.sec() == other.sec()
+        if self._K is None:
+            self._K = ecdsa.VerifyingKey.from_string(
+                self.sec(compressed=False), curve=SECP256k1
+            )
+        return self._K
 
-    @property
-    def point(self) -> ecdsa.ellipticcurve.Point:
+    def __eq__(self, other: "PublicKey") -> bool:
         """
-        Point on curve (x and y coordinates).
+        Checks whether two public keys are equal.
 
-        :return: point on curve
+        :param other: other public key
         """
-        return self.K.pubkey.point
+        return self.sec() == other.sec()
 
     def sec(self, compressed: bool = True) -> bytes:
         """
@@ -127,9 +171,7 @@ class PublicKey(object):
         :param compressed: whether to use compressed format (default=True)
         :return: SEC encoded public key
         """
-        if compressed:
-            return self.K.to_string(encoding="compressed")
-        return self.K.to_string(encoding="uncompressed")
+        return ecc.backend.sec_encode(self.point, compressed=compressed)
 
     @classmethod
     def parse(cls, key_bytes: bytes) -> "PublicKey":
@@ -139,7 +181,7 @@ class PublicKey(object):
         :param key_bytes: byte representation of public key
         :return: public key
         """
-        return cls(ecdsa.VerifyingKey.from_string(key_bytes, curve=SECP256k1))
+        return cls(point=ecc.backend.sec_decode(key_bytes))
 
     @classmethod
     def from_point(cls, point: Point_or_PointJacobi) -> "PublicKey":
@@ -149,7 +191,10 @@ class PublicKey(object):
         :param point: point on elliptic curve
         :return: public key
         """
-        return cls(ecdsa.VerifyingKey.from_public_point(point, curve=SECP256k1))
+        if not isinstance(point, tuple):
+            # ecdsa Point or PointJacobi
+            point = (point.x(), point.y())
+        return cls(point=point)
 
     def h160(self, compressed: bool = True) -> bytes:
         """
@@ -0,0 +1,280 @@
+"""
+Merkle trees - roots, inclusion proofs and BIP37 partial merkle trees.
+
+All hashes are 32 byte hash256 digests in internal byte order (the same
+order helper.merkle_parent works with). Input hashes are never mutated.
+"""
+
+import hashlib
+from typing import List, NamedTuple, Sequence, Tuple, Union
+
+Hashes = Union[Sequence[bytes], bytes, bytearray, memoryview]
+
+
+class PartialMerkleTree(NamedTuple):
+    root: bytes
+    # (leaf position, hash) of matched leaves in tree order
+    matches: List[Tuple[int, bytes]]
+
+
+def merkle_pair(left: bytes, right: bytes) -> bytes:
+    """
+    Calculates merkle parent of two children.
+
+    :param left: left child
+    :param right: right child
+    :return: parent
+    """
+    sha = hashlib.sha256
+    return sha(sha(left + right).digest()).digest()
+
+
+def _leaves(hashes: Hashes) -> List[bytes]:
+    """
+    Gets leaves as list of 32 byte hashes.
+
+    :param hashes: sequence of 32 byte hashes or buffer of packed hashes
+    :return: new list of leaf hashes
+    """
+    if isinstance(hashes, (bytes, bytearray, memoryview)):
+        packed = bytes(hashes)
+        if len(packed) % 32:
+            raise ValueError("packed hashes length has to be multiple of 32")
+        return [packed[i:i + 32] for i in range(0, len(packed), 32)]
+    return list(hashes)
+
+
+def _parent_level(level: List[bytes]) -> List[bytes]:
+    """
+    Calculates parent level. Input level is not modified.
+
+    :param level: child level
+    :return: parent level
+    """
+    sha = hashlib.sha256
+    if len(level) % 2:
+        # odd level - last hash is paired with itself
+        level = level + level[-1:]
+    pairs = iter(level)
+    return [
+        sha(sha(left + right).digest()).digest()
+        for left, right in zip(pairs, pairs)
+    ]
+
+
+def merkle_root(hashes: Hashes) -> bytes:
+    """
+    Calculates merkle root.
+
+    :param hashes: leaf hashes - sequence of 32 byte hashes or buffer
+                    of packed 32 byte hashes
+    :return: merkle root
+    """
+    level = _leaves(hashes)
+    if not level:
+        raise ValueError("cannot compute merkle root of no hashes")
+    while len(level) > 1:
+        level = _parent_level(level)
+    return level[0]
+
+
+def merkle_proof(hashes: Hashes, index: int) -> List[bytes]:
+    """
+    Generates inclusion proof (merkle branch) of leaf at index.
+
+    :param hashes: leaf hashes - sequence of 32 byte hashes or buffer
+                    of packed 32 byte hashes
+    :param index: leaf index
+    :return: sibling hashes from leaf level up to the level below root
+    """
+    level = _leaves(hashes)
+    if not 0 <= index < len(level):
+        raise IndexError("leaf index {} out of range".format(index))
+    branch = []
+    while len(level) > 1:
+        # odd level - last hash is its own sibling
+        branch.append(level[min(index ^ 1, len(level) - 1)])
+        level = _parent_level(level)
+        index >>= 1
+    return branch
+
+
+def merkle_proof_root(leaf: bytes, branch: Sequence[bytes],
+                      index: int) -> bytes:
+    """
+    Calculates merkle root implied by leaf, its branch and index.
+
+    :param leaf: leaf hash
+    :param branch: sibling hashes (merkle_proof result)
+    :param index: leaf index
+    :return: merkle root
+    """
+    sha = hashlib.sha256
+    h = leaf
+    for sibling in branch:
+        if index & 1:
+            h = sha(sha(sibling + h).digest()).digest()
+        else:
+            h = sha(sha(h + sibling).digest()).digest()
+        index >>= 1
+    return h
+
+
+def verify_merkle_proof(leaf: bytes, branch: Sequence[bytes], index: int,
+                        root: bytes) -> bool:
+    """
+    Verifies inclusion proof.
+
+    :param leaf: leaf hash
+    :param branch: sibling hashes (merkle_proof result)
+    :param index: leaf index
+    :param root: expected merkle root
+    :return: whether leaf is included in tree with root
+    """
+    return merkle_proof_root(leaf, branch, index) == root
+
+
+def _tree_width(total: int, height: int) -> int:
+    """
+    Number of nodes at height (leaves are at height 0).
+
+    :param total: number of leaves
+    :param height: height
+    :return: width
+    """
+    return (total + (1 << height) - 1) >> height
+
+
+def _tree_height(total: int) -> int:
+    """
+    Height of root of tree with total leaves.
+
+    :param total: number of leaves
+    :return: height
+    """
+    height = 0
+    while _tree_width(total, height) > 1:
+        height += 1
+    return height
+
+
+def build_partial_merkle_tree(hashes: Sequence[bytes],
+                              matches: Sequence[bool]
+                              ) -> Tuple[List[bytes], bytes]:
+    """
+    Builds BIP37 partial merkle tree for matched leaves.
+
+    :param hashes: all leaf hashes
+    :param matches: whether leaf at the same position matched
+    :return: hashes and flag bytes of partial merkle tree
+    """
+    total = len(hashes)
+    if total == 0 or len(matches) != total:
+        raise ValueError("hashes and matches have to be same non-zero length")
+    # all levels of tree, bottom up - levels[height][pos]
+    levels = [list(hashes)]
+    matched = [list(map(bool, matches))]
+    while len(levels[-1]) > 1:
+        level, flags = levels[-1], matched[-1]
+        parents, parent_flags = [], []
+        for i in range(0, len(level), 2):
+            # odd level - last node is paired with itself
+            j = i + 1 if i + 1 < len(level) else i
+            parents.append(merkle_pair(level[i], level[j]))
+            parent_flags.append(flags[i] or flags[j])
+        levels.append(parents)
+        matched.append(parent_flags)
+
+    result_hashes = []
+    bits = []
+
+    def traverse(height: int, pos: int) -> None:
+        parent_of_match = matched[height][pos]
+        bits.append(parent_of_match)
+        if height == 0 or not parent_of_match:
+            result_hashes.append(levels[height][pos])
+            return
+        traverse(height - 1, pos * 2)
+        if pos * 2 + 1 < _tree_width(total, height - 1):
+            traverse(height - 1, pos * 2 + 1)
+
+    traverse(len(levels) - 1, 0)
+    flags = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            flags[i // 8] |= 1 << (i % 8)
+    return result_hashes, bytes(flags)
+
+
+def extract_partial_merkle_tree(total: int, hashes: Sequence[bytes],
+                                flags: bytes) -> PartialMerkleTree:
+    """
+    Traverses BIP37 partial merkle tree (merkleblock message) and
+    calculates its root and matched leaves. Raises ValueError if tree is
+    malformed - including duplicated sibling hashes (CVE-2012-2459)
+    and unused hashes or flag bytes.
+
+    :param total: total number of transactions in block
+    :param hashes: partial merkle tree hashes
+    :param flags: partial merkle tree flag bytes
+    :return: root and matched leaves
+    """
+    if total == 0:
+        raise ValueError("partial merkle tree has no transactions")
+    if len(hashes) > total:
+        raise ValueError("more hashes than transactions")
+    if len(flags) * 8 < len(hashes):
+        raise ValueError("not enough flag bits")
+    sha = hashlib.sha256
+    matches = []
+    # [bits used, hashes used]
+    used = [0, 0]
+
+    def traverse(height: int, pos: int) -> bytes:
+        bit = used[0]
+        if bit >= len(flags) * 8:
+            raise ValueError("overflowed flag bits")
+        used[0] += 1
+        flag = (flags[bit >> 3] >> (bit & 7)) & 1
+        if height == 0 or not flag:
+            if used[1] >= len(hashes):
+                raise ValueError("overflowed hashes")
+            h = hashes[used[1]]
+            used[1] += 1
+            if height == 0 and flag:
+                matches.append((pos, h))
+            return h
+        left = traverse(height - 1, pos * 2)
+        if pos * 2 + 1 < _tree_width(total, height - 1):
+            right = traverse(height - 1, pos * 2 + 1)
+            if right == left:
+                raise ValueError("identical sibling hashes")
+        else:
+            right = left
+        return sha(sha(left + right).digest()).digest()
+
+    root = traverse(_tree_height(total), 0)
+    if (used[0] + 7) // 8 != len(flags):
+        raise ValueError("not all flag bytes were used")
+    if used[1] != len(hashes):
+        raise ValueError("not all hashes were used")
+    return PartialMerkleTree(root, matches)
+
+
+def verify_partial_merkle_tree(total: int, hashes: Sequence[bytes],
+                               flags: bytes, root: bytes) -> bool:
+    """
+    Verifies BIP37 partial merkle tree against merkle root from block
+    header.
+
+    :param total: total number of transactions in block
+    :param hashes: partial merkle tree hashes
+    :param flags: partial merkle tree flag bytes
+    :param root: expected merkle root
+    :return: whether tree is well formed and has expected root
+    """
+    try:
+        tree = extract_partial_merkle_tree(total, hashes, flags)
+    except ValueError:
+        return False
+    return tree.root == root
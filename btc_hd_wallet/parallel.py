@@ -0,0 +1,165 @@
+"""
+Parallel derivation of large child index ranges.
+
+Child key derivation is CPU bound and every index is independent, so big
+ranges are split into chunks and derived in worker processes. Workers
+receive only 78 byte serialized node (BIP32 extended key payload) together
+with chunk bounds and send back plain bytes/strings. Results are yielded
+in index order while only bounded number of chunks is in flight.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Generator, List, Optional, Tuple, Union
+
+from btc_hd_wallet.bip32 import (
+    PrvKeyNode, PubKeyNode, Prv_or_PubKeyNode, ChildRecord, HARDENED
+)
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+ChildResult = Union[ChildRecord, Tuple[int, str]]
+
+
+def _chunks(interval: tuple, chunk_size: int
+            ) -> Generator[Tuple[int, int], None, None]:
+    """
+    Splits interval into consecutive chunks. Chunks never span hardened
+    boundary, so every chunk is either fully hardened or fully normal.
+
+    :param interval: specific interval of integers
+    :param chunk_size: maximum number of indexes in one chunk
+    :return: generator of (start, stop) tuples
+    """
+    start, stop = interval
+    while start < stop:
+        end = min(start + chunk_size, stop)
+        if start < HARDENED < end:
+            end = HARDENED
+        yield start, end
+        start = end
+
+
+def _derive_chunk(serialized: bytes, private: bool, testnet: bool,
+                  start: int, stop: int, addr_type: Optional[str] = None
+                  ) -> List[ChildResult]:
+    """
+    Derives one chunk of children from serialized node. Runs in worker
+    process.
+
+    :param serialized: 78 byte serialized key node
+    :param private: whether serialized node is private key node
+    :param testnet: whether node is testnet node
+    :param start: first index of chunk
+    :param stop: stop index of chunk (exclusive)
+    :param addr_type: address type to generate, None for child records
+    :return: list of child records or (index, address) tuples
+    """
+    cls = PrvKeyNode if private else PubKeyNode
+    node = cls.parse(serialized, testnet=testnet)
+    if private and (addr_type is None or start >= HARDENED):
+        # private children are only hmac + scalar addition away,
+        # hardened ones cannot be batched at all
+        children = node.iter_children(interval=(start, stop))
+        if addr_type is None:
+            return [
+                ChildRecord(child.index, bytes(child.private_key),
+                            child.chain_code)
+                for child in children
+            ]
+        return [
+            (child.index,
+             child.public_key.address(testnet=testnet, addr_type=addr_type))
+            for child in children
+        ]
+    if addr_type is None:
+        return node.batch_ckd(interval=(start, stop))
+    return [
+        (index, public_key.address(testnet=testnet, addr_type=addr_type))
+        for index, public_key in node.batch_public_keys(interval=(start, stop))
+    ]
+
+
+def derive_range(node: Prv_or_PubKeyNode, interval: tuple = (0, 20),
+                 addr_type: Optional[str] = None, workers: int = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 executor: ProcessPoolExecutor = None
+                 ) -> Generator[ChildResult, None, None]:
+    """
+    Derives children of node for whole interval in parallel worker
+    processes and yields results in index order.
+
+    Without addr_type child records are yielded - (index, SEC public key,
+    chain code) for public key node and (index, 32 byte private key,
+    chain code) for private key node. With addr_type (p2pkh/p2wpkh)
+    (index, address) tuples are yielded.
+
+    :param node: key node (usually chain node)
+    :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+    :param addr_type: address type to generate (default=None)
+    :param workers: number of worker processes, 1 derives in current
+                    process (default=os.cpu_count())
+    :param chunk_size: number of indexes derived by one task
+                        (default=DEFAULT_CHUNK_SIZE)
+    :param executor: existing process pool to use instead of starting
+                        new one for this call - workers then only bounds
+                        chunks in flight (default=None)
+    :return: generator of child records or (index, address) tuples
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size has to be positive")
+    private = isinstance(node, PrvKeyNode)
+    if not private and interval[1] > HARDENED:
+        raise RuntimeError("failure: hardened child for public ckd")
+    serialized = (
+        node.serialize_private() if private else node.serialize_public()
+    )
+    args = (serialized, private, node.testnet)
+    workers = workers or os.cpu_count() or 1
+    if executor is not None:
+        yield from _derive_pool(executor, args, interval, addr_type, workers,
+                                chunk_size)
+        return
+    if workers == 1:
+        for start, stop in _chunks(interval, chunk_size):
+            yield from _derive_chunk(*args, start, stop, addr_type)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _derive_pool(executor, args, interval, addr_type, workers,
+                                chunk_size)
+
+
+def _derive_pool(executor: ProcessPoolExecutor, args: tuple,
+                 interval: tuple, addr_type: Optional[str], workers: int,
+                 chunk_size: int) -> Generator[ChildResult, None, None]:
+    """
+    Derives chunks of interval in process pool and yields results in
+    index order.
+
+    :param executor: process pool
+    :param args: (serialized node, private, testnet)
+    :param interval: specific interval of integers
+    :param addr_type: address type to generate, None for child records
+    :param workers: number of pool workers
+    :param chunk_size: number of indexes derived by one task
+    :return: generator of child records or (index, address) tuples
+    """
+    pending = deque()
+    try:
+        # keep every worker busy while bounding results held in memory
+        for start, stop in _chunks(interval, chunk_size):
+            pending.append(executor.submit(
+                _derive_chunk, *args, start, stop, addr_type
+            ))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # consumer stopped early - do not derive chunks nobody will read
+        for future in pending:
+            future.cancel()
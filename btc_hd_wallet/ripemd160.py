@@ -0,0 +1,197 @@
+"""
+Pure python RIPEMD-160.
+
+Used as fallback by helper.hash160 when hashlib (OpenSSL 3 default
+provider) does not offer ripemd160. Compression function processes both
+lines round by round with boolean function of each round written inline,
+message word order and rotation amounts are pre-zipped per round.
+"""
+
+import struct
+from typing import List
+
+M32 = 0xFFFFFFFF
+
+# initial chaining value
+H0 = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+# message word selection - left line
+RL = (
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13,
+)
+# message word selection - right line
+RR = (
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11,
+)
+# rotation amounts - left line
+SL = (
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6,
+)
+# rotation amounts - right line
+SR = (
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11,
+)
+KL = (0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E)
+KR = (0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000)
+
+# per round tuple of (word index, rotation, 32 - rotation) for every step
+_LEFT = tuple(
+    tuple((RL[j], SL[j], 32 - SL[j]) for j in range(16 * r, 16 * r + 16))
+    for r in range(5)
+)
+_RIGHT = tuple(
+    tuple((RR[j], SR[j], 32 - SR[j]) for j in range(16 * r, 16 * r + 16))
+    for r in range(5)
+)
+
+_BLOCK = struct.Struct("<16L")
+_DIGEST = struct.Struct("<5L")
+
+
+def compress(h: tuple, x: tuple) -> tuple:
+    """
+    RIPEMD-160 compression function.
+
+    :param h: chaining value (5 words)
+    :param x: message block (16 little endian words)
+    :return: new chaining value
+    """
+    M = M32
+    # left line
+    a, b, c, d, e = h
+    # round 1: f(x, y, z) = x ^ y ^ z
+    for i, s, r in _LEFT[0]:
+        t = (a + (b ^ c ^ d) + x[i]) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    # round 2: f(x, y, z) = (x & y) | (~x & z)
+    k = KL[1]
+    for i, s, r in _LEFT[1]:
+        t = (a + ((b & c) | (~b & d)) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    # round 3: f(x, y, z) = (x | ~y) ^ z
+    k = KL[2]
+    for i, s, r in _LEFT[2]:
+        t = (a + ((b | (c ^ M)) ^ d) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    # round 4: f(x, y, z) = (x & z) | (y & ~z)
+    k = KL[3]
+    for i, s, r in _LEFT[3]:
+        t = (a + ((b & d) | (c & ~d)) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    # round 5: f(x, y, z) = x ^ (y | ~z)
+    k = KL[4]
+    for i, s, r in _LEFT[4]:
+        t = (a + (b ^ (c | (d ^ M))) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    al, bl, cl, dl, el = a, b, c, d, e
+
+    # right line - same functions in reverse order
+    a, b, c, d, e = h
+    k = KR[0]
+    for i, s, r in _RIGHT[0]:
+        t = (a + (b ^ (c | (d ^ M))) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    k = KR[1]
+    for i, s, r in _RIGHT[1]:
+        t = (a + ((b & d) | (c & ~d)) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    k = KR[2]
+    for i, s, r in _RIGHT[2]:
+        t = (a + ((b | (c ^ M)) ^ d) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    k = KR[3]
+    for i, s, r in _RIGHT[3]:
+        t = (a + ((b & c) | (~b & d)) + x[i] + k) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+    for i, s, r in _RIGHT[4]:
+        t = (a + (b ^ c ^ d) + x[i]) & M
+        t = (((t << s) | (t >> r)) + e) & M
+        a, e, d, c, b = e, d, ((c << 10) | (c >> 22)) & M, b, t
+
+    return (
+        (h[1] + cl + d) & M,
+        (h[2] + dl + e) & M,
+        (h[3] + el + a) & M,
+        (h[4] + al + b) & M,
+        (h[0] + bl + c) & M,
+    )
+
+
+def pad(data: bytes) -> bytes:
+    """
+    Merkle-Damgard padding of message to multiple of 64 bytes.
+
+    :param data: message
+    :return: padded message
+    """
+    length = len(data)
+    return (
+        data + b"\x80" + b"\x00" * ((55 - length) % 64) +
+        struct.pack("<Q", (length * 8) & 0xFFFFFFFFFFFFFFFF)
+    )
+
+
+def ripemd160(data: bytes) -> bytes:
+    """
+    RIPEMD-160 digest.
+
+    :param data: message
+    :return: 20 byte digest
+    """
+    h = H0
+    padded = pad(data)
+    unpack = _BLOCK.unpack_from
+    for offset in range(0, len(padded), 64):
+        h = compress(h, unpack(padded, offset))
+    return _DIGEST.pack(*h)
+
+
+def ripemd160_batch(items: List[bytes]) -> List[bytes]:
+    """
+    RIPEMD-160 digests of many messages. Messages shorter than 56 bytes
+    (like sha256 digests in hash160) fit into single block, for them
+    padding is precomputed once per distinct length.
+
+    :param items: messages
+    :return: 20 byte digests
+    """
+    result = []
+    append = result.append
+    unpack = _BLOCK.unpack
+    pack = _DIGEST.pack
+    suffixes = {}
+    for data in items:
+        length = len(data)
+        if length >= 56:
+            append(ripemd160(data))
+            continue
+        suffix = suffixes.get(length)
+        if suffix is None:
+            suffix = suffixes[length] = pad(b"\x00" * length)[length:]
+        append(pack(*compress(H0, unpack(data + suffix))))
+    return result
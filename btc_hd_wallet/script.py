@@ -1,7 +1,10 @@
 from io import BytesIO
+from typing import Generator, Iterable, List, Tuple, Union
 
+from btc_hd_wallet.address import AddressType
 from btc_hd_wallet.helper import (
-    encode_varint, read_varint, little_endian_to_int, int_to_little_endian
+    encode_varint, read_varint, read_varint_at, little_endian_to_int,
+    int_to_little_endian
 )
 from btc_hd_wallet.op import OP_CODE_NAMES
 
@@ -50,6 +53,55 @@ def p2pkh_script(h160: bytes) -> "Script":
     return Script([0x76, 0xa9, h160, 0x88, 0xac])
 
 
+def classify_script_pubkey(script: Union[bytes, bytearray, memoryview]
+                           ) -> Tuple[AddressType, bytes]:
+    """
+    Classifies raw (not length prefixed) scriptPubKey by fixed-offset
+    length and opcode checks - without parsing it.
+
+    :param script: raw scriptPubKey
+    :return: script type and program (hash160 for p2pkh/p2sh, witness
+                program for segwit, empty bytes for other scripts)
+    """
+    n = len(script)
+    if n == 22:
+        # [OP_0, 20-byte element]
+        if script[0] == 0x00 and script[1] == 0x14:
+            return AddressType.P2WPKH, bytes(script[2:])
+    elif n == 34:
+        # [OP_0, 32-byte element], [OP_1, 32-byte element]
+        if script[1] == 0x20:
+            if script[0] == 0x00:
+                return AddressType.P2WSH, bytes(script[2:])
+            if script[0] == 0x51:
+                return AddressType.P2TR, bytes(script[2:])
+    elif n == 25:
+        # [OP_DUP, OP_HASH160, 20-byte element, OP_EQUALVERIFY, OP_CHECKSIG]
+        if (script[0] == 0x76 and script[1] == 0xa9 and script[2] == 0x14
+                and script[23] == 0x88 and script[24] == 0xac):
+            return AddressType.P2PKH, bytes(script[3:23])
+    elif n == 23:
+        # [OP_HASH160, 20-byte element, OP_EQUAL]
+        if script[0] == 0xa9 and script[1] == 0x14 and script[22] == 0x87:
+            return AddressType.P2SH, bytes(script[2:22])
+    # [OP_1..OP_16, 2 to 40 byte element] - future witness versions
+    if 4 <= n <= 42 and 0x51 <= script[0] <= 0x60 and script[1] == n - 2:
+        return AddressType.WITNESS_UNKNOWN, bytes(script[2:])
+    return AddressType.UNKNOWN, b""
+
+
+def classify_script_pubkeys(scripts: Iterable[Union[bytes, memoryview]]
+                            ) -> List[Tuple[AddressType, bytes]]:
+    """
+    Classifies many raw scriptPubKeys.
+
+    :param scripts: raw scriptPubKeys
+    :return: list of (script type, program) in input order
+    """
+    classify = classify_script_pubkey
+    return [classify(script) for script in scripts]
+
+
 class Script:
     def __init__(self, cmds: list = None):
         """
@@ -178,3 +230,143 @@ class Script:
         result = self.raw_serialize()
         # Script serialization starts with the length of the entire script.
         return encode_varint(len(result)) + result
+
+
+def iter_script_cmds(buf: Union[bytes, bytearray, memoryview],
+                     start: int = 0, end: int = None
+                     ) -> Generator[Union[int, memoryview], None, None]:
+    """
+    Iterates over commands of raw (not length prefixed) script in buffer
+    without copying. Opcodes are yielded as integers, pushed elements as
+    memoryview slices of the buffer.
+
+    :param buf: buffer containing script
+    :param start: offset of first script byte (default=0)
+    :param end: offset right after last script byte (default=len(buf))
+    :return: command generator
+    """
+    view = memoryview(buf)
+    end = len(view) if end is None else end
+    i = start
+    while i < end:
+        op = view[i]
+        i += 1
+        if op > 78 or op == 0:
+            # opcode
+            yield op
+            continue
+        if op <= 75:
+            n = op
+        # 76 OP_PUSHDATA1, 77 OP_PUSHDATA2, 78 OP_PUSHDATA4 - next 1, 2 or 4
+        # bytes tell us how many bytes to read
+        else:
+            size = 1 << (op - 76)
+            if i + size > end:
+                raise SyntaxError("parsing script failed")
+            n = int.from_bytes(view[i:i + size], "little")
+            i += size
+        if i + n > end:
+            raise SyntaxError("parsing script failed")
+        yield view[i:i + n]
+        i += n
+
+
+class ScriptView(object):
+    """
+    Script backed by memoryview of underlying buffer (raw block or
+    transaction). Nothing is copied on parse, commands are materialized
+    as bytes only when cmds is accessed.
+    """
+
+    __slots__ = (
+        "view",
+        "_cmds"
+    )
+
+    def __init__(self, buf: Union[bytes, bytearray, memoryview]):
+        """
+        Initializes script view from raw (not length prefixed) script.
+
+        :param buf: raw script buffer
+        """
+        self.view = memoryview(buf)
+        self._cmds = None
+
+    def __repr__(self) -> str:
+        return repr(Script(self.cmds))
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def __eq__(self, other) -> bool:
+        """
+        Checks whether two scripts are equal.
+
+        :param other: other script
+        """
+        if isinstance(other, ScriptView):
+            return self.view == other.view
+        return self.cmds == other.cmds
+
+    def __iter__(self) -> Generator[Union[int, memoryview], None, None]:
+        """
+        Iterates over commands without building command list.
+
+        :return: command generator (pushes as memoryview slices)
+        """
+        return iter_script_cmds(self.view)
+
+    @classmethod
+    def parse(cls, buf: Union[bytes, bytearray, memoryview],
+              offset: int = 0) -> Tuple["ScriptView", int]:
+        """
+        Initializes script view from length prefixed script in buffer.
+
+        :param buf: buffer
+        :param offset: offset of script length varint (default=0)
+        :return: script view and offset right after script
+        """
+        view = memoryview(buf)
+        length, start = read_varint_at(view, offset)
+        end = start + length
+        if end > len(view):
+            raise SyntaxError("parsing script failed")
+        return cls(view[start:end]), end
+
+    @property
+    def cmds(self) -> List[Union[int, bytes]]:
+        """
+        Command list with pushed elements materialized as bytes.
+
+        :return: command list
+        """
+        if self._cmds is None:
+            self._cmds = [
+                cmd if type(cmd) == int else cmd.tobytes()
+                for cmd in iter_script_cmds(self.view)
+            ]
+        return self._cmds
+
+    def to_script(self) -> Script:
+        """
+        Converts to regular script.
+
+        :return: script
+        """
+        return Script(list(self.cmds))
+
+    def raw_serialize(self) -> bytes:
+        """
+        Serializes script.
+
+        :return: serialized script
+        """
+        return self.view.tobytes()
+
+    def serialize(self) -> bytes:
+        """
+        Serializes script. Prepended with the length of script.
+
+        :return: serialized script
+        """
+        return encode_varint(len(self.view)) + self.view.tobytes()
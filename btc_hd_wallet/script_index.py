@@ -0,0 +1,347 @@
+"""
+Compact reverse index from address/scriptPubKey program to derivation
+(wallet, chain, index).
+
+Index is open-addressing (linear probing) hash table stored in single
+flat buffer of fixed size slots. Programs are hashes already, so first
+8 bytes of program are used as hash. Every slot holds first 20 bytes of
+program (whole hash160, truncated 32 byte program) and packed
+(wallet, chain, index) - 28 bytes per slot, so million addresses with
+load factor at most 3/4 take at most 56MB.
+
+Index can be saved to file and loaded back memory-mapped, lookups then
+read mapped file directly. First modification of mapped index copies
+table to memory.
+"""
+
+import mmap
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from btc_hd_wallet.address import classify_address
+from btc_hd_wallet.bip32 import Prv_or_PubKeyNode
+from btc_hd_wallet.helper import hash160_batch, hash160_records, sha256
+from btc_hd_wallet.script import classify_script_pubkey
+
+
+INDEX_MAGIC = b"BHWIDX02"
+# magic, capacity, count, number of derived ranges
+HEADER = struct.Struct("<8sQQQ")
+# program key, wallet, chain, occupied flag, index
+SLOT = struct.Struct("<20sHBBI")
+# wallet, chain, program type (position in PROGRAM_TYPES), derived stop
+RANGE = struct.Struct("<HBBI")
+
+KEY_SIZE = 20
+MIN_CAPACITY = 1024
+
+PROGRAM_TYPES = ("p2wpkh", "p2sh-p2wpkh", "p2wsh", "p2sh-p2wsh")
+
+
+class IndexEntry(NamedTuple):
+    wallet: int
+    chain: int
+    index: int
+
+
+def derive_programs(node: Prv_or_PubKeyNode, interval: tuple = (0, 20),
+                    program_types: Iterable[str] = ("p2wpkh",)
+                    ) -> List[Tuple[int, bytes]]:
+    """
+    Derives children of (chain) node and calculates their programs.
+    p2wpkh program (hash160 of public key) is the same as p2pkh one,
+    p2wsh programs are for 1 of 1 multisig witness script
+    (as BaseWallet.p2wsh_address).
+
+    :param node: key node (e.g. external chain m/84'/0'/0'/0)
+    :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+    :param program_types: any of p2wpkh, p2sh-p2wpkh, p2wsh, p2sh-p2wsh
+                        (default=("p2wpkh",))
+    :return: list of (child index, program)
+    """
+    program_types = tuple(program_types)
+    for program_type in program_types:
+        if program_type not in PROGRAM_TYPES:
+            raise ValueError(
+                "Unsupported program type {}".format(program_type)
+            )
+    records = node.batch_ckd(interval=interval)
+    indexes = [record.index for record in records]
+    result = []
+    if "p2wpkh" in program_types or "p2sh-p2wpkh" in program_types:
+        packed = hash160_records(b"".join(r.key for r in records), 33)
+        h160s = [packed[i:i + 20] for i in range(0, len(packed), 20)]
+        if "p2wpkh" in program_types:
+            result.extend(zip(indexes, h160s))
+        if "p2sh-p2wpkh" in program_types:
+            result.extend(zip(indexes, hash160_batch(
+                [b"\x00\x14" + h160 for h160 in h160s]
+            )))
+    if "p2wsh" in program_types or "p2sh-p2wsh" in program_types:
+        # [OP_1, sec, OP_1, OP_CHECKMULTISIG]
+        h256s = [
+            sha256(b"\x51\x21" + record.key + b"\x51\xae")
+            for record in records
+        ]
+        if "p2wsh" in program_types:
+            result.extend(zip(indexes, h256s))
+        if "p2sh-p2wsh" in program_types:
+            result.extend(zip(indexes, hash160_batch(
+                [b"\x00\x20" + h256 for h256 in h256s]
+            )))
+    return result
+
+
+class ScriptIndex(object):
+
+    __slots__ = (
+        "table",
+        "capacity",
+        "count",
+        "ranges",
+        "_mmap"
+    )
+
+    def __init__(self, capacity: int = MIN_CAPACITY):
+        """
+        Initializes empty index.
+
+        :param capacity: initial number of slots, rounded up
+                            to power of two (default=1024)
+        """
+        size = MIN_CAPACITY
+        while size < capacity:
+            size *= 2
+        self.capacity = size
+        self.count = 0
+        self.table = bytearray(size * SLOT.size)
+        # (wallet, chain, program type) -> stop of derived interval
+        self.ranges = {}  # type: Dict[Tuple[int, int, str], int]
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, program: bytes) -> bool:
+        return self.get(program) is not None
+
+    def __repr__(self) -> str:
+        return "ScriptIndex(count={}, capacity={})".format(
+            self.count, self.capacity
+        )
+
+    def _slot(self, key: bytes) -> Tuple[int, bool]:
+        """
+        Finds slot offset of key - either occupied by key or first empty.
+
+        :param key: 20 byte key
+        :return: slot offset and whether slot is occupied by key
+        """
+        table = self.table
+        mask = self.capacity - 1
+        size = SLOT.size
+        slot = int.from_bytes(key[:8], "little") & mask
+        while True:
+            offset = slot * size
+            if not table[offset + 23]:
+                return offset, False
+            if table[offset:offset + KEY_SIZE] == key:
+                return offset, True
+            slot = (slot + 1) & mask
+
+    def _ensure_writable(self) -> None:
+        """Copies memory-mapped table to memory."""
+        if self._mmap is not None:
+            view, self.table = self.table, bytearray(self.table)
+            view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def _grow(self) -> None:
+        """Doubles capacity and reinserts all entries."""
+        old, size = self.table, SLOT.size
+        self.capacity *= 2
+        self.table = bytearray(self.capacity * size)
+        for offset in range(0, len(old), size):
+            if old[offset + 23]:
+                new_offset, _ = self._slot(old[offset:offset + KEY_SIZE])
+                self.table[new_offset:new_offset + size] = \
+                    old[offset:offset + size]
+
+    def add(self, program: bytes, wallet: int, chain: int,
+            index: int) -> None:
+        """
+        Adds program to index. Existing entry for the same program
+        is replaced.
+
+        :param program: 20 or 32 byte program
+        :param wallet: wallet number (0..65535)
+        :param chain: chain number (0..255)
+        :param index: child index
+        """
+        if len(program) not in (20, 32):
+            raise ValueError("program has to be 20 or 32 bytes long")
+        self._ensure_writable()
+        if (self.count + 1) * 4 > self.capacity * 3:
+            self._grow()
+        key = bytes(program[:KEY_SIZE])
+        offset, found = self._slot(key)
+        SLOT.pack_into(self.table, offset, key, wallet, chain, 1, index)
+        if not found:
+            self.count += 1
+
+    def add_node(self, node: Prv_or_PubKeyNode, wallet: int, chain: int,
+                 interval: tuple = (0, 20),
+                 program_types: Iterable[str] = ("p2wpkh",)) -> int:
+        """
+        Derives children of chain node and adds their programs to index.
+
+        :param node: chain node (e.g. m/84'/0'/0'/0)
+        :param wallet: wallet number
+        :param chain: chain number (e.g. 0 external, 1 internal)
+        :param interval: specific interval of integers
+                        from which to derive children (default=(0, 20))
+        :param program_types: see derive_programs (default=("p2wpkh",))
+        :return: number of added programs
+        """
+        program_types = tuple(program_types)
+        programs = derive_programs(node, interval, program_types)
+        for index, program in programs:
+            self.add(program, wallet, chain, index)
+        for program_type in program_types:
+            key = (wallet, chain, program_type)
+            self.ranges[key] = max(self.ranges.get(key, 0), interval[1])
+        return len(programs)
+
+    def extend(self, node: Prv_or_PubKeyNode, wallet: int, chain: int,
+               stop: int, program_types: Iterable[str] = None) -> int:
+        """
+        Extends index of chain up to stop (e.g. when gap limit moves).
+        Only children not derived yet (per program type) are derived.
+
+        :param node: chain node
+        :param wallet: wallet number
+        :param chain: chain number
+        :param stop: new end of derived interval (exclusive)
+        :param program_types: see derive_programs (default=None - program
+                                types already indexed for chain,
+                                p2wpkh if chain is not indexed)
+        :return: number of added programs
+        """
+        if program_types is None:
+            program_types = [
+                program_type for program_type in PROGRAM_TYPES
+                if (wallet, chain, program_type) in self.ranges
+            ] or ["p2wpkh"]
+        # program types with the same derived stop are derived together
+        starts = {}  # type: Dict[int, List[str]]
+        for program_type in program_types:
+            start = self.ranges.get((wallet, chain, program_type), 0)
+            if start < stop:
+                starts.setdefault(start, []).append(program_type)
+        added = 0
+        for start, types in sorted(starts.items()):
+            added += self.add_node(node, wallet, chain, (start, stop), types)
+        return added
+
+    def get(self, program: bytes) -> Optional[IndexEntry]:
+        """
+        Looks up program.
+
+        :param program: 20 or 32 byte program
+        :return: (wallet, chain, index) or None if not indexed
+        """
+        if len(program) < KEY_SIZE:
+            return None
+        offset, found = self._slot(bytes(program[:KEY_SIZE]))
+        if not found:
+            return None
+        _, wallet, chain, _, index = SLOT.unpack_from(self.table, offset)
+        return IndexEntry(wallet, chain, index)
+
+    def lookup_script(self, script: Union[bytes, memoryview]
+                      ) -> Optional[IndexEntry]:
+        """
+        Looks up raw scriptPubKey.
+
+        :param script: raw scriptPubKey
+        :return: (wallet, chain, index) or None if not indexed
+        """
+        _, program = classify_script_pubkey(script)
+        return self.get(program)
+
+    def lookup_address(self, address: str) -> Optional[IndexEntry]:
+        """
+        Looks up address (any network).
+
+        :param address: address
+        :return: (wallet, chain, index) or None if not indexed
+        """
+        return self.get(classify_address(address).program)
+
+    def save(self, path: str) -> None:
+        """
+        Saves index to file.
+
+        :param path: file path
+        """
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(INDEX_MAGIC, self.capacity, self.count,
+                                len(self.ranges)))
+            f.write(self.table)
+            for (wallet, chain, program_type), stop in sorted(
+                    self.ranges.items()):
+                f.write(RANGE.pack(wallet, chain,
+                                   PROGRAM_TYPES.index(program_type), stop))
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "ScriptIndex":
+        """
+        Loads index from file.
+
+        :param path: file path
+        :param use_mmap: whether to memory-map table instead of reading
+                            it to memory (default=True)
+        :return: index
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        if len(buf) < HEADER.size:
+            magic, capacity, count, n_ranges = b"", 0, 0, 0
+        else:
+            magic, capacity, count, n_ranges = HEADER.unpack_from(buf, 0)
+        table_end = HEADER.size + capacity * SLOT.size
+        # capacity has to be power of two and table must have empty slot,
+        # otherwise lookups fail or probe forever
+        if (magic != INDEX_MAGIC or capacity < MIN_CAPACITY or
+                capacity & (capacity - 1) or count * 4 > capacity * 3 or
+                len(buf) != table_end + n_ranges * RANGE.size):
+            if use_mmap:
+                buf.close()
+            raise ValueError("invalid script index file")
+        index = cls.__new__(cls)
+        index.capacity = capacity
+        index.count = count
+        index.ranges = {}
+        for offset in range(table_end, len(buf), RANGE.size):
+            wallet, chain, type_id, stop = RANGE.unpack_from(buf, offset)
+            if type_id >= len(PROGRAM_TYPES):
+                if use_mmap:
+                    buf.close()
+                raise ValueError("invalid script index file")
+            index.ranges[(wallet, chain, PROGRAM_TYPES[type_id])] = stop
+        if use_mmap:
+            index._mmap = buf
+            index.table = memoryview(buf)[HEADER.size:table_end]
+        else:
+            index._mmap = None
+            index.table = bytearray(buf[HEADER.size:table_end])
+        return index
+
+    def close(self) -> None:
+        """Releases memory-mapped file (index stays usable in memory)."""
+        self._ensure_writable()
@@ -1,5 +1,7 @@
 import enum
-from typing import Any, List, Union
+import functools
+from collections import OrderedDict
+from typing import Any, Hashable, List, Tuple, Union
 
 
 class Bip(enum.Enum):
@@ -487,3 +489,161 @@ class Bip32Path(object):
             addr_index=cls.convert_hardened(addr_index) if addr_index else None,
             private=cls.is_private(sign=s_lst[0])
         )
+
+
+class DerivationPath(object):
+
+    __slots__ = (
+        "indexes",
+        "private"
+    )
+
+    def __init__(self, indexes: Tuple[int, ...] = (), private: bool = True):
+        """
+        Initializes path object of arbitrary depth.
+
+        :param indexes: derivation indexes (hardened indexes are >= 2 ** 31)
+        :param private: whether this path corresponds to private key
+                        (default=True)
+        """
+        for i in indexes:
+            if not isinstance(i, int):
+                raise ValueError("has to be int")
+            if not 0 <= i < 2 ** 32:
+                raise ValueError("index {} out of range".format(i))
+        self.indexes = tuple(indexes)
+        self.private = private
+
+    def __repr__(self) -> str:
+        items = [
+            str(i - 2 ** 31) + "'" if Bip32Path.is_hardened(i) else str(i)
+            for i in self.indexes
+        ]
+        return "/".join([self.m] + items)
+
+    def __eq__(self, other: "DerivationPath") -> bool:
+        """
+        Checks whether two paths are equal.
+
+        :param other: other path
+        """
+        return self.private == other.private and self.indexes == other.indexes
+
+    def __hash__(self) -> int:
+        return hash((self.private, self.indexes))
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    @property
+    def m(self) -> str:
+        """
+        Chooses correct mark. M for public key and m for private key.
+
+        :return: correct mark
+        """
+        return "m" if self.private else "M"
+
+    def to_list(self) -> List[int]:
+        """
+        Converts path to sequence.
+
+        :return: sequence of numbers
+        """
+        return list(self.indexes)
+
+    @classmethod
+    def parse(cls, s: str) -> "DerivationPath":
+        """
+        Initializes path from its string representation. Parsed indexes
+        are memoized, repeated parsing of the same string is cheap.
+        Every call returns new path object.
+
+        :param s: path
+        :return: path object
+        """
+        indexes, private = _parse_derivation_path(s)
+        return cls(indexes=indexes, private=private)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_derivation_path(s: str) -> Tuple[Tuple[int, ...], bool]:
+    s_lst = s.rstrip("/").split("/")
+    if s_lst[0] not in ("m", "M"):
+        raise ValueError("incorrect marker")
+    if not all(s_lst[1:]):
+        raise ValueError("empty path level")
+    # only immutable parts are cached - callers may modify path objects
+    return (
+        tuple(Bip32Path.convert_hardened(i) for i in s_lst[1:]),
+        Bip32Path.is_private(sign=s_lst[0])
+    )
+
+
+class LRUCache(object):
+
+    __slots__ = (
+        "maxsize",
+        "hits",
+        "misses",
+        "_data"
+    )
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initializes bounded least recently used cache.
+
+        :param maxsize: maximum number of cached items (default=1024)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Gets item from cache and marks it as recently used.
+
+        :param key: item key
+        :return: cached item or None
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Puts item to cache. Least recently used item is evicted
+        if cache is full.
+
+        :param key: item key
+        :param value: item
+        :return: None
+        """
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all items from cache and resets counters.
+
+        :return: None
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
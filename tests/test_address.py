@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from btc_hd_wallet.address import (
+    AddressType, AddressInfo, classify_address, classify_addresses,
+    classify_address_file
+)
+
+
+H160 = bytes.fromhex("74d691da1574e6b3c192ecfb52cc8984ee7b6c56")
+
+VALID = [
+    ("1BenRpVUFK65JFWcQSuHnJKzc4M8ZP8Eqa",
+     AddressInfo(AddressType.P2PKH, False, None, H160)),
+    ("mrAjisaT4LXL5MzE81sfcDYKU3wqWSvf9q",
+     AddressInfo(AddressType.P2PKH, True, None, H160)),
+    ("3CLoMMyuoDQTPRD3XYZtCvgvkadrAdvdXh",
+     AddressInfo(AddressType.P2SH, False, None, H160)),
+    ("2N3u1R6uwQfuobCqbCgBkpsgBxvr1tZpe7B",
+     AddressInfo(AddressType.P2SH, True, None, H160)),
+    ("BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4",
+     AddressInfo(AddressType.P2WPKH, False, 0, bytes.fromhex(
+         "751e76e8199196d454941c45d1b3a323f1433bd6"))),
+    ("tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7",
+     AddressInfo(AddressType.P2WSH, True, 0, bytes.fromhex(
+         "1863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262"))),
+    ("bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+     AddressInfo(AddressType.P2TR, False, 1, bytes.fromhex(
+         "79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"))),
+    ("bc1sw50qgdz25j",
+     AddressInfo(AddressType.WITNESS_UNKNOWN, False, 16,
+                 bytes.fromhex("751e"))),
+]
+
+INVALID = [
+    "",
+    "garbage",
+    # bad checksum
+    "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb",
+    # invalid base58 character
+    "1A1zP1eP5QGefi2DlPTfTL5SLmv7DivfNb",
+    # valid base58check of unknown version (extended key)
+    "xpub69H7F5d8KSRgmmdJg2KhpAK8SR3DjMwAdkxj3ZuxV27CprR9LgpeyGmXUbC6wb7ERfvrnKZjXoUmmDznezpbZb7ap6r1D3tgFxHmwMkQTPH",
+    # invalid hrp
+    "tc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq5zuyut",
+    # bech32 instead of bech32m
+    "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqh2y7hd",
+    # mixed case
+    "tb1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq47Zagq",
+    # not a string
+    None,
+    b"1BenRpVUFK65JFWcQSuHnJKzc4M8ZP8Eqa",
+    123,
+]
+
+
+class TestAddress(unittest.TestCase):
+
+    def test_classify_address(self):
+        for addr, expected in VALID:
+            self.assertEqual(classify_address(addr), expected, addr)
+            self.assertEqual(classify_address(" " + addr + "\n"), expected)
+        for addr in INVALID:
+            info = classify_address(addr)
+            self.assertEqual(info.type, AddressType.UNKNOWN, addr)
+            self.assertEqual(info, (0, None, None, b""))
+
+    def test_classify_addresses(self):
+        addresses = [addr for addr, _ in VALID] + INVALID
+        expected = [classify_address(addr) for addr in addresses]
+        for workers in (None, 2):
+            self.assertEqual(
+                list(classify_addresses(iter(addresses), workers=workers,
+                                        chunk_size=3)),
+                expected
+            )
+        self.assertEqual(list(classify_addresses([])), [])
+
+    def test_classify_address_file(self):
+        addresses = [addr for addr, _ in VALID] + [
+            addr for addr in INVALID if isinstance(addr, str)
+        ]
+        fd, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write("\n".join(addresses) + "\n")
+            result = list(classify_address_file(path, chunk_size=4))
+        finally:
+            os.remove(path)
+        self.assertEqual(
+            result, [classify_address(addr) for addr in addresses]
+        )
@@ -190,3 +190,55 @@ class TestBaseWallet(unittest.TestCase):
             ("m/49'/0'/99'/0/501", "3KcHPAEtC4N7AQrMh5smmFw9hdSD68Wkt7")
         )
 
+        self.assertEqual(acct100_external_chain.children, [])
+
+    def test_iter_addresses(self):
+        xpub = "xpub6CEGxdGrXswwWNoqpBePNgiQhjBmcEZWoPfkGcLg7zEjBxrFBkSzcFGrkpPqvH7TJwkjyuGMShKuyU7VpjvKnUoTavL9xSaq3DvKCAgNhwM"
+        w = BaseWallet.from_extended_key(extended_key=xpub)
+        expected = [
+            (str(child), w.p2pkh_address(child))
+            for child in w.master.generate_children(interval=(3, 8))
+        ]
+        w.master.children = []
+        stream = w.iter_addresses(
+            node=w.master, interval=(3, 8), addr_fnc=w.p2pkh_address
+        )
+        self.assertEqual(list(stream), expected)
+        self.assertEqual(w.master.children, [])
+
+        node = self.wallet.by_path("m/84'/0'/0'/0")
+        expected = [
+            (str(child), self.wallet.p2wpkh_address(child))
+            for child in node.generate_children(interval=(0, 5))
+        ]
+        self.assertEqual(
+            list(self.wallet.iter_addresses(node=node, interval=(0, 5))),
+            expected
+        )
+        self.assertEqual(len(node.children), 5)
+
+    def test_by_path_cache(self):
+        w = BaseWallet.from_mnemonic(mnemonic=self.mnemonic)
+        node = w.by_path("m/84'/0'/0'/0/5")
+        # m/84', m/84'/0', m/84'/0'/0', m/84'/0'/0'/0
+        self.assertEqual(w.node_cache.misses, 4)
+        self.assertEqual(w.node_cache.hits, 0)
+        self.assertEqual(len(w.node_cache), 4)
+        for i in range(10):
+            w.by_path("m/84'/0'/0'/0/{}".format(i))
+        self.assertEqual(w.node_cache.misses, 4)
+        self.assertEqual(w.node_cache.hits, 10)
+        self.assertEqual(
+            node.extended_public_key(),
+            w.master.derive_path(
+                [84 + 2 ** 31, 2 ** 31, 2 ** 31, 0, 5]
+            ).extended_public_key()
+        )
+        self.assertEqual(str(node), "m/84'/0'/0'/0/5")
+        self.assertIs(w.by_path("m"), w.master)
+        # deeper than five levels
+        deep = w.by_path("m/0/1/2/3/4/5/6")
+        self.assertEqual(str(deep), "m/0/1/2/3/4/5/6")
+        self.assertEqual(
+            deep, w.master.derive_path(index_list=[0, 1, 2, 3, 4, 5, 6])
+        )
@@ -25,6 +25,7 @@
 
 import binascii
 import unittest
+from unittest import mock
 import btc_hd_wallet.bech32 as bech32
 
 
@@ -195,3 +196,79 @@ class TestSegwitAddress(unittest.TestCase):
         for hrp, version, length in INVALID_ADDRESS_ENC:
             code = bech32.encode(hrp, version, [0] * length)
             self.assertIsNone(code)
+            code = bech32.encode(hrp, version, [0] * length, validate=True)
+            self.assertIsNone(code)
+        self.assertIsNone(bech32.encode("b c", 0, [0] * 20))
+        self.assertIsNone(bech32.encode("bc" * 30, 1, [0] * 40))
+
+    def test_encode_validate(self):
+        """Test fast path encoding matches validated encoding."""
+        for (address, _) in VALID_ADDRESS:
+            hrp = address[:2].lower()
+            witver, witprog = bech32.decode(hrp, address)
+            self.assertEqual(
+                bech32.encode(hrp, witver, witprog),
+                bech32.encode(hrp, witver, witprog, validate=True)
+            )
+
+    def test_polymod_table(self):
+        """Test table driven polymod against bitwise reference."""
+        def reference(values):
+            chk = 1
+            for value in values:
+                top = chk >> 25
+                chk = (chk & 0x1ffffff) << 5 ^ value
+                for i in range(5):
+                    if (top >> i) & 1:
+                        chk ^= bech32.BECH32_GENERATOR[i]
+            return chk
+        for test in VALID_BECH32 + VALID_BECH32M + INVALID_BECH32:
+            values = [ord(x) & 31 for x in test]
+            self.assertEqual(bech32.bech32_polymod(values), reference(values))
+
+
+class TestEncodeBatch(unittest.TestCase):
+    """Unit test class for batch segwit address encoding."""
+
+    programs = [bytes((i * 7 + j) % 256 for j in range(20)) for i in range(50)]
+
+    def test_encode_batch_scalar(self):
+        """Test encoding falls back to scalar path without NumPy."""
+        with mock.patch.object(bech32, "numpy", None):
+            self.assertEqual(
+                bech32.encode_batch("bc", 0, self.programs),
+                [bech32.encode("bc", 0, prog) for prog in self.programs]
+            )
+
+    @unittest.skipIf(bech32.numpy is None, "numpy is not installed")
+    def test_encode_batch_numpy(self):
+        """Test column-wise encoding matches scalar encoding."""
+        numpy = bech32.numpy
+        for hrp, witver, length in (("bc", 0, 20), ("tb", 0, 32),
+                                    ("bc", 1, 32), ("bcrt", 16, 40),
+                                    ("bc", 2, 2)):
+            programs = numpy.arange(50 * length, dtype=numpy.uint32)
+            programs = (programs * 31 % 256).astype(numpy.uint8)
+            programs = programs.reshape(50, length)
+            self.assertEqual(
+                bech32.encode_batch(hrp, witver, programs),
+                [bech32.encode(hrp, witver, bytes(prog)) for prog in programs]
+            )
+        self.assertEqual(
+            bech32.encode_batch("bc", 0, self.programs),
+            [bech32.encode("bc", 0, prog) for prog in self.programs]
+        )
+        self.assertEqual(
+            bech32.encode_batch("bc", 0, numpy.zeros((0, 20))), []
+        )
+        self.assertEqual(bech32.encode_batch("bc", 0, []), [])
+        mixed = [b"\x00" * 20, b"\x01" * 32, b"\x02" * 21]
+        self.assertEqual(
+            bech32.encode_batch("bc", 0, mixed),
+            [bech32.encode("bc", 0, prog) for prog in mixed]
+        )
+        self.assertEqual(
+            bech32.encode_batch("bc", 0, numpy.zeros((3, 21))), [None] * 3
+        )
+        with self.assertRaises(ValueError):
+            bech32.encode_batch("bc", 0, numpy.zeros(20))
@@ -0,0 +1,96 @@
+import random
+import unittest
+
+from btc_hd_wallet.bip32 import PrvKeyNode, HARDENED
+from btc_hd_wallet.blocks import build_script_map
+from btc_hd_wallet.bip158 import (
+    GCSFilter, siphash24, hash_elements, encode_gcs, build_basic_filter,
+    match_filters, BASIC_FILTER_M
+)
+
+
+# testnet genesis block
+GENESIS_HASH = bytes.fromhex(
+    "000000000933ea01ad0ee984209779baaec3ced90fa3f408719526f8d77f4943"
+)[::-1]
+GENESIS_SCRIPT = bytes.fromhex(
+    "4104678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb6"
+    "49f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c702b6bf11d5fac"
+)
+GENESIS_FILTER = bytes.fromhex("019dfca8")
+
+
+def random_bytes(rng: random.Random, n: int) -> bytes:
+    return rng.getrandbits(8 * n).to_bytes(n, "little")
+
+
+class TestBIP158(unittest.TestCase):
+
+    def test_siphash24(self):
+        k0, k1 = 0x0706050403020100, 0x0F0E0D0C0B0A0908
+        self.assertEqual(siphash24(k0, k1, b""), 0x726fdb47dd0e0e31)
+        self.assertEqual(siphash24(k0, k1, bytes(range(8))),
+                         0x93f5f5799a932462)
+        self.assertEqual(siphash24(k0, k1, bytes(range(15))),
+                         0xa129ca6149be45e5)
+
+    def test_genesis_filter(self):
+        self.assertEqual(
+            build_basic_filter(GENESIS_HASH, [GENESIS_SCRIPT, b""]),
+            GENESIS_FILTER
+        )
+        gcs = GCSFilter(GENESIS_FILTER, GENESIS_HASH)
+        self.assertEqual(len(gcs), 1)
+        self.assertEqual(gcs.decode(),
+                         hash_elements([GENESIS_SCRIPT], GENESIS_HASH, 1))
+        self.assertTrue(gcs.match_any([b"\x00" * 22, GENESIS_SCRIPT]))
+        self.assertEqual(gcs.match([GENESIS_SCRIPT, b"\x51"]),
+                         [GENESIS_SCRIPT])
+        self.assertFalse(gcs.match_any([b"\x00" * 22]))
+        self.assertFalse(gcs.match_any([]))
+
+    def test_encode_decode(self):
+        # fixed seed - data is known to give no false positives
+        rng = random.Random(158)
+        block_hash = random_bytes(rng, 32)
+        elements = [random_bytes(rng, 25) for _ in range(500)]
+        serialized = build_basic_filter(block_hash, elements + elements[:10])
+        gcs = GCSFilter(serialized, block_hash)
+        self.assertEqual(len(gcs), 500)
+        values = sorted(hash_elements(elements, block_hash, 500))
+        self.assertEqual(gcs.decode(), values)
+        self.assertTrue(all(v < 500 * BASIC_FILTER_M for v in values))
+        others = [random_bytes(rng, 25) for _ in range(1000)]
+        queries = others + elements[::7]
+        self.assertEqual(gcs.match(queries), elements[::7])
+        self.assertEqual(encode_gcs([]), b"")
+        empty = GCSFilter(build_basic_filter(block_hash, []), block_hash)
+        self.assertEqual(empty.decode(), [])
+        self.assertFalse(empty.match_any(elements))
+        truncated = GCSFilter(serialized[:-20], block_hash)
+        with self.assertRaises(ValueError):
+            truncated.decode()
+
+    def test_wallet_match(self):
+        node = PrvKeyNode.master_key(bip39_seed=bytes(range(32)))
+        chain = node.derive_path([84 + HARDENED, HARDENED, HARDENED, 0])
+        script_map = build_script_map(chain, interval=(0, 100))
+        scripts = list(script_map)
+        filters = []
+        # fixed seed - data is known to give no false positives
+        rng = random.Random(158)
+        for i in range(5):
+            block_hash = bytes([i]) * 32
+            elements = [random_bytes(rng, 22) for _ in range(200)]
+            if i in (1, 3):
+                elements.append(scripts[i * 10])
+            filters.append(GCSFilter(
+                build_basic_filter(block_hash, elements), block_hash
+            ))
+        self.assertEqual(
+            filters[3].match_script_map(script_map),
+            [str(chain) + "/30"]
+        )
+        self.assertEqual(filters[0].match_script_map(script_map), [])
+        self.assertEqual(match_filters(filters, script_map),
+                         [filters[1], filters[3]])
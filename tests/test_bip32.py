@@ -41,6 +41,106 @@ class TestNode(unittest.TestCase):
         M0 = PubKeyNode.parse(s=m0.extended_public_key())
         self.assertNotEqual(m0, M0)
 
+    def test_cached_keys(self):
+        xpriv = "xprv9s21ZrQH143K4EK4Fdy4ddWeDMy1x4tg2s292J5ynk23sn3hxSZ9MqqLZCTj2dHPP16CsTdAFeznbnNhSN3v66TtSKzJf4hPZSqDjjp9t42"
+        m = PrvKeyNode.parse(s=xpriv)
+        self.assertIs(m.private_key, m.private_key)
+        self.assertIs(m.public_key, m.public_key)
+        self.assertIs(m.public_key, m.private_key.K)
+
+        M = PubKeyNode.parse(s=m.extended_public_key())
+        self.assertIs(M.public_key, M.public_key)
+        self.assertEqual(M.public_key, m.public_key)
+        # derived public child has its public key ready
+        M0 = M.ckd(index=0)
+        self.assertIsNotNone(M0._public_key)
+        self.assertEqual(M0.public_key, m.ckd(index=0).public_key)
+
+    def test_cached_fingerprints(self):
+        xpriv = "xprv9s21ZrQH143K4EK4Fdy4ddWeDMy1x4tg2s292J5ynk23sn3hxSZ9MqqLZCTj2dHPP16CsTdAFeznbnNhSN3v66TtSKzJf4hPZSqDjjp9t42"
+        m = PrvKeyNode.parse(s=xpriv)
+        self.assertIs(m.fingerprint(), m.fingerprint())
+        # parent fingerprint is recorded when child is created
+        m0 = m.ckd(index=0)
+        self.assertEqual(m0.parsed_parent_fingerprint, m.fingerprint())
+        M = PubKeyNode.parse(s=m.extended_public_key())
+        M0 = M.ckd(index=0)
+        self.assertEqual(M0.parsed_parent_fingerprint, m.fingerprint())
+        self.assertEqual(M0.extended_public_key(), m0.extended_public_key())
+        # hardened derivation does not compute parent public key
+        m = PrvKeyNode.parse(s=xpriv)
+        m0h = m.ckd(index=2 ** 31)
+        self.assertIsNone(m._public_key)
+        self.assertIsNone(m0h.parsed_parent_fingerprint)
+        self.assertEqual(m0h.parent_fingerprint, m.fingerprint())
+        self.assertEqual(
+            PrvKeyNode.parse(m0h.extended_private_key()).parent_fingerprint,
+            m.fingerprint()
+        )
+
+    def test_path(self):
+        xpriv = "xprv9s21ZrQH143K4EK4Fdy4ddWeDMy1x4tg2s292J5ynk23sn3hxSZ9MqqLZCTj2dHPP16CsTdAFeznbnNhSN3v66TtSKzJf4hPZSqDjjp9t42"
+        m = PrvKeyNode.parse(s=xpriv)
+        self.assertEqual(m.path, ())
+        self.assertEqual(str(m), "m")
+        node = m.derive_path(index_list=[84 + 2 ** 31, 2 ** 31, 5 + 2 ** 31, 1])
+        self.assertEqual(node.path, (84 + 2 ** 31, 2 ** 31, 5 + 2 ** 31, 1))
+        self.assertEqual(str(node), "m/84'/0'/5'/1")
+        self.assertEqual(str(node.ckd(index=7)), "m/84'/0'/5'/1/7")
+        # node parsed from extended key is root of its own path
+        M = PubKeyNode.parse(s=node.extended_public_key())
+        self.assertEqual(M.path, ())
+        self.assertEqual(str(M.ckd(index=3)), "M/3")
+        self.assertEqual(
+            [str(c) for c in M.iter_children(interval=(0, 2))],
+            ["M/0", "M/1"]
+        )
+
+    def test_batch_ckd(self):
+        xpriv = "xprv9s21ZrQH143K4EK4Fdy4ddWeDMy1x4tg2s292J5ynk23sn3hxSZ9MqqLZCTj2dHPP16CsTdAFeznbnNhSN3v66TtSKzJf4hPZSqDjjp9t42"
+        m = PrvKeyNode.parse(s=xpriv)
+        M = PubKeyNode.parse(s=m.extended_public_key())
+        records = M.batch_ckd(interval=(5, 25))
+        self.assertEqual(len(records), 20)
+        self.assertEqual(M.children, [])
+        for record in records:
+            child = m.ckd(index=record.index)
+            self.assertEqual(record.key, child.public_key.sec())
+            self.assertEqual(record.chain_code, child.chain_code)
+        # private node derives neutered children
+        self.assertEqual(m.batch_ckd(interval=(5, 25)), records)
+        self.assertEqual(M.batch_ckd(interval=(5, 5)), [])
+        with self.assertRaises(RuntimeError):
+            M.batch_ckd(interval=(2 ** 31 - 1, 2 ** 31 + 1))
+        self.assertEqual(
+            [(i, key.sec()) for i, key in M.batch_public_keys((5, 25))],
+            [(record.index, record.key) for record in records]
+        )
+
+    def test_generate_children_pub(self):
+        xpub = "xpub69H7F5d8KSRgmmdJg2KhpAK8SR3DjMwAdkxj3ZuxV27CprR9LgpeyGmXUbC6wb7ERfvrnKZjXoUmmDznezpbZb7ap6r1D3tgFxHmwMkQTPH"
+        M0 = PubKeyNode.parse(s=xpub)
+        M1 = PubKeyNode.parse(s=xpub)
+        children = M0.generate_children(interval=(0, 10))
+        self.assertEqual(children, [M1.ckd(index=i) for i in range(10)])
+        self.assertEqual(M0.children, children)
+
+    def test_iter_children(self):
+        xpriv = "xprv9s21ZrQH143K4EK4Fdy4ddWeDMy1x4tg2s292J5ynk23sn3hxSZ9MqqLZCTj2dHPP16CsTdAFeznbnNhSN3v66TtSKzJf4hPZSqDjjp9t42"
+        m = PrvKeyNode.parse(s=xpriv)
+        M = PubKeyNode.parse(s=m.extended_public_key())
+        expected = [m.ckd(index=i) for i in range(3, 10)]
+        m.children = []
+        self.assertEqual(list(m.iter_children(interval=(3, 10))), expected)
+        self.assertEqual(
+            [c.public_key for c in M.iter_children((3, 10), batch_size=3)],
+            [c.public_key for c in expected]
+        )
+        self.assertEqual(m.children, [])
+        self.assertEqual(M.children, [])
+        M.ckd(index=0, retain=False)
+        self.assertEqual(M.children, [])
+
 
 class TestBip32(unittest.TestCase):
 
@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from btc_hd_wallet.bip32 import PrvKeyNode, HARDENED
+from btc_hd_wallet.helper import hash256, hash160, encode_varint
+from btc_hd_wallet.blocks import (
+    BlockHit, build_script_map, iter_blocks, scan_block, scan_block_file,
+    scan_block_files, script_lengths, MAINNET_MAGIC, REGTEST_MAGIC
+)
+
+
+def serialize_tx(outputs, segwit=False, n_in=1):
+    """Minimal transaction serialization - returns (raw tx, txid)."""
+    inputs = b""
+    for i in range(n_in):
+        inputs += bytes([i]) * 32 + b"\x00" * 4
+        inputs += encode_varint(3) + b"\x01\x02\x03" + b"\xff" * 4
+    outs = b""
+    for value, script in outputs:
+        outs += value.to_bytes(8, "little")
+        outs += encode_varint(len(script)) + script
+    body = encode_varint(n_in) + inputs + encode_varint(len(outputs)) + outs
+    version, locktime = b"\x02\x00\x00\x00", b"\x00\x00\x00\x00"
+    txid = hash256(version + body + locktime)[::-1].hex()
+    if not segwit:
+        return version + body + locktime, txid
+    witness = b""
+    for _ in range(n_in):
+        witness += encode_varint(2) + encode_varint(72) + b"\x30" * 72
+        witness += encode_varint(33) + b"\x02" * 33
+    return version + b"\x00\x01" + body + witness + locktime, txid
+
+
+def serialize_block(txs, magic=MAINNET_MAGIC):
+    block = b"\x00" * 80 + encode_varint(len(txs)) + b"".join(txs)
+    return magic + len(block).to_bytes(4, "little") + block
+
+
+class TestBlocks(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        node = PrvKeyNode.master_key(bip39_seed=bytes(range(32)))
+        cls.chain = node.derive_path([84 + HARDENED, HARDENED, HARDENED, 0])
+        cls.script_map = build_script_map(
+            cls.chain, interval=(0, 5),
+            script_types=("p2wpkh", "p2pkh", "p2sh-p2wpkh")
+        )
+        cls.h160 = hash160(cls.chain.ckd(3).public_key.sec())
+        cls.p2wpkh = b"\x00\x14" + cls.h160
+        cls.p2pkh = b"\x76\xa9\x14" + cls.h160 + b"\x88\xac"
+        cls.other = b"\x00\x14" + b"\x11" * 20
+        cls.path = str(cls.chain) + "/3"
+        cls.tmp = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_build_script_map(self):
+        self.assertEqual(len(self.script_map), 15)
+        self.assertEqual(self.script_map[self.p2wpkh], self.path)
+        self.assertEqual(self.script_map[self.p2pkh], self.path)
+        p2sh = b"\xa9\x14" + hash160(self.p2wpkh) + b"\x87"
+        self.assertEqual(self.script_map[p2sh], self.path)
+        with self.assertRaises(ValueError):
+            build_script_map(self.chain, script_types=("p2tr",))
+
+    def test_scan_block(self):
+        tx0, txid0 = serialize_tx([(50, self.other)])
+        tx1, txid1 = serialize_tx(
+            [(1000, self.other), (2000, self.p2wpkh)], segwit=True, n_in=2
+        )
+        tx2, txid2 = serialize_tx(
+            [(3000, self.p2pkh)] + [(1, self.other)] * 300
+        )
+        raw = serialize_block([tx0, tx1, tx2])
+        self.assertEqual(list(iter_blocks(raw)), [(8, len(raw))])
+        self.assertEqual(
+            list(scan_block(raw, 8, len(raw), self.script_map)),
+            [BlockHit(txid1, 1, 2000, self.path),
+             BlockHit(txid2, 0, 3000, self.path)]
+        )
+        lengths = script_lengths(self.script_map)
+        self.assertEqual(lengths, {22, 23, 25})
+        self.assertEqual(
+            list(scan_block(raw, 8, len(raw), self.script_map, lengths)),
+            list(scan_block(raw, 8, len(raw), self.script_map))
+        )
+        # outputs of other lengths are not looked up
+        self.assertEqual(
+            list(scan_block(raw, 8, len(raw), self.script_map, {25})),
+            [BlockHit(txid2, 0, 3000, self.path)]
+        )
+        with self.assertRaises(ValueError):
+            list(scan_block(raw, 8, len(raw) - 1, self.script_map))
+
+    def test_scan_block_files(self):
+        tx0, txid0 = serialize_tx([(7, self.p2wpkh)], segwit=True)
+        tx1, txid1 = serialize_tx([(8, self.other), (9, self.p2pkh)])
+        first = self.write(
+            "blk00000.dat",
+            serialize_block([tx0]) + serialize_block([tx1]) + b"\x00" * 64
+        )
+        second = self.write("blk00001.dat", serialize_block([tx1, tx0]))
+        empty = self.write("blk00002.dat", b"")
+        expected = [
+            BlockHit(txid0, 0, 7, self.path), BlockHit(txid1, 1, 9, self.path),
+            BlockHit(txid1, 1, 9, self.path), BlockHit(txid0, 0, 7, self.path),
+        ]
+        self.assertEqual(
+            list(scan_block_file(first, self.script_map)), expected[:2]
+        )
+        for workers in (None, 2):
+            self.assertEqual(
+                list(scan_block_files([first, second, empty], self.script_map,
+                                      workers=workers)),
+                expected
+            )
+        # other network magic
+        with self.assertRaises(ValueError):
+            list(scan_block_file(first, self.script_map, magic=REGTEST_MAGIC))
+        truncated = self.write("blk00003.dat", serialize_block([tx0])[:-1])
+        with self.assertRaises(ValueError):
+            list(scan_block_file(truncated, self.script_map))
@@ -0,0 +1,104 @@
+import os
+import unittest
+
+from btc_hd_wallet.bip32 import PrvKeyNode, HARDENED
+from btc_hd_wallet.bloom import (
+    BloomFilter, murmur3, BLOOM_UPDATE_ALL, BLOOM_UPDATE_NONE,
+    MAX_BLOOM_FILTER_SIZE
+)
+from btc_hd_wallet.script import p2wpkh_script, p2pkh_script, p2sh_script
+
+
+class TestBloom(unittest.TestCase):
+
+    def test_murmur3(self):
+        # Bitcoin Core hash_tests
+        vectors = [
+            (0x00000000, 0x00000000, ""),
+            (0x6a396f08, 0xFBA4C795, ""),
+            (0x81f16f39, 0xffffffff, ""),
+            (0x514E28B7, 0x00000000, "00"),
+            (0xEA3F0B17, 0xFBA4C795, "00"),
+            (0xFD6CF10D, 0x00000000, "ff"),
+            (0x16C6B7AB, 0x00000000, "0011"),
+            (0x8EB51C3D, 0x00000000, "001122"),
+            (0xB4471BF8, 0x00000000, "00112233"),
+            (0xE2301FA8, 0x00000000, "0011223344"),
+            (0xFC2E4A15, 0x00000000, "001122334455"),
+            (0xB074502C, 0x00000000, "00112233445566"),
+            (0x8034D2A0, 0x00000000, "0011223344556677"),
+            (0xB4698DEF, 0x00000000, "001122334455667788"),
+        ]
+        for expected, seed, data in vectors:
+            self.assertEqual(murmur3(bytes.fromhex(data), seed), expected)
+
+    def test_bip37_vectors(self):
+        # Bitcoin Core bloom_tests
+        elements = [
+            bytes.fromhex("99108ad8ed9bb6274d3980bab5a85c048f0950c8"),
+            bytes.fromhex("b5a2c786d9ef4658287ced5914b37a1b4aa32eee"),
+            bytes.fromhex("b9300670b4c5366e95b2699e8b18bc75e5f729c5"),
+        ]
+        for tweak, payload in ((0, "03614e9b050000000000000001"),
+                               (2147483649, "03ce4299050000000100008001")):
+            bloom = BloomFilter.for_elements(3, 0.01, tweak=tweak,
+                                             flags=BLOOM_UPDATE_ALL)
+            bloom.add(elements[0])
+            self.assertIn(elements[0], bloom)
+            self.assertNotIn(
+                bytes.fromhex("19108ad8ed9bb6274d3980bab5a85c048f0950c8"),
+                bloom
+            )
+            bloom.add_many(elements[1:])
+            self.assertEqual(bloom.contains_many(elements), [True] * 3)
+            self.assertEqual(bloom.filterload_payload().hex(), payload)
+            parsed = BloomFilter.parse_filterload(bytes.fromhex(payload))
+            self.assertEqual(parsed.filterload_payload().hex(), payload)
+            self.assertEqual(parsed.contains_many(elements), [True] * 3)
+        with self.assertRaises(ValueError):
+            BloomFilter.parse_filterload(bytes.fromhex(payload)[:-1])
+
+    def test_sizing(self):
+        bloom = BloomFilter.for_elements(10 ** 6, 0.0001)
+        self.assertEqual(len(bloom), MAX_BLOOM_FILTER_SIZE)
+        bloom = BloomFilter.for_elements(10 ** 6, 0.0001, bip37_limits=False)
+        self.assertEqual(len(bloom), 2396264)
+        self.assertEqual(bloom.hash_funcs, 13)
+        with self.assertRaises(ValueError):
+            BloomFilter.for_elements(0)
+        with self.assertRaises(ValueError):
+            BloomFilter.for_elements(10, 1.0)
+
+    def test_false_positive_rate(self):
+        items = [os.urandom(20) for _ in range(1000)]
+        bloom = BloomFilter.for_elements(len(items), 0.01, tweak=7)
+        bloom.add_many(items)
+        self.assertTrue(all(bloom.contains_many(items)))
+        others = [os.urandom(20) for _ in range(5000)]
+        false_positives = sum(bloom.contains_many(others))
+        self.assertLess(false_positives, 150)
+
+    def test_wallet_scripts(self):
+        node = PrvKeyNode.master_key(bip39_seed=bytes(range(32)))
+        chain = node.derive_path([84 + HARDENED, HARDENED, HARDENED, 0])
+        bloom = BloomFilter.for_elements(40, 0.0001, flags=BLOOM_UPDATE_NONE)
+        bloom.add_node(chain, interval=(0, 20),
+                       script_types=("p2wpkh", "p2pkh"))
+        for i in (0, 19):
+            h160 = chain.ckd(i).public_key.h160()
+            self.assertTrue(bloom.match_script(
+                p2wpkh_script(h160).raw_serialize()
+            ))
+            self.assertTrue(bloom.match_script(
+                p2pkh_script(h160).raw_serialize()
+            ))
+        h160 = chain.ckd(20).public_key.h160()
+        self.assertFalse(bloom.match_script(
+            p2wpkh_script(h160).raw_serialize()
+        ))
+        self.assertFalse(bloom.match_script(b"\x6a\x4c"))
+        other = BloomFilter.for_elements(1, 0.0001)
+        other.add_script(p2sh_script(h160))
+        self.assertTrue(other.match_script(p2sh_script(h160).raw_serialize()))
+        with self.assertRaises(ValueError):
+            bloom.add_node(chain, script_types=("p2tr",))
@@ -0,0 +1,112 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+from btc_hd_wallet.base_wallet import BaseWallet
+from btc_hd_wallet.discovery import (
+    MemoryHistoryBackend, HistoryBackend, ChainResult, discover,
+    discover_account, discover_chain
+)
+
+
+class TestDiscovery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wallet = BaseWallet.from_bip39_seed_bytes(bytes(range(64)))
+
+    def address(self, path, addr_type="p2wpkh"):
+        node = self.wallet.by_path(path)
+        return node.public_key.address(addr_type=addr_type)
+
+    def test_discover_chain(self):
+        chain = self.wallet.by_path("m/84'/0'/0'/0")
+        used = [0, 5, 25, 45, 130]
+        # 66 is beyond gap limit of 20 after 45
+        backend = MemoryHistoryBackend(
+            [self.address(str(chain) + "/" + str(i)) for i in used + [66]]
+        )
+        result = asyncio.run(discover_chain(
+            chain, backend, window=30, query_size=7
+        ))
+        self.assertEqual(result.path, "m/84'/0'/0'/0")
+        self.assertEqual([i for i, _ in result.used], [0, 5, 25, 45])
+        self.assertEqual(result.next_index, 46)
+        self.assertEqual(result.used[1][1], self.address(str(chain) + "/5"))
+        # gap limit of 100 reaches index 130
+        result = asyncio.run(discover_chain(chain, backend, gap_limit=100))
+        self.assertEqual([i for i, _ in result.used], used[:4] + [66, 130])
+        self.assertEqual(result.next_index, 131)
+        # empty chain
+        result = asyncio.run(discover_chain(
+            chain, MemoryHistoryBackend(), window=10
+        ))
+        self.assertEqual(result, ChainResult("m/84'/0'/0'/0", [], 0))
+        with self.assertRaises(ValueError):
+            asyncio.run(discover_chain(chain, backend, gap_limit=0))
+
+    def test_backend_interface(self):
+        class NoHistory(HistoryBackend):
+            pass
+
+        # incomplete backend fails on creation, not during scan
+        for cls in (HistoryBackend, NoHistory):
+            with self.assertRaises(TypeError):
+                cls()
+
+    def test_discover_account_watch_only(self):
+        account = self.wallet.by_path("m/44'/0'/0'")
+        watch_only = BaseWallet.from_extended_key(
+            self.wallet.node_extended_public_key(account)
+        ).master
+        backend = MemoryHistoryBackend([
+            self.address("m/44'/0'/0'/0/3", "p2pkh"),
+            self.address("m/44'/0'/0'/1/0", "p2pkh"),
+        ])
+        result = asyncio.run(discover_account(
+            watch_only, backend, addr_type="p2pkh"
+        ))
+        self.assertEqual(result.account, 0)
+        self.assertEqual([i for i, _ in result.external.used], [3])
+        self.assertEqual([i for i, _ in result.internal.used], [0])
+
+    def test_discover(self):
+        used = [
+            "m/84'/0'/0'/0/0", "m/84'/0'/0'/0/19", "m/84'/0'/0'/0/39",
+            "m/84'/0'/0'/1/2", "m/84'/0'/1'/0/7",
+            # account 3 is not reached - account 2 is unused
+            "m/84'/0'/3'/0/0",
+        ]
+        backend = MemoryHistoryBackend(
+            [self.address(path) for path in used], delay=0.01
+        )
+        start = time.monotonic()
+        accounts = asyncio.run(discover(self.wallet, backend, window=40,
+                                        query_size=10))
+        elapsed = time.monotonic() - start
+        self.assertEqual([a.account for a in accounts], [0, 1])
+        self.assertEqual(accounts[0].path, "m/84'/0'/0'")
+        self.assertEqual(accounts[0].external.next_index, 40)
+        self.assertEqual(accounts[0].internal.next_index, 3)
+        self.assertEqual(accounts[1].external.used,
+                         [(7, self.address("m/84'/0'/1'/0/7"))])
+        self.assertEqual(accounts[1].internal.used, [])
+        # queries of window run concurrently
+        self.assertLess(elapsed, backend.queries * backend.delay)
+        with self.assertRaises(ValueError):
+            asyncio.run(discover(self.wallet, backend, purpose=49))
+
+    def test_discover_workers(self):
+        used = ["m/84'/0'/0'/0/{}".format(i) for i in (0, 30, 55)]
+        used += ["m/84'/0'/0'/1/3", "m/84'/0'/1'/0/1"]
+        backend = MemoryHistoryBackend([self.address(path) for path in used])
+        expected = asyncio.run(discover(self.wallet, backend, window=25))
+        with mock.patch("btc_hd_wallet.discovery.ProcessPoolExecutor",
+                        wraps=ProcessPoolExecutor) as pool:
+            result = asyncio.run(discover(self.wallet, backend, window=25,
+                                          workers=2))
+        self.assertEqual(result, expected)
+        # single pool for whole run - not one per window
+        self.assertEqual(pool.call_count, 1)
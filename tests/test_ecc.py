@@ -0,0 +1,155 @@
+import os
+import unittest
+from unittest import mock
+
+import ecdsa
+
+from btc_hd_wallet import ecc
+
+
+GEN = ecdsa.ecdsa.generator_secp256k1
+
+
+def available_backends():
+    result = []
+    for name in ecc.BACKENDS:
+        try:
+            result.append(ecc.get_backend(name))
+        except ImportError:
+            continue
+    return result
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def test_python_backend_always_available(self):
+        self.assertIsInstance(ecc.get_backend("python"), ecc.PythonBackend)
+        self.assertIn(ecc.backend.name, ecc.BACKENDS)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ecc.get_backend("openssl")
+
+    def test_env_backend(self):
+        with mock.patch.dict(os.environ, {ecc.BACKEND_ENV_VAR: "python"}):
+            self.assertIsInstance(ecc._env_backend(), ecc.PythonBackend)
+        # unusable backend does not break import of package
+        with mock.patch.dict(os.environ, {ecc.BACKEND_ENV_VAR: "openssl"}):
+            with self.assertWarns(RuntimeWarning):
+                backend = ecc._env_backend()
+        self.assertEqual(backend.name, ecc.get_backend().name)
+
+
+class TestBackends(unittest.TestCase):
+
+    scalars = [
+        1, 2, 3, 15, 16, 17, 2 ** 128 + 5, ecc.N - 1,
+        0x0dba685b4511dbd3d368e5c4358a1277de9486447af7b3604a69b8d9d8b7889d,
+        0x1cca23de92fd1862fb5b76e5f4f50eb082165e5191e116c18ed1a6b24be6a53f,
+    ]
+
+    def test_point_mul_base(self):
+        for backend in available_backends():
+            for k in self.scalars:
+                point = GEN * k
+                self.assertEqual(
+                    backend.point_mul_base(k), (point.x(), point.y())
+                )
+            self.assertIsNone(backend.point_mul_base(0))
+            self.assertIsNone(backend.point_mul_base(ecc.N))
+
+    def test_batch_to_affine(self):
+        backend = ecc.get_backend("python")
+        expected = [backend.point_mul_base(k) for k in self.scalars]
+        jacobian = [backend.point_mul_base_jacobian(k) for k in self.scalars]
+        self.assertEqual(backend.batch_to_affine(jacobian), expected)
+        jacobian.insert(2, None)
+        expected.insert(2, None)
+        self.assertEqual(backend.batch_to_affine(jacobian), expected)
+        self.assertEqual(backend.batch_to_affine([]), [])
+
+    def test_base_table(self):
+        backend = ecc.get_backend("python")
+        self.assertIsNone(backend._base_table)
+        backend.point_mul_base(1)
+        table = backend._base_table
+        size = 2 ** ecc.BASE_WINDOW
+        self.assertEqual(len(table) % size, 0)
+        self.assertIsNone(table[0])
+        self.assertEqual(table[1], ecc.G)
+        second = GEN * (2 ** ecc.BASE_WINDOW) * 3
+        self.assertEqual(table[size + 3], (second.x(), second.y()))
+
+    def test_point_mul(self):
+        base = GEN * 123456789
+        for backend in available_backends():
+            for k in self.scalars:
+                point = base * k
+                self.assertEqual(
+                    backend.point_mul(k, (base.x(), base.y())),
+                    (point.x(), point.y())
+                )
+
+    def test_point_add(self):
+        for backend in available_backends():
+            p1 = backend.point_mul_base(5)
+            p2 = backend.point_mul_base(7)
+            self.assertEqual(
+                backend.point_add(p1, p2), backend.point_mul_base(12)
+            )
+            # doubling
+            self.assertEqual(
+                backend.point_add(p1, p1), backend.point_mul_base(10)
+            )
+            # infinity
+            minus_p1 = backend.point_mul_base(ecc.N - 5)
+            self.assertIsNone(backend.point_add(p1, minus_p1))
+            self.assertEqual(backend.point_add(None, p1), p1)
+            self.assertEqual(backend.point_add(p1, None), p1)
+
+    def test_tweak_add(self):
+        for backend in available_backends():
+            point = backend.point_mul_base(1000)
+            self.assertEqual(
+                backend.tweak_add(point, 24), backend.point_mul_base(1024)
+            )
+            self.assertIsNone(backend.tweak_add(point, ecc.N - 1000))
+
+    def test_tweak_add_batch(self):
+        for backend in available_backends():
+            point = backend.point_mul_base(1000)
+            tweaks = [1, 24, 2 ** 200, ecc.N - 1000]
+            self.assertEqual(
+                backend.tweak_add_batch(point, tweaks),
+                [backend.tweak_add(point, t) for t in tweaks]
+            )
+            self.assertEqual(backend.tweak_add_batch(point, []), [])
+
+    def test_sec(self):
+        for backend in available_backends():
+            for k in self.scalars:
+                point = backend.point_mul_base(k)
+                vk = ecdsa.VerifyingKey.from_public_point(
+                    GEN * k, curve=ecdsa.SECP256k1
+                )
+                compressed = backend.sec_encode(point)
+                uncompressed = backend.sec_encode(point, compressed=False)
+                self.assertEqual(compressed, vk.to_string("compressed"))
+                self.assertEqual(uncompressed, vk.to_string("uncompressed"))
+                self.assertEqual(backend.sec_decode(compressed), point)
+                self.assertEqual(backend.sec_decode(uncompressed), point)
+
+    def test_sec_invalid(self):
+        backend = ecc.get_backend("python")
+        sec = backend.sec_encode(backend.point_mul_base(3))
+        with self.assertRaises(ValueError):
+            backend.sec_decode(b"\x05" + sec[1:])
+        with self.assertRaises(ValueError):
+            backend.sec_decode(sec[:-1])
+        with self.assertRaises(ValueError):
+            backend.sec_decode(b"")
+        with self.assertRaises(ValueError):
+            # x = 5 has no corresponding y on secp256k1
+            backend.sec_decode(b"\x02" + (5).to_bytes(32, "big"))
+        with self.assertRaises(ValueError):
+            backend.sec_encode(None)
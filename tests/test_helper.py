@@ -6,7 +6,11 @@ from btc_hd_wallet.helper import (
     b58decode_addr, h160_to_p2pkh_address, h160_to_p2sh_address, merkle_root,
     merkle_parent, merkle_parent_level, big_endian_to_int, int_to_big_endian,
     encode_varint, read_varint, h160_to_p2wpkh_address, h256_to_p2wsh_address,
-    chunks, bech32_decode_address
+    chunks, bech32_decode_address, encode_base58, decode_base58,
+    decode_base58_checksum, encode_base58_checksum_batch,
+    decode_base58_checksum_batch, Base58CheckResult, map_chunks, imap_chunks,
+    hash160, hash160_batch, hash256, hash160_records, hash256_records,
+    read_varint_at
 )
 
 
@@ -82,6 +86,19 @@ class HelperTest(unittest.TestCase):
         self.assertEqual(read_varint(BytesIO(b'\xfc')), 252)
         self.assertEqual(read_varint(BytesIO(b'\x01')), 1)
 
+    def test_read_varint_at(self):
+        for i in (0, 252, 253, 0xffff, 0x10000, 0xffffffff, 0x100000000):
+            encoded = encode_varint(i)
+            buf = b"\x01\x02" + encoded + b"\x03"
+            self.assertEqual(
+                read_varint_at(buf, 2), (i, 2 + len(encoded))
+            )
+            self.assertEqual(
+                read_varint_at(memoryview(buf), 2), (i, 2 + len(encoded))
+            )
+        with self.assertRaises(ValueError):
+            read_varint_at(b"\xfe\x00\x00")
+
     def test_base58_invalid_checksum(self):
         with self.assertRaises(ValueError):
             b58decode_addr(s="1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb")
@@ -89,6 +106,118 @@ class HelperTest(unittest.TestCase):
     def test_base58_invalid_char(self):
         with self.assertRaises(ValueError):
             b58decode_addr(s="1A1zP1eP5QGefi2DlPTfTL5SLmv7DivfNb")
+        with self.assertRaises(ValueError):
+            decode_base58(s="1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb\u00e9")
+
+    def test_base58(self):
+        data = [
+            (b"", ""),
+            (b"\x00", "1"),
+            (b"\x00\x00\x00", "111"),
+            (b"\x00\x00\x01", "112"),
+            (b"\x39", "z"),
+            (b"\x3a", "21"),
+            (b"hello world", "StV1DL6CwTryKyV"),
+            (bytes.fromhex("00eb15231dfceb60925886b67d065299925915aeb172c06647"),
+             "1NS17iag9jJgTHD1VXjvLCEnZuQ3rJDE9L"),
+        ]
+        for raw, encoded in data:
+            self.assertEqual(encode_base58(raw), encoded)
+            self.assertEqual(decode_base58(encoded), raw)
+        # lengths around chunk boundaries
+        for length in range(1, 90):
+            raw = b"\x00\x00" + bytes(range(1, length + 1))
+            self.assertEqual(decode_base58(encode_base58(raw)), raw)
+            raw = b"\xff" * length
+            self.assertEqual(decode_base58(encode_base58(raw)), raw)
+
+    def test_base58_checksum_batch(self):
+        payloads = [bytes([i % 3]) + bytes(range(i)) for i in range(40)]
+        encoded = encode_base58_checksum_batch(payloads)
+        self.assertEqual(
+            encoded, [encode_base58_checksum(p) for p in payloads]
+        )
+        for workers in (None, 2):
+            self.assertEqual(
+                encode_base58_checksum_batch(
+                    payloads, workers=workers, chunk_size=7
+                ),
+                encoded
+            )
+            self.assertEqual(
+                decode_base58_checksum_batch(
+                    encoded, workers=workers, chunk_size=7
+                ),
+                [Base58CheckResult(p, None) for p in payloads]
+            )
+        bad = [
+            "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNb",  # checksum
+            "1A1zP1eP5QGefi2DlPTfTL5SLmv7DivfNb",  # invalid character
+            "1",  # too short
+            encoded[5],
+            None,  # not a string
+            b"1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa",
+        ]
+        result = decode_base58_checksum_batch(bad)
+        self.assertEqual(len(result), 6)
+        for data, error in result[:3]:
+            self.assertIsNone(data)
+            self.assertIsInstance(error, str)
+        self.assertEqual(result[3], (decode_base58_checksum(encoded[5]), None))
+        self.assertEqual(result[4:], [(None, "not a string")] * 2)
+        self.assertEqual(decode_base58_checksum_batch([]), [])
+
+    def test_hash160(self):
+        sec = bytes.fromhex(
+            "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"
+        )
+        self.assertEqual(
+            hash160(sec).hex(), "751e76e8199196d454941c45d1b3a323f1433bd6"
+        )
+        items = [sec, sec[:20], b""]
+        self.assertEqual(hash160_batch(items), [hash160(i) for i in items])
+
+    def test_hash_records(self):
+        records = [bytes([i]) * 33 for i in range(50)]
+        buf = b"".join(records)
+        for threads in (None, 1, 4):
+            self.assertEqual(
+                hash160_records(buf, 33, threads=threads),
+                b"".join(hash160(r) for r in records)
+            )
+            self.assertEqual(
+                hash256_records(memoryview(bytearray(buf)), 33,
+                                threads=threads),
+                b"".join(hash256(r) for r in records)
+            )
+        self.assertEqual(hash160_records(b"", 33), b"")
+        self.assertEqual(
+            hash256_records(buf, 66),
+            b"".join(hash256(buf[i:i + 66]) for i in range(0, len(buf), 66))
+        )
+        with self.assertRaises(ValueError):
+            hash160_records(buf[:-1], 33)
+        with self.assertRaises(ValueError):
+            hash256_records(buf, 0)
+
+    def test_imap_chunks(self):
+        items = iter(range(10))
+        self.assertEqual(
+            list(imap_chunks(sorted, items, chunk_size=3)), list(range(10))
+        )
+        self.assertEqual(
+            list(imap_chunks(sorted, [3, 1, 2, 0, 5], workers=2,
+                             chunk_size=2)),
+            [1, 3, 0, 2, 5]
+        )
+        self.assertEqual(list(imap_chunks(sorted, [], workers=2)), [])
+
+    def test_map_chunks(self):
+        self.assertEqual(map_chunks(sorted, iter([3, 1, 2])), [1, 2, 3])
+        self.assertEqual(
+            map_chunks(sorted, [3, 1, 2, 0], workers=2, chunk_size=2),
+            [1, 3, 0, 2]
+        )
 
     def test_address_base58_decode_testnet(self):
         data = [
@@ -206,6 +335,8 @@ class HelperTest(unittest.TestCase):
         ]
         want_tx_hashes = [bytes.fromhex(x) for x in want_hex_hashes]
         self.assertEqual(merkle_parent_level(tx_hashes), want_tx_hashes)
+        # input level is not mutated
+        self.assertEqual(len(tx_hashes), 11)
 
     def test_merkle_parent_level_failure(self):
         hashes = [
@@ -1,4 +1,7 @@
 import unittest
+
+import ecdsa
+
 from btc_hd_wallet.keys import PrivateKey, PublicKey
 
 
@@ -49,6 +52,30 @@ class TestPrivateKey(unittest.TestCase):
         )
         self.assertEqual(sk0, sk1)
 
+    def test_lazy_keys(self):
+        sk = PrivateKey.from_wif(
+            "L5oLkpV3aqBJ4BgssVAsax1iRa77G5CVYnv9adQ6Z87te7TyUdSC"
+        )
+        sk.wif()
+        bytes(sk)
+        self.assertIsNone(sk._K)
+        self.assertIsNone(sk._k)
+        pub = sk.K
+        self.assertIs(sk.K, pub)
+        self.assertIsNone(sk._k)
+        self.assertEqual(
+            sk.k.get_verifying_key().to_string("compressed"), pub.sec()
+        )
+        self.assertIs(sk.k, sk._k)
+
+    def test_invalid_secret_exponent(self):
+        with self.assertRaises(ValueError):
+            PrivateKey(sec_exp=0)
+        with self.assertRaises(ValueError):
+            PrivateKey(
+                sec_exp=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+            )
+
     def test_privkey_to_p2wpkh_mainnet(self):
         data = [
             (
@@ -159,6 +186,18 @@ class TestPublicKey(unittest.TestCase):
                 PublicKey.parse(bytes.fromhex(compressed)).point
             )
 
+    def test_verifying_key(self):
+        sk = PrivateKey(sec_exp=999 ** 3)
+        pubkey = sk.K
+        vk = pubkey.K
+        self.assertIsInstance(vk, ecdsa.VerifyingKey)
+        self.assertEqual(vk, sk.k.get_verifying_key())
+        self.assertIs(pubkey.K, vk)
+        for key in (PublicKey(key=vk), PublicKey(vk)):
+            self.assertEqual(key.point, pubkey.point)
+            self.assertIs(key.K, vk)
+            self.assertEqual(key, pubkey)
+
     def test_incorrect_address_type(self):
         pubkey = PrivateKey(sec_exp=6516151654156).K
         with self.assertRaises(ValueError):
@@ -0,0 +1,115 @@
+import unittest
+
+from btc_hd_wallet.helper import merkle_root as list_merkle_root
+from btc_hd_wallet.merkle import (
+    merkle_root, merkle_proof, merkle_proof_root, verify_merkle_proof,
+    build_partial_merkle_tree, extract_partial_merkle_tree,
+    verify_partial_merkle_tree
+)
+
+
+HEX_HASHES = [
+    'c117ea8ec828342f4dfb0ad6bd140e03a50720ece40169ee38bdc15d9eb64cf5',
+    'c131474164b412e3406696da1ee20ab0fc9bf41c8f05fa8ceea7a08d672d7cc5',
+    'f391da6ecfeed1814efae39e7fcb3838ae0b02c02ae7d0a5848a66947c0727b0',
+    '3d238a92a94532b946c90e19c49351c763696cff3db400485b813aecb8a13181',
+    '10092f2633be5f3ce349bf9ddbde36caa3dd10dfa0ec8106bce23acbff637dae',
+    '7d37b3d54fa6a64869084bfd2e831309118b9e833610e6228adacdbd1b4ba161',
+    '8118a77e542892fe15ae3fc771a4abfd2f5d5d5997544c3487ac36b5c85170fc',
+    'dff6879848c2c9b62fe652720b8df5272093acfaa45a43cdb3696fe2466a3877',
+    'b825c0745f46ac58f7d3759e6dc535a1fec7820377f24d4c2c6ad2cc55c0cb59',
+    '95513952a04bd8992721e9b7e2937f1c04ba31e0469fbe615a78197f68f52b7c',
+    '2e6d722e5e4dbdf2447ddecc9f7dabb8e299bae921c99ad5b0184cd9eb8e5908',
+    'b13a750047bc0bdceb2473e5fe488c2596d7a7124b4e716fdd29b046ef99bbf0',
+]
+HASHES = [bytes.fromhex(h) for h in HEX_HASHES]
+ROOT = bytes.fromhex(
+    'acbcab8bcc1af95d8d563b77d24c3d19b18f1486383d75a5085c4e86c86beed6'
+)
+
+
+class TestMerkle(unittest.TestCase):
+
+    def test_merkle_root(self):
+        hashes = list(HASHES)
+        self.assertEqual(merkle_root(hashes), ROOT)
+        self.assertEqual(hashes, HASHES)
+        self.assertEqual(merkle_root(b"".join(HASHES)), ROOT)
+        self.assertEqual(merkle_root(HASHES[:1]), HASHES[0])
+        for n in range(1, len(HASHES) + 1):
+            odd = HASHES[:n]
+            self.assertEqual(merkle_root(odd), list_merkle_root(list(odd)))
+            self.assertEqual(len(odd), n)
+        with self.assertRaises(ValueError):
+            merkle_root([])
+        with self.assertRaises(ValueError):
+            merkle_root(b"\x00" * 33)
+
+    def test_merkle_proof(self):
+        for n in range(1, len(HASHES) + 1):
+            hashes = HASHES[:n]
+            root = merkle_root(hashes)
+            for index in range(n):
+                branch = merkle_proof(hashes, index)
+                self.assertEqual(
+                    merkle_proof_root(hashes[index], branch, index), root
+                )
+                self.assertTrue(
+                    verify_merkle_proof(hashes[index], branch, index, root)
+                )
+                self.assertFalse(
+                    verify_merkle_proof(b"\x00" * 32, branch, index, root)
+                )
+        self.assertEqual(len(merkle_proof(HASHES, 5)), 4)
+        self.assertEqual(merkle_proof(HASHES[:1], 0), [])
+        with self.assertRaises(IndexError):
+            merkle_proof(HASHES, 12)
+
+    def test_partial_merkle_tree(self):
+        for n in range(1, len(HASHES) + 1):
+            hashes = HASHES[:n]
+            root = merkle_root(hashes)
+            for pattern in range(1 << min(n, 6)):
+                matches = [bool(pattern >> (i % 6) & 1) for i in range(n)]
+                tree_hashes, flags = build_partial_merkle_tree(
+                    hashes, matches
+                )
+                tree = extract_partial_merkle_tree(n, tree_hashes, flags)
+                self.assertEqual(tree.root, root)
+                self.assertEqual(
+                    tree.matches,
+                    [(i, h) for i, h in enumerate(hashes) if matches[i]]
+                )
+                self.assertTrue(
+                    verify_partial_merkle_tree(n, tree_hashes, flags, root)
+                )
+
+    def test_partial_merkle_tree_invalid(self):
+        matches = [i in (3, 7) for i in range(len(HASHES))]
+        hashes, flags = build_partial_merkle_tree(HASHES, matches)
+        total = len(HASHES)
+        self.assertTrue(verify_partial_merkle_tree(total, hashes, flags, ROOT))
+        # wrong root
+        self.assertFalse(
+            verify_partial_merkle_tree(total, hashes, flags, HASHES[0])
+        )
+        # unused hash
+        self.assertFalse(
+            verify_partial_merkle_tree(total, hashes + [ROOT], flags, ROOT)
+        )
+        # missing hash
+        self.assertFalse(
+            verify_partial_merkle_tree(total, hashes[:-1], flags, ROOT)
+        )
+        # unused flag byte
+        self.assertFalse(
+            verify_partial_merkle_tree(total, hashes, flags + b"\x00", ROOT)
+        )
+        # no transactions
+        with self.assertRaises(ValueError):
+            extract_partial_merkle_tree(0, [], b"")
+        # identical siblings (CVE-2012-2459)
+        dup = HASHES[:3] + HASHES[2:3]
+        dup_hashes, dup_flags = build_partial_merkle_tree(dup, [True] * 4)
+        with self.assertRaises(ValueError):
+            extract_partial_merkle_tree(4, dup_hashes, dup_flags)
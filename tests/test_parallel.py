@@ -0,0 +1,91 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from btc_hd_wallet.bip32 import PrvKeyNode, PubKeyNode, ChildRecord, HARDENED
+from btc_hd_wallet.parallel import derive_range, _chunks
+
+
+class TestParallel(unittest.TestCase):
+
+    xpriv = "xprv9s21ZrQH143K3YFDmG48xQj4BKHUn15if4xsQiMwSKX8bZ6YruYK6mV6oM5Tbodv1pLF7GMdPGaTcZBno3ZejMHbVVvymhsS5GcYC4hSKag"
+
+    def setUp(self):
+        self.prv = PrvKeyNode.parse(self.xpriv).derive_path([0, 1])
+        self.pub = PubKeyNode.parse(self.prv.extended_public_key())
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(_chunks((0, 10), 4)), [(0, 4), (4, 8), (8, 10)]
+        )
+        self.assertEqual(list(_chunks((5, 5), 4)), [])
+        self.assertEqual(
+            list(_chunks((HARDENED - 2, HARDENED + 3), 10)),
+            [(HARDENED - 2, HARDENED), (HARDENED, HARDENED + 3)]
+        )
+
+    def test_derive_range_public(self):
+        expected = [
+            ChildRecord(c.index, c.public_key.sec(), c.chain_code)
+            for c in self.prv.generate_children(interval=(3, 28))
+        ]
+        for workers in (1, 2):
+            self.assertEqual(
+                list(derive_range(self.pub, interval=(3, 28), workers=workers,
+                                  chunk_size=4)),
+                expected
+            )
+
+    def test_derive_range_private(self):
+        interval = (HARDENED - 3, HARDENED + 3)
+        expected = [
+            ChildRecord(c.index, bytes(c.private_key), c.chain_code)
+            for c in self.prv.generate_children(interval=interval)
+        ]
+        for workers in (1, 2):
+            self.assertEqual(
+                list(derive_range(self.prv, interval=interval,
+                                  workers=workers, chunk_size=2)),
+                expected
+            )
+
+    def test_derive_range_addresses(self):
+        for addr_type in ("p2pkh", "p2wpkh"):
+            expected = [
+                (c.index, c.public_key.address(addr_type=addr_type))
+                for c in self.prv.generate_children(interval=(0, 10))
+            ]
+            for node in (self.prv, self.pub):
+                self.assertEqual(
+                    list(derive_range(node, interval=(0, 10),
+                                      addr_type=addr_type, workers=2,
+                                      chunk_size=3)),
+                    expected
+                )
+        hardened = self.prv.ckd(HARDENED)
+        self.assertEqual(
+            list(derive_range(self.prv, interval=(HARDENED, HARDENED + 1),
+                              addr_type="p2wpkh", workers=1)),
+            [(HARDENED, hardened.public_key.address())]
+        )
+
+    def test_derive_range_invalid(self):
+        with self.assertRaises(RuntimeError):
+            list(derive_range(self.pub, interval=(0, HARDENED + 1)))
+        with self.assertRaises(ValueError):
+            list(derive_range(self.pub, chunk_size=0))
+
+    def test_early_stop(self):
+        gen = derive_range(self.pub, interval=(0, 10 ** 6), workers=2,
+                           chunk_size=10)
+        self.assertEqual(next(gen), self.pub.batch_ckd(interval=(0, 1))[0])
+        gen.close()
+
+    def test_derive_range_executor(self):
+        expected = self.pub.batch_ckd(interval=(0, 30))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            for interval in ((0, 10), (10, 30)):
+                self.assertEqual(
+                    list(derive_range(self.pub, interval=interval, workers=2,
+                                      chunk_size=4, executor=executor)),
+                    expected[interval[0]:interval[1]]
+                )
@@ -2,8 +2,11 @@ import unittest
 from io import BytesIO
 
 from btc_hd_wallet.helper import hash160, sha256
+from btc_hd_wallet.address import AddressType
 from btc_hd_wallet.script import (
-    Script, p2sh_script, p2pkh_script, p2wpkh_script, p2wsh_script
+    Script, ScriptView, iter_script_cmds, p2sh_script, p2pkh_script,
+    p2wpkh_script, p2wsh_script, classify_script_pubkey,
+    classify_script_pubkeys
 )
 
 
@@ -66,3 +69,79 @@ class TestScript(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             Script([521 * b"\x00"]).serialize()
+
+    def test_script_view(self):
+        script_bytes = Script(
+            [76 * b"\x00", 257 * b"\x01", b"\xac"]
+        ).serialize()
+        p2sh_bytes = bytes.fromhex(
+            "17a9149f324c49095c56cdcb037ec416da4db9b74ffc5a87"
+        )
+        buf = b"\xff" + script_bytes + p2sh_bytes
+        view, offset = ScriptView.parse(buf, offset=1)
+        self.assertEqual(offset, 1 + len(script_bytes))
+        self.assertEqual(view, Script.parse(BytesIO(script_bytes)))
+        self.assertEqual(view.serialize(), script_bytes)
+        # pushes are slices of underlying buffer
+        cmds = list(view)
+        self.assertIsInstance(cmds[0], memoryview)
+        self.assertEqual(cmds[0].obj, buf)
+        self.assertEqual(bytes(cmds[1]), 257 * b"\x01")
+
+        view, offset = ScriptView.parse(buf, offset=offset)
+        self.assertEqual(offset, len(buf))
+        h160 = bytes.fromhex("9f324c49095c56cdcb037ec416da4db9b74ffc5a")
+        self.assertEqual(view.cmds, p2sh_script(h160=h160).cmds)
+        self.assertEqual(str(view), "OP_HASH160 {} OP_EQUAL".format(h160.hex()))
+        self.assertEqual(view.to_script().serialize(), p2sh_bytes)
+        self.assertEqual(len(view), 23)
+
+    def test_iter_script_cmds(self):
+        # OP_0 push(2) OP_PUSHDATA4 push(3) OP_CHECKSIG
+        raw = b"\x00\x02ab\x4e\x03\x00\x00\x00xyz\xac"
+        cmds = [c if type(c) == int else bytes(c)
+                for c in iter_script_cmds(raw)]
+        self.assertEqual(cmds, [0, b"ab", b"xyz", 0xac])
+        self.assertEqual(
+            [bytes(c) for c in iter_script_cmds(raw, start=1, end=4)], [b"ab"]
+        )
+        for truncated in (b"\x02a", b"\x4c", b"\x4d\x01", b"\x4c\x05abc"):
+            with self.assertRaises(SyntaxError):
+                list(iter_script_cmds(truncated))
+        with self.assertRaises(SyntaxError):
+            ScriptView.parse(b"\x05\x00")
+
+    def test_classify_script_pubkey(self):
+        h160 = bytes.fromhex("6c743a71b8899dcd30882f5affa712e130339866")
+        h256 = sha256(h160)
+        data = [
+            (p2pkh_script(h160=h160), AddressType.P2PKH, h160),
+            (p2sh_script(h160=h160), AddressType.P2SH, h160),
+            (p2wpkh_script(h160=h160), AddressType.P2WPKH, h160),
+            (p2wsh_script(h256=h256), AddressType.P2WSH, h256),
+            (Script([0x51, h256]), AddressType.P2TR, h256),
+            (Script([0x60, h160[:2]]), AddressType.WITNESS_UNKNOWN, h160[:2]),
+            (Script([0x52, h256]), AddressType.WITNESS_UNKNOWN, h256),
+            # not templates
+            (Script([0x00, h160[:19]]), AddressType.UNKNOWN, b""),
+            (Script([0x51, h160[:1]]), AddressType.UNKNOWN, b""),
+            (Script([0x76, 0xa9, h160, 0x88, 0xad]), AddressType.UNKNOWN, b""),
+            (Script([0xa9, h160, 0x88]), AddressType.UNKNOWN, b""),
+            (Script([0x6a, b"data"]), AddressType.UNKNOWN, b""),
+            (Script(), AddressType.UNKNOWN, b""),
+        ]
+        raws = []
+        for script, script_type, program in data:
+            raw = script.raw_serialize()
+            raws.append(raw)
+            self.assertEqual(
+                classify_script_pubkey(raw), (script_type, program), script
+            )
+            self.assertEqual(
+                classify_script_pubkey(memoryview(raw)),
+                (script_type, program)
+            )
+        self.assertEqual(
+            classify_script_pubkeys(raws),
+            [(script_type, program) for _, script_type, program in data]
+        )
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+
+from btc_hd_wallet.base_wallet import BaseWallet
+from btc_hd_wallet.helper import hash160, sha256
+from btc_hd_wallet.script_index import (
+    ScriptIndex, IndexEntry, derive_programs, MIN_CAPACITY, HEADER, SLOT,
+    INDEX_MAGIC
+)
+
+
+class TestScriptIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wallet = BaseWallet.from_bip39_seed_bytes(bytes(range(64)))
+        cls.external = cls.wallet.by_path("m/84'/0'/0'/0")
+        cls.internal = cls.wallet.by_path("m/84'/0'/0'/1")
+
+    def test_derive_programs(self):
+        programs = derive_programs(
+            self.external, interval=(5, 7),
+            program_types=("p2wpkh", "p2sh-p2wpkh", "p2wsh", "p2sh-p2wsh")
+        )
+        child = self.external.ckd(6)
+        sec = child.public_key.sec()
+        h160 = hash160(sec)
+        h256 = sha256(b"\x51\x21" + sec + b"\x51\xae")
+        self.assertEqual(len(programs), 8)
+        self.assertEqual(
+            [program for index, program in programs if index == 6],
+            [h160, hash160(b"\x00\x14" + h160), h256,
+             hash160(b"\x00\x20" + h256)]
+        )
+        with self.assertRaises(ValueError):
+            derive_programs(self.external, program_types=("p2tr",))
+
+    def test_lookup(self):
+        index = ScriptIndex()
+        index.add_node(self.external, 0, 0, (0, 30),
+                       ("p2wpkh", "p2sh-p2wpkh", "p2wsh"))
+        index.add_node(self.internal, 0, 1, (0, 10))
+        self.assertEqual(len(index), 100)
+        for i, path in ((0, "m/84'/0'/0'/0/0"), (29, "m/84'/0'/0'/0/29")):
+            node = self.wallet.by_path(path)
+            entry = IndexEntry(0, 0, i)
+            for addr in (self.wallet.p2pkh_address(node),
+                         self.wallet.p2wpkh_address(node),
+                         self.wallet.p2sh_p2wpkh_address(node),
+                         self.wallet.p2wsh_address(node)):
+                self.assertEqual(index.lookup_address(addr), entry, addr)
+            h160 = node.public_key.h160()
+            self.assertEqual(index.lookup_script(b"\x00\x14" + h160), entry)
+            self.assertIn(h160, index)
+        node = self.wallet.by_path("m/84'/0'/0'/1/9")
+        self.assertEqual(
+            index.lookup_address(self.wallet.p2wpkh_address(node)),
+            IndexEntry(0, 1, 9)
+        )
+        node = self.wallet.by_path("m/84'/0'/0'/1/10")
+        self.assertIsNone(
+            index.lookup_address(self.wallet.p2wpkh_address(node))
+        )
+        self.assertIsNone(index.lookup_address("garbage"))
+        self.assertIsNone(index.lookup_script(b"\x6a"))
+        with self.assertRaises(ValueError):
+            index.add(b"\x00" * 21, 0, 0, 0)
+
+    def test_grow_and_extend(self):
+        index = ScriptIndex()
+        self.assertEqual(index.extend(self.external, 3, 0, 20), 20)
+        self.assertEqual(index.extend(self.external, 3, 0, 20), 0)
+        self.assertEqual(index.extend(self.external, 3, 0, 1000), 980)
+        self.assertEqual(len(index), 1000)
+        self.assertEqual(index.capacity, 2 * MIN_CAPACITY)
+        self.assertEqual(index.ranges, {(3, 0, "p2wpkh"): 1000})
+        for i, program in derive_programs(self.external, (0, 1000)):
+            self.assertEqual(index.get(program), IndexEntry(3, 0, i))
+        # replacing does not change count
+        index.add(program, 1, 1, 1)
+        self.assertEqual(len(index), 1000)
+        self.assertEqual(index.get(program), IndexEntry(1, 1, 1))
+
+    def test_save_load(self):
+        index = ScriptIndex()
+        index.add_node(self.external, 2, 0, (0, 50))
+        programs = derive_programs(self.external, (0, 60))
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            index.save(path)
+            for use_mmap in (True, False):
+                loaded = ScriptIndex.load(path, use_mmap=use_mmap)
+                self.assertEqual(len(loaded), 50)
+                self.assertEqual(loaded.ranges, {(2, 0, "p2wpkh"): 50})
+                for i, program in programs[:50]:
+                    self.assertEqual(loaded.get(program), IndexEntry(2, 0, i))
+                self.assertIsNone(loaded.get(programs[55][1]))
+                # modification of mapped index does not touch file
+                loaded.extend(self.external, 2, 0, 60)
+                self.assertEqual(loaded.get(programs[55][1]),
+                                 IndexEntry(2, 0, 55))
+                loaded.close()
+            self.assertEqual(len(ScriptIndex.load(path, use_mmap=False)), 50)
+            with open(path, "rb") as f:
+                data = f.read()
+            # capacity 0 (no slots) and table full over load factor
+            for capacity, count in ((0, 0), (MIN_CAPACITY, MIN_CAPACITY)):
+                with open(path, "wb") as f:
+                    f.write(HEADER.pack(INDEX_MAGIC, capacity, count, 0))
+                    f.write(b"\x00" * capacity * SLOT.size)
+                for use_mmap in (True, False):
+                    with self.assertRaises(ValueError):
+                        ScriptIndex.load(path, use_mmap=use_mmap)
+            with open(path, "wb") as f:
+                f.write(b"garbage!" + data[8:])
+            with self.assertRaises(ValueError):
+                ScriptIndex.load(path)
+        finally:
+            os.remove(path)
+
+    def test_save_load_program_types(self):
+        index = ScriptIndex()
+        index.add_node(self.external, 1, 0, (0, 30), ("p2wsh",))
+        index.add_node(self.external, 1, 0, (0, 20), ("p2sh-p2wpkh",))
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            index.save(path)
+            loaded = ScriptIndex.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(loaded.ranges, {(1, 0, "p2wsh"): 30,
+                                         (1, 0, "p2sh-p2wpkh"): 20})
+        # extends indexed program types, each from its own stop
+        self.assertEqual(loaded.extend(self.external, 1, 0, 40), 30)
+        self.assertEqual(loaded.ranges, {(1, 0, "p2wsh"): 40,
+                                         (1, 0, "p2sh-p2wpkh"): 40})
+        programs = derive_programs(self.external, (0, 40),
+                                   ("p2wsh", "p2sh-p2wpkh"))
+        for i, program in programs:
+            self.assertEqual(loaded.get(program), IndexEntry(1, 0, i))
+        self.assertIsNone(loaded.get(self.external.ckd(0).public_key.h160()))
+        # explicitly requested program type starts from zero
+        self.assertEqual(loaded.extend(self.external, 1, 0, 40, ("p2wpkh",)),
+                         40)
+        self.assertEqual(loaded.ranges[(1, 0, "p2wpkh")], 40)
+        loaded.close()
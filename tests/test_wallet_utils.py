@@ -1,5 +1,7 @@
 import unittest
-from btc_hd_wallet.wallet_utils import Bip, Version, Key, Bip32Path
+from btc_hd_wallet.wallet_utils import (
+    Bip, Version, Key, Bip32Path, DerivationPath, LRUCache
+)
 
 
 class TestVersion(unittest.TestCase):
@@ -161,3 +163,59 @@ class TestBip32Path(unittest.TestCase):
         self.assertEqual(path.bip(), 1)
         path = Bip32Path(purpose=84 + (2 ** 31))
         self.assertEqual(path.bip(), 2)
+
+
+class TestDerivationPath(unittest.TestCase):
+    def test_parse(self):
+        with self.assertRaises(ValueError):
+            DerivationPath.parse("")
+        with self.assertRaises(ValueError):
+            DerivationPath.parse("s/0")
+        with self.assertRaises(ValueError):
+            DerivationPath.parse("m//0")
+        with self.assertRaises(ValueError):
+            DerivationPath.parse("m/0/0xff")
+        with self.assertRaises(ValueError):
+            DerivationPath.parse("m/{}".format(2 ** 32))
+
+        self.assertEqual(DerivationPath.parse("m"), DerivationPath())
+        self.assertEqual(
+            DerivationPath.parse("M/0"),
+            DerivationPath(indexes=(0,), private=False)
+        )
+        path = DerivationPath.parse("m/84'/0'/0'/0/0/1/2/3'")
+        self.assertEqual(
+            path.to_list(),
+            [84 + 2 ** 31, 2 ** 31, 2 ** 31, 0, 0, 1, 2, 3 + 2 ** 31]
+        )
+        self.assertEqual(len(path), 8)
+        self.assertEqual(str(path), "m/84'/0'/0'/0/0/1/2/3'")
+        self.assertEqual(DerivationPath.parse("m/0/1/"), DerivationPath((0, 1)))
+        # parsed indexes are memoized, path objects are not shared
+        path = DerivationPath.parse("m/0/5")
+        path.private = False
+        self.assertIsNot(DerivationPath.parse("m/0/5"), path)
+        self.assertEqual(DerivationPath.parse("m/0/5"), DerivationPath((0, 5)))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_cache(self):
+        cache = LRUCache(maxsize=2)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # b is least recently used
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_disabled(self):
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)